@@ -1,8 +1,9 @@
 # Models Package
-from .evidence import Evidence, EvidenceCreate, EvidenceResponse, CustodyTransfer, AccessLog, CustodyHistory
+from .evidence import Evidence, EvidenceCreate, EvidenceResponse, CustodyTransfer, AccessLog, CustodyHistory, BatchVerifyRequest, UploadSessionCreate, UploadSessionStatus, StorageStats
 from .auth import User, UserLogin, Token
 
 __all__ = [
-    "Evidence", "EvidenceCreate", "EvidenceResponse", "CustodyTransfer", "AccessLog", "CustodyHistory",
+    "Evidence", "EvidenceCreate", "EvidenceResponse", "CustodyTransfer", "AccessLog", "CustodyHistory", "BatchVerifyRequest",
+    "UploadSessionCreate", "UploadSessionStatus", "StorageStats",
     "User", "UserLogin", "Token"
 ]
@@ -1,5 +1,5 @@
 """Authentication Models"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal
 from datetime import datetime
 
@@ -8,6 +8,9 @@ RoleType = Literal["police", "forensic_lab", "prosecutor", "judge"]
 
 class User(BaseModel):
     """User model with role"""
+    # Immutable, so verified users can be cached and shared between requests
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     username: str
     role: RoleType
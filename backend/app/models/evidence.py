@@ -5,7 +5,7 @@ from datetime import datetime
 import uuid
 
 StatusType = Literal["registered", "in_analysis", "verified", "transferred", "archived"]
-EventType = Literal["created", "accessed", "transferred", "verified", "modified"]
+EventType = Literal["created", "accessed", "transferred", "verified", "modified", "archived"]
 
 class EvidenceCreate(BaseModel):
     """Evidence upload request"""
@@ -25,6 +25,7 @@ class Evidence(BaseModel):
     notes: Optional[str] = None
     file_hash: str  # SHA-256 hash
     file_size: int
+    merkle_root: Optional[str] = None  # Root of the chunk Merkle manifest
     custodian: str  # Current custodian role
     custodian_name: str  # Name of current custodian
     status: StatusType = "registered"
@@ -44,6 +45,7 @@ class EvidenceResponse(BaseModel):
     notes: Optional[str] = None
     file_hash: str
     file_size: int
+    merkle_root: Optional[str] = None
     custodian: str
     custodian_name: str
     status: StatusType
@@ -59,6 +61,38 @@ class CustodyTransfer(BaseModel):
     reason: str
     notes: Optional[str] = None
 
+class BatchVerifyRequest(BaseModel):
+    """Batch integrity verification request (evidence IDs and/or a case)"""
+    evidence_ids: List[str] = Field(default_factory=list)
+    case_id: Optional[str] = None
+    force: bool = False  # Bypass the verification cache and re-hash every file
+
+class UploadSessionCreate(EvidenceCreate):
+    """Start a resumable upload: evidence metadata plus the file's name and size"""
+    filename: str
+    size: int = Field(ge=0)
+
+class UploadSessionStatus(BaseModel):
+    """Progress of a resumable upload"""
+    id: str
+    filename: str
+    size: int
+    received: List[List[int]]  # Received [start, end) byte ranges, merged and sorted
+    received_bytes: int
+    hashed_bytes: int  # Contiguous prefix already hashed
+    complete: bool  # Every byte received; the session can be finalized
+    expires_at: datetime
+
+class StorageStats(BaseModel):
+    """Compression of archived evidence files, as of the last archival pass"""
+    codec: str  # Codec archived files are compressed with
+    archived_files: int = 0  # Distinct stored files of archived evidence
+    compressed_files: int = 0
+    original_bytes: int = 0  # Size of the archived files uncompressed
+    stored_bytes: int = 0  # Size they take up on disk
+    bytes_saved: int = 0
+    last_run_at: Optional[datetime] = None
+
 class AccessLog(BaseModel):
     """Access log entry"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -72,6 +106,7 @@ class AccessLog(BaseModel):
 
 class CustodyHistoryItem(BaseModel):
     """Single custody history item"""
+    sequence: Optional[int] = None  # Position in the evidence record's event list
     event: EventType
     actor_role: str
     actor_name: str
@@ -84,3 +119,5 @@ class CustodyHistory(BaseModel):
     """Full custody history response"""
     evidence_id: str
     timeline: List[CustodyHistoryItem]
+    next_cursor: Optional[int] = None  # Pass as "after" to fetch the next page
+    version: Optional[int] = None  # Events in the full timeline; grows with every event
@@ -0,0 +1,33 @@
+# Repositories Package
+import os
+from typing import TYPE_CHECKING, Optional
+
+from .base import EvidenceRepository
+from .memory import InMemoryEvidenceRepository
+
+if TYPE_CHECKING:
+    from ..services.worker_pool import WorkerPool
+
+# Evidence persistence backend: "memory" (default, dev), "sqlite" or "mongo"
+EVIDENCE_STORE = os.environ.get("EVIDENCE_STORE", "memory").lower()
+
+
+def create_repository(kind: str = EVIDENCE_STORE, pool: Optional["WorkerPool"] = None) -> EvidenceRepository:
+    """
+    Create the configured evidence repository (backends are imported on demand).
+    
+    The in-memory backend does its access-log disk I/O on pool; the
+    others bring their own workers.
+    """
+    if kind == "memory":
+        return InMemoryEvidenceRepository(pool=pool)
+    if kind == "sqlite":
+        from .sqlite import SQLiteEvidenceRepository
+        return SQLiteEvidenceRepository()
+    if kind == "mongo":
+        from .mongo import MongoEvidenceRepository
+        return MongoEvidenceRepository()
+    raise ValueError(f"Unknown evidence store: {kind}")
+
+
+__all__ = ["EvidenceRepository", "InMemoryEvidenceRepository", "create_repository"]
@@ -0,0 +1,254 @@
+"""Access Log Store - Bounded in-memory hot tier with indexed on-disk segments"""
+import os
+import json
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from ..models.evidence import AccessLog
+
+if TYPE_CHECKING:
+    from ..services.worker_pool import WorkerPool
+
+# Directory holding spilled access-log segments
+ACCESS_LOG_DIR = Path(os.environ.get("ACCESS_LOG_DIR", Path(__file__).parent.parent.parent / "access_log_storage"))
+# Entries kept in memory before the oldest are spilled to disk
+ACCESS_LOG_HOT_CAPACITY = int(os.environ.get("ACCESS_LOG_HOT_CAPACITY", 10000))
+# Entries written per segment when the hot tier is full
+ACCESS_LOG_SEGMENT_ENTRIES = int(os.environ.get("ACCESS_LOG_SEGMENT_ENTRIES", 5000))
+# Segment indexes kept loaded for repeated queries
+ACCESS_LOG_INDEX_CACHE = int(os.environ.get("ACCESS_LOG_INDEX_CACHE", 16))
+
+_SEGMENT_PREFIX = "access-"
+
+
+class _Segment:
+    """Summary of one on-disk segment; its per-evidence index stays on disk"""
+
+    __slots__ = ("number", "data_path", "index_path", "min_ts", "max_ts", "count")
+
+    def __init__(self, number: int, directory: Path, min_ts: str, max_ts: str, count: int):
+        self.number = number
+        self.data_path = directory / f"{_SEGMENT_PREFIX}{number:06d}.jsonl"
+        self.index_path = directory / f"{_SEGMENT_PREFIX}{number:06d}.idx.json"
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.count = count
+
+
+class AccessLogStore:
+    """
+    Bounded access-log storage in two tiers.
+
+    The newest hot_capacity entries live in a ring buffer. When it is
+    full, the oldest segment_entries are written to a segment file (one
+    compact JSON entry per line) plus an index file mapping each
+    evidence ID to the timestamps and byte offsets of its entries. Only
+    each segment's time range stays in memory, so memory use is flat
+    however many entries are stored. A query skips segments outside the
+    time range, loads the index of the rest (a few are cached) and reads
+    only the matching lines.
+    """
+
+    def __init__(
+        self,
+        directory: Path = ACCESS_LOG_DIR,
+        hot_capacity: int = ACCESS_LOG_HOT_CAPACITY,
+        segment_entries: int = ACCESS_LOG_SEGMENT_ENTRIES,
+        index_cache: int = ACCESS_LOG_INDEX_CACHE
+    ):
+        self.directory = Path(directory)
+        self.hot_capacity = max(1, hot_capacity)
+        self.segment_entries = max(1, min(segment_entries, self.hot_capacity))
+        self.index_cache = index_cache
+        self._hot: Deque[AccessLog] = deque()
+        self._segments: List[_Segment] = []
+        self._index_cache: "OrderedDict[int, Dict[str, List[List[Any]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._spilling = False
+        self._load_segments()
+
+    def _load_segments(self) -> None:
+        """Pick up segments written by a previous run"""
+        if not self.directory.exists():
+            return
+        for index_path in sorted(self.directory.glob(f"{_SEGMENT_PREFIX}*.idx.json")):
+            number = int(index_path.name[len(_SEGMENT_PREFIX):].split(".")[0])
+            with open(index_path) as f:
+                header = json.load(f)
+            self._segments.append(_Segment(
+                number, self.directory, header["min_ts"], header["max_ts"], header["count"]
+            ))
+
+    def __len__(self) -> int:
+        return len(self._hot) + sum(segment.count for segment in self._segments)
+
+    @property
+    def needs_spill(self) -> bool:
+        return len(self._hot) >= self.hot_capacity
+
+    def append(self, log: AccessLog) -> None:
+        """Add an entry to the hot tier (spill once needs_spill is set)"""
+        self._hot.append(log)
+
+    def _write_segment(self, batch: List[AccessLog], number: int) -> _Segment:
+        """Write a batch of entries and its index as a new segment"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segment = _Segment(number, self.directory, "", "", len(batch))
+
+        index: Dict[str, List[List[Any]]] = {}
+        timestamps = []
+        offset = 0
+        data_tmp = segment.data_path.with_suffix(".tmp")
+        with open(data_tmp, "wb") as f:
+            for log in batch:
+                line = log.model_dump_json().encode() + b"\n"
+                ts = log.timestamp.isoformat(timespec="microseconds")
+                timestamps.append(ts)
+                index.setdefault(log.evidence_id, []).append([ts, offset, len(line)])
+                f.write(line)
+                offset += len(line)
+        segment.min_ts, segment.max_ts = min(timestamps), max(timestamps)
+
+        index_tmp = segment.index_path.with_suffix(".tmp")
+        with open(index_tmp, "w") as f:
+            json.dump({
+                "min_ts": segment.min_ts,
+                "max_ts": segment.max_ts,
+                "count": segment.count,
+                "evidence": index
+            }, f, separators=(",", ":"))
+        os.replace(data_tmp, segment.data_path)
+        # The index is published last: a segment without one is ignored
+        os.replace(index_tmp, segment.index_path)
+        return segment
+
+    def _next_batch(self) -> List[AccessLog]:
+        return list(islice(self._hot, self.segment_entries))
+
+    def _next_number(self) -> int:
+        return self._segments[-1].number + 1 if self._segments else 1
+
+    def _commit_segment(self, segment: _Segment) -> None:
+        """Make a written segment visible and drop its entries from the hot tier"""
+        self._segments.append(segment)
+        for _ in range(segment.count):
+            self._hot.popleft()
+
+    def spill(self) -> None:
+        """Move the oldest hot entries to a new on-disk segment"""
+        batch = self._next_batch()
+        if batch:
+            self._commit_segment(self._write_segment(batch, self._next_number()))
+
+    async def spill_async(self, pool: "WorkerPool") -> None:
+        """
+        Like spill(), but the segment is written on a worker pool.
+
+        The tiers themselves only change on the event loop, so queries
+        never see an entry twice or a half-written segment. At most one
+        spill runs at a time.
+        """
+        if self._spilling:
+            return
+        self._spilling = True
+        try:
+            batch = self._next_batch()
+            if batch:
+                segment = await pool.run(self._write_segment, batch, self._next_number())
+                self._commit_segment(segment)
+        finally:
+            self._spilling = False
+
+    def _segment_index(self, segment: _Segment) -> Dict[str, List[List[Any]]]:
+        """Load a segment's per-evidence index through a small LRU cache"""
+        with self._cache_lock:
+            index = self._index_cache.get(segment.number)
+            if index is not None:
+                self._index_cache.move_to_end(segment.number)
+                return index
+        with open(segment.index_path) as f:
+            index = json.load(f)["evidence"]
+        with self._cache_lock:
+            self._index_cache[segment.number] = index
+            while len(self._index_cache) > self.index_cache:
+                self._index_cache.popitem(last=False)
+        return index
+
+    def _query_segments(
+        self,
+        segments: List[_Segment],
+        evidence_id: str,
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> List[AccessLog]:
+        """Read an evidence record's entries from the given segments"""
+        start_ts = start.isoformat(timespec="microseconds") if start is not None else None
+        end_ts = end.isoformat(timespec="microseconds") if end is not None else None
+
+        results: List[AccessLog] = []
+        for segment in segments:
+            if start_ts is not None and segment.max_ts < start_ts:
+                continue
+            if end_ts is not None and segment.min_ts >= end_ts:
+                continue
+            entries = [
+                (offset, length)
+                for ts, offset, length in self._segment_index(segment).get(evidence_id, ())
+                if (start_ts is None or ts >= start_ts) and (end_ts is None or ts < end_ts)
+            ]
+            if not entries:
+                continue
+            with open(segment.data_path, "rb") as f:
+                for offset, length in entries:
+                    f.seek(offset)
+                    results.append(AccessLog.model_validate_json(f.read(length)))
+        return results
+
+    def _query_hot(
+        self,
+        evidence_id: str,
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> List[AccessLog]:
+        return [
+            log for log in self._hot
+            if log.evidence_id == evidence_id
+            and (start is None or log.timestamp >= start)
+            and (end is None or log.timestamp < end)
+        ]
+
+    def query(
+        self,
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AccessLog]:
+        """
+        Get an evidence record's access log entries, oldest first.
+
+        Args:
+            evidence_id: Evidence identifier
+            start: Only entries at or after this time
+            end: Only entries before this time
+        """
+        return (
+            self._query_segments(list(self._segments), evidence_id, start, end)
+            + self._query_hot(evidence_id, start, end)
+        )
+
+    async def query_async(
+        self,
+        pool: "WorkerPool",
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AccessLog]:
+        """Like query(), but segment reads run on a worker pool"""
+        # Snapshot both tiers first so a concurrent spill cannot duplicate entries
+        segments = list(self._segments)
+        hot = self._query_hot(evidence_id, start, end)
+        return await pool.run(self._query_segments, segments, evidence_id, start, end) + hot
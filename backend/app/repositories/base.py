@@ -0,0 +1,94 @@
+"""Evidence Repository - Storage interface for evidence records and access logs"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.evidence import Evidence, AccessLog
+from .evidence_index import SortOrder
+
+
+class EvidenceRepository(ABC):
+    """
+    Persistence backend for EvidenceService.
+
+    Records returned by a repository may be copies. A change to an
+    existing record goes through update_evidence, which sets only the
+    given fields, so concurrent changes to other fields are not lost.
+    """
+
+    @abstractmethod
+    async def save_evidence(self, evidence: Evidence) -> None:
+        """Insert or replace an evidence record"""
+
+    @abstractmethod
+    async def update_evidence(self, evidence_id: str, **fields: Any) -> Optional[Evidence]:
+        """Set the given fields of a stored record; returns it updated (None if missing)"""
+
+    @abstractmethod
+    async def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
+        """Get an evidence record by ID"""
+
+    @abstractmethod
+    async def list_evidence(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        order: SortOrder = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Evidence], Optional[str]]:
+        """
+        Get one page of evidence, sorted by creation time.
+
+        Args:
+            filters: Equality filters on case_id, custodian, status, evidence_type
+            created_after: Only records created at or after this time
+            created_before: Only records created before this time
+            order: Creation-time order
+            cursor: Cursor returned with the previous page
+            limit: Page size (None for all matches)
+
+        Returns:
+            Tuple of (records, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+
+    async def list_evidence_ids(self, filters: Optional[Dict[str, str]] = None) -> List[str]:
+        """Get the IDs of all evidence matching the filters, oldest first"""
+        evidence, _ = await self.list_evidence(filters)
+        return [e.id for e in evidence]
+
+    async def count_evidence(self) -> int:
+        """Number of stored evidence records"""
+        return len(await self.list_evidence_ids())
+
+    @abstractmethod
+    async def add_access_log(self, log: AccessLog) -> None:
+        """Record an access log entry (backends may batch the write)"""
+
+    async def add_access_logs(self, logs: List[AccessLog]) -> None:
+        """Record several access log entries, in one write where the backend can"""
+        for log in logs:
+            await self.add_access_log(log)
+
+    @abstractmethod
+    async def get_access_logs(
+        self,
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AccessLog]:
+        """Get the access log of an evidence record in [start, end), oldest first"""
+
+    @abstractmethod
+    async def count_access_logs(self) -> int:
+        """Number of access log entries, including any still buffered"""
+
+    async def connect(self) -> None:
+        """Prepare the backend on startup (e.g. create indexes)"""
+
+    async def close(self) -> None:
+        """Write anything buffered and release resources"""
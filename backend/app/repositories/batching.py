@@ -0,0 +1,104 @@
+"""Write Batching - Buffer rows and write them to a backend in batches"""
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Write buffered access logs once this many are pending...
+ACCESS_LOG_BATCH_SIZE = int(os.environ.get("ACCESS_LOG_BATCH_SIZE", 256))
+# ...or this long after the first one was buffered (milliseconds)
+ACCESS_LOG_FLUSH_INTERVAL_MS = float(os.environ.get("ACCESS_LOG_FLUSH_INTERVAL_MS", 50))
+# Access logs held in memory (e.g. while writes keep failing) before adding more fails
+ACCESS_LOG_MAX_BUFFERED = int(os.environ.get("ACCESS_LOG_MAX_BUFFERED", 10000))
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    Buffers items and hands them to an async write callable in batches.
+
+    A batch is written as soon as batch_size items are pending, or
+    flush_interval_ms after the first item of a batch was buffered.
+    Call flush() before reading the data back and close() on shutdown.
+
+    Writes run one at a time, so flush() also waits for a batch another
+    caller (or the timer) is still writing. A failed batch is logged and
+    put back at the front of the buffer to be retried by the next flush,
+    so the write must be idempotent. Once max_buffered items are held,
+    add() writes before buffering more and raises if that fails, rather
+    than letting the buffer grow without bound.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Any]], Awaitable[None]],
+        batch_size: int,
+        flush_interval_ms: float,
+        max_buffered: int = ACCESS_LOG_MAX_BUFFERED
+    ):
+        self._write = write
+        self.batch_size = max(1, batch_size)
+        self.max_buffered = max(self.batch_size, max_buffered)
+        self.flush_interval = flush_interval_ms / 1000
+        self._buffer: List[Any] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _get_write_lock(self) -> asyncio.Lock:
+        """Get the lock serializing writes for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+
+    async def add(self, item: Any) -> None:
+        """
+        Buffer one item, writing the batch if it is full.
+
+        Raises:
+            Exception: Whatever the write raised, if max_buffered items
+                are already held and they still cannot be written
+        """
+        if len(self._buffer) >= self.max_buffered:
+            await self.flush()
+        self._buffer.append(item)
+        if len(self._buffer) >= self.batch_size:
+            try:
+                await self.flush()
+            except Exception:
+                pass  # Logged by flush(); the items stay buffered for the next one
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception:
+            pass  # Logged by flush(); the items stay buffered for the next one
+
+    async def flush(self) -> None:
+        """Write every buffered item in one batch, after any write in progress"""
+        async with self._get_write_lock():
+            if not self._buffer:
+                return
+            items, self._buffer = self._buffer, []
+            try:
+                await self._write(items)
+            except Exception:
+                logger.exception("Writing a batch of %d items failed; keeping them buffered", len(items))
+                self._buffer[:0] = items
+                raise
+
+    async def close(self) -> None:
+        """Wait for a scheduled flush and write whatever is left"""
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,160 @@
+"""Evidence Index - Secondary indexes and cursor pagination for evidence listing"""
+import base64
+import binascii
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Tuple
+
+from ..models.evidence import Evidence
+
+SortOrder = Literal["asc", "desc"]
+
+# Fields with an equality index
+INDEXED_FIELDS = ("case_id", "custodian", "status", "evidence_type")
+
+# Every index is a list of (created_at, evidence_id) kept in sorted order
+SortKey = Tuple[datetime, str]
+
+
+def encode_cursor(key: SortKey) -> str:
+    """Encode a sort key as an opaque cursor"""
+    raw = f"{key[0].isoformat()}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Decode a cursor from encode_cursor (raises ValueError if malformed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, evidence_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), evidence_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+class EvidenceIndex:
+    """
+    Sorted secondary indexes over evidence records.
+
+    Keeps one list sorted by creation time plus, for each value of each
+    indexed field, a list of the matching records in the same order.
+    A query walks the shortest matching list from the cursor position
+    and checks any other filters against a snapshot of the indexed
+    values, so a page costs time proportional to the page size (times
+    the selectivity of the non-leading filters), not to the store.
+    """
+
+    def __init__(self):
+        self._by_created: List[SortKey] = []
+        self._by_field: Dict[str, Dict[str, List[SortKey]]] = {field: {} for field in INDEXED_FIELDS}
+        # evidence_id -> indexed field values as last indexed
+        self._values: Dict[str, Dict[str, str]] = {}
+        self._keys: Dict[str, SortKey] = {}
+
+    @staticmethod
+    def _key(evidence: Evidence) -> SortKey:
+        return (evidence.created_at, evidence.id)
+
+    def add(self, evidence: Evidence) -> None:
+        """Index a new record"""
+        if evidence.id in self._keys:
+            self.update(evidence)
+            return
+        key = self._key(evidence)
+        self._keys[evidence.id] = key
+        insort(self._by_created, key)
+        values = {field: getattr(evidence, field) for field in INDEXED_FIELDS}
+        self._values[evidence.id] = values
+        for field, value in values.items():
+            insort(self._by_field[field].setdefault(value, []), key)
+
+    def update(self, evidence: Evidence) -> None:
+        """Re-index a record after its indexed fields changed"""
+        key = self._keys.get(evidence.id)
+        if key is None:
+            self.add(evidence)
+            return
+        values = self._values[evidence.id]
+        for field in INDEXED_FIELDS:
+            new_value = getattr(evidence, field)
+            if new_value == values[field]:
+                continue
+            self._discard(self._by_field[field], values[field], key)
+            insort(self._by_field[field].setdefault(new_value, []), key)
+            values[field] = new_value
+
+    def remove(self, evidence_id: str) -> None:
+        """Drop a record from every index"""
+        key = self._keys.pop(evidence_id, None)
+        if key is None:
+            return
+        values = self._values.pop(evidence_id)
+        self._by_created.pop(bisect_left(self._by_created, key))
+        for field, value in values.items():
+            self._discard(self._by_field[field], value, key)
+
+    @staticmethod
+    def _discard(index: Dict[str, List[SortKey]], value: str, key: SortKey) -> None:
+        keys = index[value]
+        keys.pop(bisect_left(keys, key))
+        if not keys:
+            del index[value]
+
+    def query(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        order: SortOrder = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Find one page of matching evidence IDs.
+
+        Args:
+            filters: Equality filters on indexed fields
+            created_after: Only records created at or after this time
+            created_before: Only records created before this time
+            order: Creation-time order of results
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of IDs (None for all)
+
+        Returns:
+            Tuple of (evidence IDs, cursor for the next page or None)
+        """
+        filters = {field: value for field, value in (filters or {}).items() if value is not None}
+        for field in filters:
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Field {field} is not indexed")
+
+        # Lead with the most selective index
+        candidates, leading = self._by_created, None
+        for field, value in filters.items():
+            keys = self._by_field[field].get(value, [])
+            if leading is None or len(keys) < len(candidates):
+                candidates, leading = keys, field
+        residual = {f: v for f, v in filters.items() if f != leading}
+
+        low = 0 if created_after is None else bisect_left(candidates, (created_after, ""))
+        high = len(candidates) if created_before is None else bisect_left(candidates, (created_before, ""))
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            if order == "asc":
+                low = max(low, bisect_right(candidates, after))
+            else:
+                high = min(high, bisect_left(candidates, after))
+
+        positions = range(low, high) if order == "asc" else range(high - 1, low - 1, -1)
+        page: List[SortKey] = []
+        for position in positions:
+            key = candidates[position]
+            values = self._values[key[1]]
+            if all(values[f] == v for f, v in residual.items()):
+                if limit is not None and len(page) == limit:
+                    return [k[1] for k in page], encode_cursor(page[-1])
+                page.append(key)
+        return [k[1] for k in page], None
+
+    def __len__(self) -> int:
+        return len(self._keys)
@@ -0,0 +1,91 @@
+"""In-Memory Repository - Default development backend"""
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..models.evidence import Evidence, AccessLog
+from .access_log_store import AccessLogStore
+from .evidence_index import EvidenceIndex, SortOrder
+from .base import EvidenceRepository
+
+if TYPE_CHECKING:
+    from ..services.worker_pool import WorkerPool
+
+
+class InMemoryEvidenceRepository(EvidenceRepository):
+    """
+    Keeps evidence in a dict with secondary indexes; evidence does not
+    survive a restart. Access logs go to a bounded AccessLogStore that
+    spills older entries to disk, on the given worker pool if any.
+    """
+
+    def __init__(
+        self,
+        access_logs: Optional[AccessLogStore] = None,
+        pool: Optional["WorkerPool"] = None
+    ):
+        self._evidence_store: Dict[str, Evidence] = {}
+        self._index = EvidenceIndex()
+        self._access_logs = access_logs if access_logs is not None else AccessLogStore()
+        self.pool = pool
+
+    async def save_evidence(self, evidence: Evidence) -> None:
+        self._evidence_store[evidence.id] = evidence
+        self._index.add(evidence)
+
+    async def update_evidence(self, evidence_id: str, **fields: Any) -> Optional[Evidence]:
+        evidence = self._evidence_store.get(evidence_id)
+        if evidence is None:
+            return None
+        evidence = evidence.model_copy(update=fields)
+        self._evidence_store[evidence_id] = evidence
+        self._index.update(evidence)
+        return evidence
+
+    async def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
+        return self._evidence_store.get(evidence_id)
+
+    async def list_evidence(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        order: SortOrder = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Evidence], Optional[str]]:
+        evidence_ids, next_cursor = self._index.query(
+            filters, created_after, created_before, order, cursor, limit
+        )
+        return [self._evidence_store[evidence_id] for evidence_id in evidence_ids], next_cursor
+
+    async def list_evidence_ids(self, filters: Optional[Dict[str, str]] = None) -> List[str]:
+        evidence_ids, _ = self._index.query(filters)
+        return evidence_ids
+
+    async def count_evidence(self) -> int:
+        return len(self._evidence_store)
+
+    async def add_access_log(self, log: AccessLog) -> None:
+        await self.add_access_logs([log])
+
+    async def add_access_logs(self, logs: List[AccessLog]) -> None:
+        for log in logs:
+            self._access_logs.append(log)
+        while self._access_logs.needs_spill:
+            if self.pool is not None:
+                await self._access_logs.spill_async(self.pool)
+            else:
+                self._access_logs.spill()
+
+    async def get_access_logs(
+        self,
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AccessLog]:
+        if self.pool is not None:
+            return await self._access_logs.query_async(self.pool, evidence_id, start, end)
+        return self._access_logs.query(evidence_id, start, end)
+
+    async def count_access_logs(self) -> int:
+        return len(self._access_logs)
@@ -0,0 +1,190 @@
+"""MongoDB Repository - Evidence and access-log persistence via motor"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from ..models.evidence import Evidence, AccessLog
+from .base import EvidenceRepository
+from .batching import ACCESS_LOG_BATCH_SIZE, ACCESS_LOG_FLUSH_INTERVAL_MS, BatchWriter
+from .evidence_index import INDEXED_FIELDS, SortOrder, decode_cursor, encode_cursor
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.environ.get("DB_NAME", "evidence")
+
+EVIDENCE_INDEXES = [
+    IndexModel([("case_id", ASCENDING), ("created_at", ASCENDING)], name="case_created"),
+    IndexModel([("custodian", ASCENDING), ("status", ASCENDING)], name="custodian_status"),
+    IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created"),
+]
+# Server error code for a duplicate _id
+DUPLICATE_KEY_ERROR = 11000
+
+ACCESS_LOG_INDEXES = [
+    IndexModel([("evidence_id", ASCENDING), ("timestamp", ASCENDING)], name="evidence_timestamp"),
+]
+
+
+class MongoEvidenceRepository(EvidenceRepository):
+    """
+    MongoDB-backed evidence and access-log store.
+
+    Documents use the evidence / log ID as _id. Indexes are created in
+    connect(). Listing queries use keyset pagination on
+    (created_at, _id) and fetch whole documents: they hold only the
+    Evidence fields, all of which the list response returns, so there
+    is nothing to project away. ID lookups project _id alone. Access
+    logs are buffered and written with unordered insert_many batches;
+    logs already stored are skipped (like SQLite's INSERT OR IGNORE),
+    so a batch retried after a partial failure does not fail again.
+
+    Pass a client (e.g. mongomock_motor.AsyncMongoMockClient) to run
+    without a mongod.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncIOMotorClient] = None,
+        db_name: str = DB_NAME,
+        batch_size: int = ACCESS_LOG_BATCH_SIZE,
+        flush_interval_ms: float = ACCESS_LOG_FLUSH_INTERVAL_MS
+    ):
+        self.client = client if client is not None else AsyncIOMotorClient(MONGO_URL)
+        self.db: AsyncIOMotorDatabase = self.client[db_name]
+        self.evidence = self.db["evidence"]
+        self.access_logs = self.db["access_logs"]
+        self._log_writer = BatchWriter(self._write_access_logs, batch_size, flush_interval_ms)
+
+    async def connect(self) -> None:
+        await self.evidence.create_indexes(EVIDENCE_INDEXES)
+        await self.access_logs.create_indexes(ACCESS_LOG_INDEXES)
+
+    @staticmethod
+    def _to_document(model) -> Dict[str, Any]:
+        document = model.model_dump()
+        document["_id"] = document.pop("id")
+        return document
+
+    @staticmethod
+    def _to_evidence(document: Dict[str, Any]) -> Evidence:
+        return Evidence(id=document.pop("_id"), **document)
+
+    @staticmethod
+    def _build_filter(
+        filters: Optional[Dict[str, str]],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime],
+        order: SortOrder,
+        cursor: Optional[str]
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        for field, value in (filters or {}).items():
+            if value is None:
+                continue
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Field {field} is not indexed")
+            query[field] = value
+        created: Dict[str, Any] = {}
+        if created_after is not None:
+            created["$gte"] = created_after
+        if created_before is not None:
+            created["$lt"] = created_before
+        if created:
+            query["created_at"] = created
+        if cursor is not None:
+            after_time, after_id = decode_cursor(cursor)
+            op = "$gt" if order == "asc" else "$lt"
+            query["$or"] = [
+                {"created_at": {op: after_time}},
+                {"created_at": after_time, "_id": {op: after_id}},
+            ]
+        return query
+
+    async def save_evidence(self, evidence: Evidence) -> None:
+        await self.evidence.replace_one({"_id": evidence.id}, self._to_document(evidence), upsert=True)
+
+    async def update_evidence(self, evidence_id: str, **fields: Any) -> Optional[Evidence]:
+        document = await self.evidence.find_one_and_update(
+            {"_id": evidence_id}, {"$set": fields}, return_document=ReturnDocument.AFTER
+        )
+        return self._to_evidence(document) if document is not None else None
+
+    async def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
+        document = await self.evidence.find_one({"_id": evidence_id})
+        return self._to_evidence(document) if document is not None else None
+
+    async def list_evidence(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        order: SortOrder = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Evidence], Optional[str]]:
+        query = self._build_filter(filters, created_after, created_before, order, cursor)
+        direction = ASCENDING if order == "asc" else DESCENDING
+        found = self.evidence.find(query).sort(
+            [("created_at", direction), ("_id", direction)]
+        )
+        if limit is not None:
+            # One extra document tells us whether there is a next page
+            found = found.limit(limit + 1)
+        documents = await found.to_list(length=None)
+        has_more = limit is not None and len(documents) > limit
+        evidence = [self._to_evidence(document) for document in documents[:limit]]
+        next_cursor = encode_cursor((evidence[-1].created_at, evidence[-1].id)) if has_more else None
+        return evidence, next_cursor
+
+    async def list_evidence_ids(self, filters: Optional[Dict[str, str]] = None) -> List[str]:
+        query = self._build_filter(filters, None, None, "asc", None)
+        found = self.evidence.find(query, {"_id": 1}).sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+        return [document["_id"] async for document in found]
+
+    async def count_evidence(self) -> int:
+        return await self.evidence.estimated_document_count()
+
+    async def add_access_log(self, log: AccessLog) -> None:
+        await self._log_writer.add(self._to_document(log))
+
+    async def add_access_logs(self, logs: List[AccessLog]) -> None:
+        # Already a batch: one insert_many, without waiting in the buffer
+        await self._write_access_logs([self._to_document(log) for log in logs])
+
+    async def _write_access_logs(self, documents: List[Dict[str, Any]]) -> None:
+        try:
+            await self.access_logs.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            details = e.details
+            if details.get("writeConcernErrors") or any(
+                error["code"] != DUPLICATE_KEY_ERROR for error in details.get("writeErrors", [])
+            ):
+                raise
+
+    async def get_access_logs(
+        self,
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AccessLog]:
+        await self._log_writer.flush()
+        query: Dict[str, Any] = {"evidence_id": evidence_id}
+        timestamp: Dict[str, Any] = {}
+        if start is not None:
+            timestamp["$gte"] = start
+        if end is not None:
+            timestamp["$lt"] = end
+        if timestamp:
+            query["timestamp"] = timestamp
+        found = self.access_logs.find(query).sort("timestamp", ASCENDING)
+        return [AccessLog(id=document.pop("_id"), **document) async for document in found]
+
+    async def count_access_logs(self) -> int:
+        return await self.access_logs.estimated_document_count() + len(self._log_writer)
+
+    async def close(self) -> None:
+        await self._log_writer.close()
+        self.client.close()
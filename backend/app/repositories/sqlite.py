@@ -0,0 +1,311 @@
+"""SQLite Repository - Evidence and access-log persistence in SQLite (WAL mode)"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.evidence import Evidence, AccessLog
+from ..services.worker_pool import WorkerPool
+from .base import EvidenceRepository
+from .batching import ACCESS_LOG_BATCH_SIZE, ACCESS_LOG_FLUSH_INTERVAL_MS, BatchWriter
+from .evidence_index import INDEXED_FIELDS, SortOrder, decode_cursor, encode_cursor
+
+# Database file
+SQLITE_PATH = Path(os.environ.get("SQLITE_PATH", Path(__file__).parent.parent.parent / "evidence.db"))
+# Connections (one per worker thread); WAL lets readers run alongside the writer
+SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 4))
+
+EVIDENCE_COLUMNS = (
+    "id", "case_id", "filename", "original_filename", "evidence_type", "description",
+    "notes", "file_hash", "file_size", "merkle_root", "custodian", "custodian_name",
+    "status", "blockchain_tx", "integrity_verified", "created_at", "updated_at"
+)
+ACCESS_LOG_COLUMNS = (
+    "id", "evidence_id", "event_type", "actor_role", "actor_name", "details",
+    "timestamp", "blockchain_tx"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    id TEXT PRIMARY KEY,
+    case_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    original_filename TEXT NOT NULL,
+    evidence_type TEXT NOT NULL,
+    description TEXT NOT NULL,
+    notes TEXT,
+    file_hash TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    merkle_root TEXT,
+    custodian TEXT NOT NULL,
+    custodian_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    blockchain_tx TEXT,
+    integrity_verified INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_evidence_created ON evidence (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_evidence_case ON evidence (case_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_evidence_custodian ON evidence (custodian, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_evidence_status ON evidence (status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_evidence_type ON evidence (evidence_type, created_at, id);
+CREATE TABLE IF NOT EXISTS access_logs (
+    id TEXT PRIMARY KEY,
+    evidence_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    actor_role TEXT NOT NULL,
+    actor_name TEXT NOT NULL,
+    details TEXT,
+    timestamp TEXT NOT NULL,
+    blockchain_tx TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_access_logs_evidence ON access_logs (evidence_id, timestamp);
+"""
+
+# Parameterized statements, reused from each connection's statement cache
+_UPSERT_EVIDENCE = (
+    f"INSERT OR REPLACE INTO evidence ({', '.join(EVIDENCE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in EVIDENCE_COLUMNS)})"
+)
+_SELECT_EVIDENCE = f"SELECT {', '.join(EVIDENCE_COLUMNS)} FROM evidence"
+_SELECT_EVIDENCE_BY_ID = f"{_SELECT_EVIDENCE} WHERE id = ?"
+_INSERT_ACCESS_LOG = (
+    f"INSERT OR IGNORE INTO access_logs ({', '.join(ACCESS_LOG_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in ACCESS_LOG_COLUMNS)})"
+)
+_SELECT_ACCESS_LOGS = (
+    f"SELECT {', '.join(ACCESS_LOG_COLUMNS)} FROM access_logs "
+    "WHERE evidence_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp, rowid"
+)
+
+
+def _to_db_time(value: datetime) -> str:
+    """Fixed-width ISO timestamp, so text order matches time order"""
+    return value.isoformat(timespec="microseconds")
+
+
+class SQLiteEvidenceRepository(EvidenceRepository):
+    """
+    SQLite-backed evidence and access-log store.
+
+    Queries run on a dedicated worker pool, and each worker thread keeps
+    its own connection, so the pool size is also the connection count.
+    The database runs in WAL mode so reads never wait for the writer.
+    Access logs are buffered and written with executemany once
+    ACCESS_LOG_BATCH_SIZE are pending or ACCESS_LOG_FLUSH_INTERVAL_MS
+    after the first, and are flushed before they are read back.
+    """
+
+    def __init__(
+        self,
+        path: Path = SQLITE_PATH,
+        pool_size: int = SQLITE_POOL_SIZE,
+        batch_size: int = ACCESS_LOG_BATCH_SIZE,
+        flush_interval_ms: float = ACCESS_LOG_FLUSH_INTERVAL_MS
+    ):
+        self.path = Path(path)
+        self.pool = WorkerPool(max_workers=pool_size, queue_depth=pool_size * 16, thread_name_prefix="sqlite")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._log_writer = BatchWriter(self._write_access_logs, batch_size, flush_interval_ms)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._execute_script(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _execute_script(self, script: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executescript(script)
+
+    @staticmethod
+    def _evidence_row(evidence: Evidence) -> Tuple[Any, ...]:
+        data = evidence.model_dump()
+        data["integrity_verified"] = int(data["integrity_verified"])
+        data["created_at"] = _to_db_time(data["created_at"])
+        data["updated_at"] = _to_db_time(data["updated_at"])
+        return tuple(data[column] for column in EVIDENCE_COLUMNS)
+
+    @staticmethod
+    def _access_log_row(log: AccessLog) -> Tuple[Any, ...]:
+        data = log.model_dump()
+        data["timestamp"] = _to_db_time(data["timestamp"])
+        return tuple(data[column] for column in ACCESS_LOG_COLUMNS)
+
+    @staticmethod
+    def _row_evidence(row: Tuple[Any, ...]) -> Evidence:
+        data = dict(zip(EVIDENCE_COLUMNS, row))
+        data["integrity_verified"] = bool(data["integrity_verified"])
+        return Evidence(**data)
+
+    def _save_evidence(self, row: Tuple[Any, ...]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(_UPSERT_EVIDENCE, row)
+
+    def _update_evidence(self, evidence_id: str, fields: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"UPDATE evidence SET {', '.join(f'{column} = ?' for column in fields)} WHERE id = ?",
+                [*fields.values(), evidence_id]
+            )
+            return conn.execute(_SELECT_EVIDENCE_BY_ID, (evidence_id,)).fetchone()
+
+    def _get_evidence(self, evidence_id: str) -> Optional[Tuple[Any, ...]]:
+        return self._connect().execute(_SELECT_EVIDENCE_BY_ID, (evidence_id,)).fetchone()
+
+    def _query_evidence(self, sql: str, params: List[Any]) -> List[Tuple[Any, ...]]:
+        return self._connect().execute(sql, params).fetchall()
+
+    def _insert_access_logs(self, rows: List[Tuple[Any, ...]]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(_INSERT_ACCESS_LOG, rows)
+
+    def _get_access_logs(self, evidence_id: str, start: str, end: str) -> List[Tuple[Any, ...]]:
+        return self._connect().execute(_SELECT_ACCESS_LOGS, (evidence_id, start, end)).fetchall()
+
+    def _count(self, table: str) -> int:
+        return self._connect().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    @staticmethod
+    def _build_query(
+        select: str,
+        filters: Optional[Dict[str, str]],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime],
+        order: SortOrder,
+        cursor: Optional[str],
+        limit: Optional[int]
+    ) -> Tuple[str, List[Any]]:
+        """Build a keyset-paginated listing query (fetches limit + 1 rows)"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for field, value in (filters or {}).items():
+            if value is None:
+                continue
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Field {field} is not indexed")
+            clauses.append(f"{field} = ?")
+            params.append(value)
+        if created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(_to_db_time(created_after))
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(_to_db_time(created_before))
+        if cursor is not None:
+            after_time, after_id = decode_cursor(cursor)
+            clauses.append(f"(created_at, id) {'>' if order == 'asc' else '<'} (?, ?)")
+            params.extend([_to_db_time(after_time), after_id])
+
+        direction = "ASC" if order == "asc" else "DESC"
+        sql = select
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY created_at {direction}, id {direction}"
+        if limit is not None:
+            # One extra row tells us whether there is a next page
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        return sql, params
+
+    async def save_evidence(self, evidence: Evidence) -> None:
+        await self.pool.run(self._save_evidence, self._evidence_row(evidence))
+
+    async def update_evidence(self, evidence_id: str, **fields: Any) -> Optional[Evidence]:
+        columns: Dict[str, Any] = {}
+        for field, value in fields.items():
+            if field == "id" or field not in EVIDENCE_COLUMNS:
+                raise ValueError(f"Cannot update evidence field {field}")
+            if isinstance(value, datetime):
+                value = _to_db_time(value)
+            elif isinstance(value, bool):
+                value = int(value)
+            columns[field] = value
+        row = await self.pool.run(self._update_evidence, evidence_id, columns)
+        return self._row_evidence(row) if row is not None else None
+
+    async def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
+        row = await self.pool.run(self._get_evidence, evidence_id)
+        return self._row_evidence(row) if row is not None else None
+
+    async def list_evidence(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        order: SortOrder = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Evidence], Optional[str]]:
+        sql, params = self._build_query(
+            _SELECT_EVIDENCE, filters, created_after, created_before, order, cursor, limit
+        )
+        rows = await self.pool.run(self._query_evidence, sql, params)
+        has_more = limit is not None and len(rows) > limit
+        evidence = [self._row_evidence(row) for row in rows[:limit]]
+        next_cursor = encode_cursor((evidence[-1].created_at, evidence[-1].id)) if has_more else None
+        return evidence, next_cursor
+
+    async def list_evidence_ids(self, filters: Optional[Dict[str, str]] = None) -> List[str]:
+        sql, params = self._build_query("SELECT id FROM evidence", filters, None, None, "asc", None, None)
+        rows = await self.pool.run(self._query_evidence, sql, params)
+        return [row[0] for row in rows]
+
+    async def count_evidence(self) -> int:
+        return await self.pool.run(self._count, "evidence")
+
+    async def add_access_log(self, log: AccessLog) -> None:
+        await self._log_writer.add(self._access_log_row(log))
+
+    async def add_access_logs(self, logs: List[AccessLog]) -> None:
+        # Already a batch: one executemany, without waiting in the buffer
+        await self._write_access_logs([self._access_log_row(log) for log in logs])
+
+    async def _write_access_logs(self, rows: List[Tuple[Any, ...]]) -> None:
+        await self.pool.run(self._insert_access_logs, rows)
+
+    async def get_access_logs(
+        self,
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[AccessLog]:
+        await self._log_writer.flush()
+        # Open ends compare below / above every ISO timestamp
+        rows = await self.pool.run(
+            self._get_access_logs,
+            evidence_id,
+            _to_db_time(start) if start is not None else "",
+            _to_db_time(end) if end is not None else "~"
+        )
+        return [AccessLog(**dict(zip(ACCESS_LOG_COLUMNS, row))) for row in rows]
+
+    async def count_access_logs(self) -> int:
+        return await self.pool.run(self._count, "access_logs") + len(self._log_writer)
+
+    async def close(self) -> None:
+        await self._log_writer.close()
+        self.pool.shutdown()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
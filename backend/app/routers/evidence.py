@@ -1,13 +1,19 @@
 """Evidence Router - Evidence management API endpoints"""
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form
-from typing import List, Optional
+import json
+import mimetypes
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Query, Response, Header, Request
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Literal, Optional
 from ..models.evidence import (
     EvidenceCreate, EvidenceResponse, CustodyTransfer, 
-    AccessLog, CustodyHistory
+    AccessLog, CustodyHistory, BatchVerifyRequest, StatusType,
+    UploadSessionCreate, UploadSessionStatus, StorageStats
 )
 from ..models.auth import User
 from ..services.evidence_service import evidence_service
 from ..services.auth_service import get_current_user
+from .ranged_file import RangedFileResponse, file_etag
 
 router = APIRouter(prefix="/evidence", tags=["Evidence Management"])
 
@@ -46,12 +52,228 @@ async def upload_evidence(
     evidence = await evidence_service.upload_evidence(file, metadata, user)
     return evidence
 
+def _require_uploader(user: User) -> None:
+    if user.role not in ["police", "forensic_lab"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only police and forensic lab can upload evidence"
+        )
+
+def _upload_session_not_found(session_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Upload session {session_id} not found"
+    )
+
+@router.post("/uploads", response_model=UploadSessionStatus, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    request: UploadSessionCreate,
+    user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload for a large evidence file.
+    
+    Send the bytes with PUT /uploads/{id}?offset=N (raw request body;
+    chunks may be sent in parallel and in any order), check progress
+    with GET /uploads/{id} after a dropped connection, then finalize
+    with POST /uploads/{id}/complete.
+    
+    Required roles: police, forensic_lab
+    """
+    _require_uploader(user)
+    try:
+        return await evidence_service.create_upload_session(request, user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionStatus)
+async def get_upload_session(
+    session_id: str,
+    user: User = Depends(get_current_user)
+):
+    """Get the received byte ranges of an upload, to resume it."""
+    session = await evidence_service.get_upload_session(session_id, user)
+    if not session:
+        raise _upload_session_not_found(session_id)
+    return session
+
+@router.put("/uploads/{session_id}", response_model=UploadSessionStatus)
+async def upload_chunk(
+    session_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    user: User = Depends(get_current_user)
+):
+    """
+    Write one chunk of an upload at the given byte offset.
+    
+    The body is the raw chunk (application/octet-stream). Re-sending a
+    chunk is safe.
+    """
+    try:
+        session = await evidence_service.write_upload_chunk(session_id, offset, request.stream(), user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not session:
+        raise _upload_session_not_found(session_id)
+    return session
+
+@router.post("/uploads/{session_id}/complete", response_model=EvidenceResponse)
+async def complete_upload_session(
+    session_id: str,
+    user: User = Depends(get_current_user)
+):
+    """
+    Finalize an upload once every byte has been received.
+    
+    Registers the evidence exactly like POST /upload, using the hash
+    computed while the chunks arrived.
+    """
+    try:
+        evidence = await evidence_service.complete_upload_session(session_id, user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not evidence:
+        raise _upload_session_not_found(session_id)
+    return evidence
+
+@router.delete("/uploads/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    session_id: str,
+    user: User = Depends(get_current_user)
+):
+    """Abandon an upload and delete its partial file."""
+    if not await evidence_service.abort_upload_session(session_id, user):
+        raise _upload_session_not_found(session_id)
+
 @router.get("/", response_model=List[EvidenceResponse])
 async def list_evidence(
+    response: Response,
+    case_id: Optional[str] = None,
+    custodian: Optional[str] = None,
+    status_filter: Optional[StatusType] = Query(None, alias="status"),
+    evidence_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    user: User = Depends(get_current_user)
+):
+    """
+    Get evidence accessible to current user.
+    
+    - Filters on case_id, custodian, status, evidence_type and a
+      created_at range, served from secondary indexes
+    - Sorted by created_at (order=asc|desc)
+    - With limit=N returns one page; the cursor for the next page is in
+      the X-Next-Cursor header (absent on the last page)
+    """
+    try:
+        evidence, next_cursor = await evidence_service.list_evidence(
+            user,
+            filters={
+                "case_id": case_id,
+                "custodian": custodian,
+                "status": status_filter,
+                "evidence_type": evidence_type
+            },
+            created_after=created_after,
+            created_before=created_before,
+            order=order,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return evidence
+
+@router.post("/verify-batch")
+async def verify_evidence_batch(
+    request: BatchVerifyRequest,
+    user: User = Depends(get_current_user)
+):
+    """
+    Verify integrity of many evidence items, e.g. a whole case before a hearing.
+    
+    - Accepts a list of evidence IDs and/or a case ID
+    - Hashes items in parallel across the hash pool
+    - Streams one JSON result per line (NDJSON) as each item finishes,
+      followed by a final summary line
+    """
+    evidence_ids = list(request.evidence_ids)
+    if request.case_id:
+        evidence_ids.extend(await evidence_service.get_case_evidence_ids(request.case_id))
+    if not evidence_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide evidence_ids or a case_id with registered evidence"
+        )
+    
+    async def stream_results():
+        total = verified = 0
+        async for result in evidence_service.verify_batch(evidence_ids, user, force=request.force):
+            total += 1
+            verified += bool(result.get("verified"))
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"summary": {"total": total, "verified": verified, "failed": total - verified}}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.post("/ledger/verify-chain")
+async def verify_ledger_chain(
+    full: bool = False,
     user: User = Depends(get_current_user)
 ):
-    """Get all evidence accessible to current user."""
-    return evidence_service.get_all_evidence(user)
+    """
+    Audit the ledger's hash-chained blocks.
+    
+    - Re-checks each block's link to the previous block and the Merkle
+      root of its transactions
+    - Only blocks sealed since the last successful audit are checked,
+      unless full=true
+    """
+    return await evidence_service.verify_chain(full=full)
+
+@router.get("/transactions/{tx_hash}")
+async def get_transaction(
+    tx_hash: str,
+    user: User = Depends(get_current_user)
+):
+    """Look up a blockchain transaction by its hash, with its commit status."""
+    transaction = await evidence_service.get_transaction(tx_hash)
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transaction {tx_hash} not found"
+        )
+    return transaction
+
+@router.get("/storage/stats", response_model=StorageStats)
+async def get_storage_stats(
+    user: User = Depends(get_current_user)
+):
+    """
+    Get storage statistics for archived evidence.
+    
+    Reports how many archived files are compressed and the bytes saved,
+    as of the last background archival pass.
+    """
+    return evidence_service.get_storage_stats()
 
 @router.get("/{evidence_id}", response_model=EvidenceResponse)
 async def get_evidence(
@@ -59,18 +281,76 @@ async def get_evidence(
     user: User = Depends(get_current_user)
 ):
     """Get evidence details by ID."""
-    evidence = evidence_service.get_evidence(evidence_id)
+    evidence = await evidence_service.get_evidence(evidence_id)
     if not evidence:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Evidence {evidence_id} not found"
         )
     
-    # Log access
-    evidence_service.log_access(evidence_id, user)
+    # Log access (written behind the response)
+    await evidence_service.record_access(evidence_id, user)
     
     return evidence
 
+@router.get("/{evidence_id}/content")
+async def download_evidence(
+    evidence_id: str,
+    verify: bool = False,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    user: User = Depends(get_current_user)
+):
+    """
+    Download the evidence file.
+    
+    - Streams the stored file without buffering it (sendfile where the
+      server supports it)
+    - Honours a single-range Range header (206), with If-Range, so media
+      can be scrubbed; the ETag is the registered SHA-256 hash plus the
+      stored file's identity, so it changes if the file on disk does
+    - verify=true hashes a full download as it is sent and records the
+      result like POST /{id}/verify
+    - Archived files compressed in storage are decompressed as they are
+      sent, so clients always receive the registered bytes
+    """
+    try:
+        content = await evidence_service.get_evidence_content(evidence_id)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Evidence file for {evidence_id} not found"
+        )
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Evidence {evidence_id} not found"
+        )
+    evidence, file_path, stat_result, codec = content
+    
+    on_complete = None
+    if verify:
+        async def on_complete(digest: str) -> None:
+            await evidence_service.record_streamed_verification(evidence, digest, user, stat_result)
+    
+    response = RangedFileResponse(
+        str(file_path),
+        stat_result,
+        evidence_service.storage.pool,
+        etag=file_etag(evidence.file_hash, stat_result),
+        media_type=mimetypes.guess_type(evidence.original_filename)[0] or "application/octet-stream",
+        filename=evidence.original_filename,
+        range_header=range_header,
+        if_range=if_range,
+        on_complete=on_complete,
+        codec=codec,
+        size=evidence.file_size if codec is not None else None
+    )
+    # Log access once per view, not for every range a media player fetches
+    if response.status_code != status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE and response.start == 0:
+        await evidence_service.record_access(evidence_id, user)
+    return response
+
 @router.post("/{evidence_id}/access", response_model=AccessLog)
 async def log_evidence_access(
     evidence_id: str,
@@ -81,7 +361,7 @@ async def log_evidence_access(
     
     Automatically logged when viewing, but can be called explicitly.
     """
-    log = evidence_service.log_access(evidence_id, user)
+    log = await evidence_service.log_access(evidence_id, user)
     if not log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,7 +382,7 @@ async def transfer_custody(
     Transfer is recorded on blockchain.
     """
     try:
-        evidence = evidence_service.transfer_custody(evidence_id, transfer, user)
+        evidence = await evidence_service.transfer_custody(evidence_id, transfer, user)
         if not evidence:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -115,19 +395,59 @@ async def transfer_custody(
             detail=str(e)
         )
 
+@router.post("/{evidence_id}/archive", response_model=EvidenceResponse)
+async def archive_evidence(
+    evidence_id: str,
+    user: User = Depends(get_current_user)
+):
+    """
+    Archive evidence.
+    
+    Only the current custodian can archive evidence. Archiving is
+    recorded on blockchain, and the stored file is compressed in the
+    background; downloads and verification are unaffected.
+    """
+    try:
+        evidence = await evidence_service.archive_evidence(evidence_id, user)
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not evidence:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Evidence {evidence_id} not found"
+        )
+    return evidence
+
 @router.post("/{evidence_id}/verify")
 async def verify_evidence(
     evidence_id: str,
+    force: bool = False,
+    mode: Literal["sha256", "merkle"] = "sha256",
+    full_scan: bool = False,
     user: User = Depends(get_current_user)
 ):
     """
     Verify evidence integrity.
     
-    - Recalculates SHA-256 hash
+    - Recalculates SHA-256 hash (or reuses a recently verified digest
+      of the unchanged file; pass force=true to always re-hash)
+    - With mode=merkle, re-hashes the file's chunks in parallel against
+      its Merkle manifest and reports modified byte ranges (stops at the
+      first bad chunk unless full_scan=true)
     - Compares with blockchain record
-    - Returns match/mismatch status
+    - Returns match/mismatch status and whether the digest came from cache
     """
-    result = evidence_service.verify_integrity(evidence_id, user)
+    result = await evidence_service.verify_integrity(
+        evidence_id, user, force=force, mode=mode, full_scan=full_scan
+    )
     if "error" in result and not result.get("verified"):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -135,20 +455,70 @@ async def verify_evidence(
         )
     return result
 
+@router.get("/{evidence_id}/access-logs", response_model=List[AccessLog])
+async def get_evidence_access_logs(
+    evidence_id: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    user: User = Depends(get_current_user)
+):
+    """
+    Get the access log of evidence, oldest first.
+    
+    Optionally limited to entries at or after "from" and before "to".
+    """
+    logs = await evidence_service.get_access_logs(evidence_id, start=start, end=end)
+    if logs is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Evidence {evidence_id} not found"
+        )
+    return logs
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
 @router.get("/{evidence_id}/history", response_model=CustodyHistory)
 async def get_evidence_history(
     evidence_id: str,
+    response: Response,
+    after: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    if_none_match: Optional[str] = Header(None),
     user: User = Depends(get_current_user)
 ):
     """
-    Get full chain-of-custody history for evidence.
+    Get chain-of-custody history for evidence.
     
-    Returns timeline of all events from blockchain.
+    Returns timeline of events from blockchain. Without a limit the
+    full timeline is returned; with limit=N at most N events after the
+    "after" cursor are returned, plus next_cursor while more remain.
+    
+    Responses carry an ETag; pollers sending it back in If-None-Match
+    get an empty 304 until the timeline changes. The ETag is checked
+    against the ledger as it stands, without waiting for views still
+    being queued, so polls answered with 304 never wait on the writer.
     """
-    history = evidence_service.get_custody_history(evidence_id)
-    if not history:
+    timeline = await evidence_service.get_custody_timeline(
+        evidence_id, include_queued=if_none_match is None
+    )
+    if not timeline:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Evidence {evidence_id} not found"
         )
-    return history
+    if if_none_match is not None:
+        etag = timeline.etag(after, limit)
+        if _etag_matches(if_none_match, etag):
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        # Changed: include queued views before answering in full
+        timeline = await evidence_service.get_custody_timeline(evidence_id) or timeline
+    etag = timeline.etag(after, limit)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    return timeline.page(after, limit)
@@ -0,0 +1,205 @@
+"""Ranged File Response - Stream a stored file with HTTP Range support"""
+import os
+import time
+import hashlib
+from email.utils import formatdate
+from typing import Awaitable, Callable, Optional, Tuple
+from urllib.parse import quote
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from ..services.compression_codecs import Codec
+from ..services.worker_pool import WorkerPool
+
+# Bytes read per chunk when the server cannot send the file itself
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get("DOWNLOAD_CHUNK_SIZE", 1024 * 1024))
+
+# ASGI extension for handing a file descriptor to the server (sendfile)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def file_etag(digest: str, stat_result: os.stat_result) -> str:
+    """
+    Strong ETag for the file as it is stored now.
+
+    The registered digest alone would keep matching after the stored
+    bytes changed, so the file's identity (inode, size, mtime and ctime,
+    as the verification cache keys it) is folded in; any rewrite of the
+    file gives a new validator and a stale If-Range falls back to 200.
+    """
+    return '"{}-{:x}-{:x}-{:x}-{:x}"'.format(
+        digest, stat_result.st_ino, stat_result.st_size,
+        stat_result.st_mtime_ns, stat_result.st_ctime_ns
+    )
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into an inclusive (first, last) byte range.
+
+    Only single byte ranges are honoured; a missing, malformed or
+    multi-range header returns None and the whole file is sent, which
+    RFC 9110 allows.
+
+    Raises:
+        ValueError: If the range lies entirely past the end of the file
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[len("bytes="):].strip().partition("-")
+    if not sep or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    start, end = int(first), int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    return start, min(end, size - 1)
+
+
+class RangedFileResponse(Response):
+    """
+    Send a file, or one byte range of it, without loading it into memory.
+
+    If the server offers the ASGI zero-copy send extension the open file
+    descriptor is handed to it, so the kernel copies the bytes straight
+    to the socket (sendfile). Otherwise the file is read in
+    DOWNLOAD_CHUNK_SIZE chunks on the worker pool.
+
+    A Range header is answered with 206 (or 416 when unsatisfiable)
+    unless an If-Range validator no longer matches. With on_complete
+    set, a full-file response is hashed as it is sent (this needs the
+    chunked path) and the SHA-256 hex digest is passed to on_complete
+    once the last byte has gone out.
+
+    A file compressed with codec is decompressed as it is sent; size is
+    then the original size, and ranges are served by decompressing up
+    to their start.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        pool: WorkerPool,
+        etag: str,
+        media_type: str,
+        filename: str,
+        range_header: Optional[str] = None,
+        if_range: Optional[str] = None,
+        on_complete: Optional[Callable[[str], Awaitable[None]]] = None,
+        codec: Optional[Codec] = None,
+        size: Optional[int] = None
+    ):
+        self.path = path
+        self.pool = pool
+        self.media_type = media_type
+        self.background = None
+        self.codec = codec
+        if size is None:
+            size = stat_result.st_size
+        last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+
+        # A stale If-Range validator means "send me the whole new file".
+        # A date is only a strong validator once a second has passed since
+        # the modification it names (RFC 9110 8.8.2.2)
+        validators = [etag]
+        if stat_result.st_mtime <= time.time() - 1:
+            validators.append(last_modified)
+        if if_range is not None and if_range.strip() not in validators:
+            range_header = None
+
+        self.status_code = 200
+        self.start, self.end = 0, size - 1
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+            "content-disposition": f"inline; filename*=UTF-8''{quote(filename)}"
+        }
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            self.status_code = 416
+            self.start, self.end = 0, -1
+            headers["content-range"] = f"bytes */{size}"
+        else:
+            if byte_range is not None:
+                self.status_code = 206
+                self.start, self.end = byte_range
+                headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+        self.count = self.end - self.start + 1
+        headers["content-length"] = str(self.count)
+        self.init_headers(headers)
+
+        # Only a complete body can be checked against the registered hash
+        self.on_complete = on_complete if self.status_code == 200 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        if self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            if self.on_complete is not None:
+                await self.on_complete(hashlib.sha256().hexdigest())
+            return
+
+        if self.codec is not None:
+            f = await self.pool.run(self.codec.open_read, self.path)
+        else:
+            f = await self.pool.run(open, self.path, "rb", 0)
+        try:
+            if (
+                self.on_complete is None
+                and self.codec is None
+                and ZEROCOPY_EXTENSION in scope.get("extensions", {})
+            ):
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": self.count,
+                    "more_body": False
+                })
+                return
+            digest = await self._send_chunks(f, send)
+        finally:
+            await self.pool.run(f.close)
+        if self.on_complete is not None:
+            await self.on_complete(digest)
+
+    @staticmethod
+    def _read_chunk(f, offset: int, length: int, sha256_hash, sequential: bool = False) -> bytes:
+        """Read (and optionally hash) one chunk; runs on the worker pool"""
+        chunk = f.read(length) if sequential else os.pread(f.fileno(), length, offset)
+        if sha256_hash is not None:
+            sha256_hash.update(chunk)
+        return chunk
+
+    async def _send_chunks(self, f, send: Send) -> Optional[str]:
+        sha256_hash = hashlib.sha256() if self.on_complete is not None else None
+        offset, remaining = self.start, self.count
+        sequential = self.codec is not None
+        if sequential and offset:
+            # Decompresses (and discards) everything before the range
+            await self.pool.run(f.seek, offset)
+        while remaining > 0:
+            chunk = await self.pool.run(
+                self._read_chunk, f, offset, min(DOWNLOAD_CHUNK_SIZE, remaining), sha256_hash, sequential
+            )
+            if not chunk:
+                raise RuntimeError(f"{self.path} shrank while it was being sent")
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        return sha256_hash.hexdigest() if sha256_hash is not None else None
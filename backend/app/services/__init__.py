@@ -3,5 +3,15 @@ from .auth_service import AuthService
 from .evidence_service import EvidenceService
 from .blockchain_service import BlockchainService
 from .storage_service import StorageService
+from .worker_pool import WorkerPool
+from .verification_cache import VerificationCache
+from .merkle import MerkleBuilder
+from .ledger_log import LedgerLog
+from .fabric_gateway import BlockchainGateway, LocalFabricGateway
+from .access_event_queue import AccessEventQueue
+from .token_cache import TokenCache
+from .custody_timeline import CustodyTimeline
+from .archiver import EvidenceArchiver
+from .metrics import MetricsMiddleware, MetricsRegistry
 
-__all__ = ["AuthService", "EvidenceService", "BlockchainService", "StorageService"]
+__all__ = ["AuthService", "EvidenceService", "BlockchainService", "StorageService", "WorkerPool", "VerificationCache", "MerkleBuilder", "LedgerLog", "BlockchainGateway", "LocalFabricGateway", "AccessEventQueue", "TokenCache", "CustodyTimeline", "EvidenceArchiver", "MetricsMiddleware", "MetricsRegistry"]
@@ -0,0 +1,148 @@
+"""Access Event Queue - Write-behind recording of read-triggered access events"""
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Events that may wait to be written before recording an access blocks
+ACCESS_EVENT_QUEUE_CAPACITY = int(os.environ.get("ACCESS_EVENT_QUEUE_CAPACITY", 10000))
+# Events written per batch...
+ACCESS_EVENT_BATCH_SIZE = int(os.environ.get("ACCESS_EVENT_BATCH_SIZE", 256))
+# ...or this long after the first event of a batch arrived (milliseconds)
+ACCESS_EVENT_FLUSH_INTERVAL_MS = float(os.environ.get("ACCESS_EVENT_FLUSH_INTERVAL_MS", 20))
+# "async": return once queued; "sync": return once the event's batch is written
+ACCESS_EVENT_DURABILITY = os.environ.get("ACCESS_EVENT_DURABILITY", "async").lower()
+
+DURABILITY_MODES = ("async", "sync")
+
+
+class AccessEvent(NamedTuple):
+    """An access to record; the timestamp is taken when it happens, not when written"""
+    evidence_id: str
+    actor_role: str
+    actor_name: str
+    timestamp: datetime
+
+
+class AccessEventQueue:
+    """
+    Bounded queue of access events, written in batches by a background task.
+
+    put() only queues the event, so the request that triggered it does not
+    wait for the ledger or the access-log store. The writer task takes up
+    to batch_size events, or whatever arrived within flush_interval_ms of
+    the first, and hands them to write in one call. When capacity events
+    are waiting, put() blocks until the writer catches up.
+
+    In "sync" durability mode put() also waits for its batch to be
+    written (and raises if the write failed); requests still share the
+    cost of a batch. Call flush() before reading the events back and
+    close() on shutdown to write everything still queued.
+
+    flush() waits only for the events queued before it was called: it
+    queues a marker that ends the writer's current batch at once and is
+    resolved when that batch is written, so readers neither wait out the
+    batching window nor wait for events arriving after them.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[AccessEvent]], Awaitable[None]],
+        capacity: int = ACCESS_EVENT_QUEUE_CAPACITY,
+        batch_size: int = ACCESS_EVENT_BATCH_SIZE,
+        flush_interval_ms: float = ACCESS_EVENT_FLUSH_INTERVAL_MS,
+        durability: str = ACCESS_EVENT_DURABILITY
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown access event durability: {durability}")
+        self._write = write
+        self.capacity = max(1, capacity)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self.durability = durability
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # Events queued and events written (or dropped after a failed write) so far
+        self._queued = 0
+        self._written = 0
+
+    def __len__(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> None:
+        """Create the queue and writer task for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queued = self._written = 0
+        self._queue = asyncio.Queue(maxsize=self.capacity)
+        self._writer = loop.create_task(self._run_writer())
+
+    async def put(self, event: AccessEvent) -> None:
+        """Queue an event for writing"""
+        self._ensure_started()
+        written = self._loop.create_future() if self.durability == "sync" else None
+        await self._queue.put((event, written))
+        self._queued += 1
+        if written is not None:
+            await written
+
+    async def _next_batch(self) -> List[Tuple[Optional[AccessEvent], Optional[asyncio.Future]]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.flush_interval
+        # A flush marker (event None) ends the batch so its reader waits no longer
+        while len(batch) < self.batch_size and batch[-1][0] is not None:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_writer(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            events = [event for event, _ in batch if event is not None]
+            error: Optional[BaseException] = None
+            if events:
+                try:
+                    await self._write(events)
+                except Exception as exc:
+                    error = exc
+                    logger.exception("Writing %d access events failed", len(events))
+            self._written += len(events)
+            for event, written in batch:
+                if written is not None and not written.done():
+                    # A failed write is logged, not raised to flush() readers
+                    if error is not None and event is not None:
+                        written.set_exception(error)
+                    else:
+                        written.set_result(None)
+                self._queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until every event queued before this call has been written"""
+        if self._loop is not asyncio.get_running_loop() or self._written >= self._queued:
+            return
+        marker = self._loop.create_future()
+        await self._queue.put((None, marker))
+        await marker
+
+    async def close(self) -> None:
+        """Write everything still queued, then stop the writer"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        self._writer.cancel()
+        self._writer = None
+        self._loop = None
@@ -0,0 +1,158 @@
+"""Evidence Archiver - Background compression of archived evidence files"""
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from ..models.evidence import Evidence, StorageStats
+from ..repositories.base import EvidenceRepository
+from .compression_codecs import STORAGE_ARCHIVE_CODEC, STORAGE_ARCHIVE_LEVEL, get_codec
+from .content_store import is_blob_name
+from .storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background archival passes (0 disables the job)
+ARCHIVE_INTERVAL_SECONDS = float(os.environ.get("ARCHIVE_INTERVAL_SECONDS", 3600))
+# Leave a file uncompressed unless compression saves at least this fraction of it
+ARCHIVE_MIN_SAVINGS = float(os.environ.get("ARCHIVE_MIN_SAVINGS", 0.1))
+# Files smaller than this are not worth compressing (bytes)
+ARCHIVE_MIN_FILE_SIZE = int(os.environ.get("ARCHIVE_MIN_FILE_SIZE", 4096))
+# Archived evidence records fetched per page during a pass
+ARCHIVE_PAGE_SIZE = 500
+
+
+class EvidenceArchiver:
+    """
+    Compresses the stored files of archived evidence in the background.
+
+    Each pass pages through evidence with status "archived" and
+    compresses every file not compressed yet, one at a time on the
+    storage pool so uploads and downloads keep most of its workers.
+    Reads decompress transparently (StorageService.open_file), so the
+    registered SHA-256 keeps verifying. Files that do not compress well,
+    or no longer match their registered hash, are remembered and not
+    retried by later passes. A content-addressed blob is only compressed
+    once every evidence record referencing it is archived, so live
+    evidence sharing its content keeps plain reads.
+    """
+
+    def __init__(
+        self,
+        repository: EvidenceRepository,
+        storage: StorageService,
+        codec: str = STORAGE_ARCHIVE_CODEC,
+        level: Optional[int] = STORAGE_ARCHIVE_LEVEL,
+        interval_seconds: float = ARCHIVE_INTERVAL_SECONDS,
+        min_savings: float = ARCHIVE_MIN_SAVINGS,
+        min_file_size: int = ARCHIVE_MIN_FILE_SIZE
+    ):
+        self.repository = repository
+        self.storage = storage
+        self.codec = get_codec(codec)
+        self.level = level
+        self.interval_seconds = interval_seconds
+        self.min_savings = min_savings
+        self.min_file_size = min_file_size
+        # Totals over the archived files, as of the last complete pass
+        self.stats = StorageStats(codec=self.codec.name)
+        self._skipped: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Run a pass now and then every interval_seconds (unless that is 0)"""
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Archival pass failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> StorageStats:
+        """Run one archival pass and return the refreshed statistics"""
+        async with self._lock:
+            stats = StorageStats(codec=self.codec.name)
+            # Shared blobs wait until the whole pass has counted their archived references
+            blobs: Dict[str, Evidence] = {}
+            archived_refs: Dict[str, int] = {}
+            cursor = None
+            while True:
+                page, cursor = await self.repository.list_evidence(
+                    {"status": "archived"}, cursor=cursor, limit=ARCHIVE_PAGE_SIZE
+                )
+                for evidence in page:
+                    if is_blob_name(evidence.filename):
+                        blobs.setdefault(evidence.filename, evidence)
+                        archived_refs[evidence.filename] = archived_refs.get(evidence.filename, 0) + 1
+                    else:
+                        await self._archive(evidence, stats)
+                if cursor is None:
+                    break
+            for filename, evidence in blobs.items():
+                await self._archive(evidence, stats, archived_refs[filename])
+            stats.bytes_saved = stats.original_bytes - stats.stored_bytes
+            stats.last_run_at = datetime.utcnow()
+            self.stats = stats
+            return stats
+
+    async def _archive(
+        self,
+        evidence: Evidence,
+        stats: StorageStats,
+        archived_refs: Optional[int] = None
+    ) -> None:
+        """
+        Compress one archived file if needed and count it in stats.
+        
+        archived_refs is the number of archived records sharing a
+        content-addressed blob; the blob is left alone while it has
+        other (live) references.
+        """
+        pool = self.storage.pool
+        try:
+            file_path, codec = await pool.run(self.storage.locate, evidence.filename)
+            if (
+                codec is None
+                and evidence.filename not in self._skipped
+                and evidence.file_size >= self.min_file_size
+                and (
+                    archived_refs is None
+                    or await pool.run(self.storage.content.ref_count, evidence.filename) <= archived_refs
+                )
+            ):
+                try:
+                    compressed = await pool.run(
+                        self.storage.compress_file, evidence.filename, evidence.file_hash,
+                        self.codec, self.level, self.min_savings
+                    )
+                except ValueError as e:
+                    logger.warning("Not compressing evidence %s: %s", evidence.id, e)
+                    compressed = None
+                if compressed is None:
+                    self._skipped.add(evidence.filename)
+                else:
+                    file_path, codec = await pool.run(self.storage.locate, evidence.filename)
+            stored_size = (await pool.run(os.stat, file_path)).st_size
+        except FileNotFoundError:
+            return
+        stats.archived_files += 1
+        stats.original_bytes += evidence.file_size
+        stats.stored_bytes += stored_size
+        if codec is not None:
+            stats.compressed_files += 1
+
+    async def close(self) -> None:
+        """Stop the background job"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
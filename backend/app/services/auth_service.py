@@ -6,6 +6,7 @@ import os
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from ..models.auth import User, RoleType
+from .token_cache import TokenCache
 
 # Security scheme
 security = HTTPBearer()
@@ -14,6 +15,8 @@ security = HTTPBearer()
 SECRET_KEY = os.environ.get("JWT_SECRET", "hackathon-secret-key-2025")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
+# Claims every token issued by create_access_token carries; others are rejected
+REQUIRED_CLAIMS = ["exp", "sub", "username", "role", "full_name"]
 
 # Mock user database (simplified for hackathon)
 MOCK_USERS = {
@@ -47,6 +50,9 @@ MOCK_USERS = {
     )
 }
 
+# Verified tokens, so repeat requests skip signature checks and model building
+token_cache = TokenCache()
+
 class AuthService:
     """Authentication service for JWT management"""
     
@@ -88,16 +94,23 @@ class AuthService:
     @staticmethod
     def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
         """Verify JWT token and return user"""
+        token = credentials.credentials
+        user = token_cache.get(token)
+        if user is not None:
+            return user
         try:
-            token = credentials.credentials
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = jwt.decode(
+                token, SECRET_KEY, algorithms=[ALGORITHM], options={"require": REQUIRED_CLAIMS}
+            )
             
-            return User(
+            user = User(
                 id=payload["sub"],
                 username=payload["username"],
                 role=payload["role"],
                 full_name=payload["full_name"]
             )
+            token_cache.put(token, user, payload["exp"])
+            return user
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -109,6 +122,16 @@ class AuthService:
                 detail="Invalid token"
             )
     
+    @staticmethod
+    def revoke_token(token: str) -> None:
+        """Revocation hook: forget a cached token so it is verified again"""
+        token_cache.evict(token)
+    
+    @staticmethod
+    def revoke_user_tokens(user_id: str) -> None:
+        """Revocation hook: forget every cached token of a user"""
+        token_cache.evict_user(user_id)
+    
     @staticmethod
     def require_roles(*allowed_roles: RoleType):
         """Dependency to require specific roles"""
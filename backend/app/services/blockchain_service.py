@@ -1,8 +1,22 @@
 """Mock Blockchain Service - Simulates Hyperledger Fabric interactions"""
+import os
+import json
+import time
 import uuid
 import hashlib
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from .ledger_log import LEDGER_ENABLED, LedgerLog
+from .merkle import build_root, hash_leaf
+from .metrics import LEDGER_APPEND_SECONDS
+
+# Seal the open block once it holds this many transactions
+BLOCK_MAX_TRANSACTIONS = int(os.environ.get("BLOCK_MAX_TRANSACTIONS", 100))
+# ...or once its first transaction is this old (milliseconds)
+BLOCK_MAX_AGE_MS = float(os.environ.get("BLOCK_MAX_AGE_MS", 2000))
+
+# prev_hash of the first block
+GENESIS_HASH = "0" * 64
 
 class BlockchainService:
     """
@@ -10,12 +24,226 @@ class BlockchainService:
     In production, this would connect to the actual Fabric Gateway SDK.
     """
     
-    def __init__(self):
-        """Initialize mock blockchain state"""
+    def __init__(self, log: Optional[LedgerLog] = None):
+        """
+        Initialize mock blockchain state.
+        
+        Args:
+            log: Durable append-only log to persist transactions to. The
+                in-memory state is rebuilt from it on startup. Without a
+                log the ledger lives in memory only.
+        """
         # In-memory ledger (simulates blockchain state)
         self._ledger: Dict[str, Dict[str, Any]] = {}
         # Transaction log
         self._transactions: list = []
+        # Per transaction, the position of its event in the evidence
+        # record's event list (None if it has none), so (evidence_id,
+        # sequence) addresses an event directly
+        self._tx_sequences: List[Optional[int]] = []
+        # tx_hash -> position in the transaction log
+        self._tx_index: Dict[str, int] = {}
+        # Sealed blocks, and leaf digests of the transactions not yet sealed
+        self._blocks: List[Dict[str, Any]] = []
+        self._open_block: List[str] = []
+        self._open_block_started = 0.0
+        # Number of leading blocks already checked by verify_chain
+        self._verified_height = 0
+        # Log sequence number of the last transaction committed (0 without a log)
+        self.last_sequence = 0
+        self._log = log
+        if log is not None:
+            for entry in log.replay():
+                self._apply(entry)
+    
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Apply one transaction (or sealed block) entry to the in-memory state"""
+        if "block" in entry:
+            self._blocks.append(entry["block"])
+            self._open_block = []
+            return
+        tx = entry["tx"]
+        evidence_id = tx["evidence_id"]
+        sequence = None
+        if tx["type"] == "CREATE":
+            self._ledger[evidence_id] = entry["record"]
+            sequence = 0
+        elif evidence_id in self._ledger:
+            record = self._ledger[evidence_id]
+            if tx["type"] == "TRANSFER":
+                record["custodian"] = entry["event"]["to_role"]
+            sequence = len(record["events"])
+            record["events"].append(entry["event"])
+        self._tx_index[tx["tx_hash"]] = len(self._transactions)
+        self._transactions.append(tx)
+        self._tx_sequences.append(sequence)
+        if not self._open_block:
+            self._open_block_started = time.monotonic()
+        self._open_block.append(self._tx_digest(len(self._transactions) - 1))
+    
+    def _commit(self, entry: Dict[str, Any]) -> None:
+        """Apply a new transaction and queue it for the next group commit"""
+        start = time.perf_counter()
+        if self._log is not None:
+            self.last_sequence = self._log.append(entry)
+        self._apply(entry)
+        self.seal_due_block()
+        LEDGER_APPEND_SECONDS.observe(time.perf_counter() - start)
+    
+    def _tx_digest(self, index: int) -> str:
+        """
+        Merkle leaf digest of a transaction as currently held in memory.
+        
+        Covers the transaction, its event and, for CREATE, the record
+        fields that never change, so editing any of them changes the digest.
+        """
+        tx = self._transactions[index]
+        payload: Dict[str, Any] = {"tx": tx}
+        sequence = self._tx_sequences[index]
+        record = self._ledger.get(tx["evidence_id"])
+        if sequence is not None and record is not None:
+            payload["event"] = record["events"][sequence]
+            if tx["type"] == "CREATE":
+                payload["record"] = {
+                    key: record.get(key)
+                    for key in ("evidence_id", "file_hash", "merkle_root", "created_at", "metadata")
+                }
+        data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hash_leaf(data.encode())
+    
+    @staticmethod
+    def _block_hash(block: Dict[str, Any]) -> str:
+        """Hash of a block header"""
+        header = {key: block[key] for key in (
+            "number", "prev_hash", "merkle_root", "tx_start", "tx_count", "sealed_at"
+        )}
+        return hashlib.sha256(json.dumps(header, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+    
+    @property
+    def seal_deadline(self) -> Optional[float]:
+        """time.monotonic() at which the open block falls due by age, or None if none is open"""
+        if not self._open_block:
+            return None
+        return self._open_block_started + BLOCK_MAX_AGE_MS / 1000
+    
+    def seal_due_block(self) -> Optional[Dict[str, Any]]:
+        """
+        Seal the open block if it is full or old enough.
+        
+        Called after every commit; the gateway also calls it at
+        seal_deadline, so a block is sealed on time even if no further
+        transaction arrives.
+        """
+        if not self._open_block:
+            return None
+        age_ms = (time.monotonic() - self._open_block_started) * 1000
+        if len(self._open_block) >= BLOCK_MAX_TRANSACTIONS or age_ms >= BLOCK_MAX_AGE_MS:
+            return self.seal_block()
+        return None
+    
+    def seal_block(self) -> Optional[Dict[str, Any]]:
+        """
+        Seal the open block now.
+        
+        The block records the Merkle root of its transactions and the
+        hash of the previous block, and is persisted like a transaction.
+        
+        Returns:
+            The sealed block, or None if no transactions were pending
+        """
+        if not self._open_block:
+            return None
+        tx_count = len(self._open_block)
+        block = {
+            "number": len(self._blocks),
+            "prev_hash": self._blocks[-1]["hash"] if self._blocks else GENESIS_HASH,
+            "merkle_root": build_root(self._open_block),
+            "tx_start": len(self._transactions) - tx_count,
+            "tx_count": tx_count,
+            "sealed_at": datetime.utcnow().isoformat()
+        }
+        block["hash"] = self._block_hash(block)
+        if self._log is not None:
+            self._log.append({"block": block})
+        self._apply({"block": block})
+        return block
+    
+    def verify_chain(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Re-check block links and transaction Merkle roots.
+        
+        Only blocks sealed since the last successful check are verified,
+        starting from that checkpoint, so audits stay fast as the ledger
+        grows. Pass full=True to re-check from genesis. Transactions in
+        the open block are counted but not checked; the check never
+        writes to the ledger.
+        
+        Returns:
+            Dict with "valid", the block height, how many blocks were
+            checked and, on failure, the first bad block and why
+        """
+        start = 0 if full else self._verified_height
+        result: Dict[str, Any] = {
+            "valid": True,
+            "height": len(self._blocks),
+            "checked_from": start,
+            "blocks_checked": 0,
+            "unsealed_transactions": len(self._open_block)
+        }
+        
+        for block in self._blocks[start:]:
+            number = block["number"]
+            expected_prev = self._blocks[number - 1]["hash"] if number else GENESIS_HASH
+            reason = None
+            if block["prev_hash"] != expected_prev:
+                reason = "previous block hash mismatch"
+            elif self._block_hash(block) != block["hash"]:
+                reason = "block header hash mismatch"
+            else:
+                leaves = [
+                    self._tx_digest(index)
+                    for index in range(block["tx_start"], block["tx_start"] + block["tx_count"])
+                ]
+                if build_root(leaves) != block["merkle_root"]:
+                    reason = "transaction Merkle root mismatch"
+            result["blocks_checked"] += 1
+            if reason is not None:
+                self._verified_height = min(self._verified_height, number)
+                return {**result, "valid": False, "invalid_block": number, "reason": reason}
+        
+        self._verified_height = len(self._blocks)
+        return result
+    
+    def size(self) -> Dict[str, int]:
+        """Number of evidence records, transactions, sealed blocks and log entries not yet durable"""
+        return {
+            "records": len(self._ledger),
+            "transactions": len(self._transactions),
+            "blocks": len(self._blocks),
+            "pending": self._log.pending if self._log is not None else 0,
+        }
+    
+    def flush(self) -> None:
+        """Block until every transaction so far is durable on disk"""
+        if self._log is not None:
+            self._log.flush()
+    
+    async def wait_durable(self, sequence: Optional[int] = None) -> None:
+        """
+        Wait until a transaction is durable on disk without blocking the event loop.
+        
+        Args:
+            sequence: Log sequence number of the transaction (the
+                last_sequence after committing it); default the latest
+        """
+        if self._log is not None:
+            await self._log.wait_durable(self.last_sequence if sequence is None else sequence)
+    
+    def close(self) -> None:
+        """Seal the open block, commit pending entries and close the ledger log"""
+        self.seal_block()
+        if self._log is not None:
+            self._log.close()
     
     def _generate_tx_hash(self, data: str) -> str:
         """Generate a mock transaction hash"""
@@ -28,7 +256,8 @@ class BlockchainService:
         evidence_id: str,
         file_hash: str,
         custodian: str,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        merkle_root: Optional[str] = None
     ) -> str:
         """
         Create a new evidence record on the blockchain.
@@ -38,6 +267,7 @@ class BlockchainService:
             file_hash: SHA-256 hash of the evidence file
             custodian: Current custodian role
             metadata: Additional metadata
+            merkle_root: Root of the file's chunk Merkle manifest, if any
             
         Returns:
             Transaction hash
@@ -47,6 +277,7 @@ class BlockchainService:
         record = {
             "evidence_id": evidence_id,
             "file_hash": file_hash,
+            "merkle_root": merkle_root,
             "custodian": custodian,
             "created_at": datetime.utcnow().isoformat(),
             "metadata": metadata,
@@ -58,12 +289,14 @@ class BlockchainService:
             }]
         }
         
-        self._ledger[evidence_id] = record
-        self._transactions.append({
-            "tx_hash": tx_hash,
-            "type": "CREATE",
-            "evidence_id": evidence_id,
-            "timestamp": datetime.utcnow().isoformat()
+        self._commit({
+            "record": record,
+            "tx": {
+                "tx_hash": tx_hash,
+                "type": "CREATE",
+                "evidence_id": evidence_id,
+                "timestamp": datetime.utcnow().isoformat()
+            }
         })
         
         return tx_hash
@@ -89,21 +322,21 @@ class BlockchainService:
         """
         tx_hash = self._generate_tx_hash(f"ACCESS:{evidence_id}:{actor}")
         
-        if evidence_id in self._ledger:
-            self._ledger[evidence_id]["events"].append({
+        self._commit({
+            "event": {
                 "type": action,
                 "timestamp": datetime.utcnow().isoformat(),
                 "actor": actor,
                 "actor_name": actor_name,
                 "tx_hash": tx_hash
-            })
-        
-        self._transactions.append({
-            "tx_hash": tx_hash,
-            "type": "ACCESS",
-            "evidence_id": evidence_id,
-            "actor": actor,
-            "timestamp": datetime.utcnow().isoformat()
+            },
+            "tx": {
+                "tx_hash": tx_hash,
+                "type": "ACCESS",
+                "evidence_id": evidence_id,
+                "actor": actor,
+                "timestamp": datetime.utcnow().isoformat()
+            }
         })
         
         return tx_hash
@@ -130,12 +363,19 @@ class BlockchainService:
             
         Returns:
             Transaction hash
+            
+        Raises:
+            PermissionError: If from_role is not the custodian on the ledger
         """
+        record = self._ledger.get(evidence_id)
+        if record is not None and record["custodian"] != from_role:
+            raise PermissionError(
+                f"Only current custodian ({record['custodian']}) can transfer custody"
+            )
         tx_hash = self._generate_tx_hash(f"TRANSFER:{evidence_id}:{from_role}:{to_role}")
         
-        if evidence_id in self._ledger:
-            self._ledger[evidence_id]["custodian"] = to_role
-            self._ledger[evidence_id]["events"].append({
+        self._commit({
+            "event": {
                 "type": "transferred",
                 "timestamp": datetime.utcnow().isoformat(),
                 "from_role": from_role,
@@ -144,15 +384,15 @@ class BlockchainService:
                 "to_name": to_name,
                 "reason": reason,
                 "tx_hash": tx_hash
-            })
-        
-        self._transactions.append({
-            "tx_hash": tx_hash,
-            "type": "TRANSFER",
-            "evidence_id": evidence_id,
-            "from": from_role,
-            "to": to_role,
-            "timestamp": datetime.utcnow().isoformat()
+            },
+            "tx": {
+                "tx_hash": tx_hash,
+                "type": "TRANSFER",
+                "evidence_id": evidence_id,
+                "from": from_role,
+                "to": to_role,
+                "timestamp": datetime.utcnow().isoformat()
+            }
         })
         
         return tx_hash
@@ -160,7 +400,8 @@ class BlockchainService:
     def verify_integrity(
         self,
         evidence_id: str,
-        current_hash: str
+        current_hash: str,
+        hash_type: str = "sha256"
     ) -> Dict[str, Any]:
         """
         Verify evidence integrity by comparing hashes.
@@ -168,6 +409,8 @@ class BlockchainService:
         Args:
             evidence_id: Evidence identifier
             current_hash: Current calculated hash
+            hash_type: "sha256" for the flat file hash or "merkle" for
+                the chunk Merkle root
             
         Returns:
             Verification result with blockchain hash
@@ -181,29 +424,35 @@ class BlockchainService:
                 "tx_hash": tx_hash
             }
         
-        original_hash = self._ledger[evidence_id]["file_hash"]
-        is_match = original_hash == current_hash
+        if hash_type == "merkle":
+            original_hash = self._ledger[evidence_id].get("merkle_root")
+        else:
+            original_hash = self._ledger[evidence_id]["file_hash"]
+        is_match = original_hash is not None and original_hash == current_hash
         
         # Log verification event
-        self._ledger[evidence_id]["events"].append({
-            "type": "verified",
-            "timestamp": datetime.utcnow().isoformat(),
-            "result": "match" if is_match else "mismatch",
-            "tx_hash": tx_hash
-        })
-        
-        self._transactions.append({
-            "tx_hash": tx_hash,
-            "type": "VERIFY",
-            "evidence_id": evidence_id,
-            "result": "match" if is_match else "mismatch",
-            "timestamp": datetime.utcnow().isoformat()
+        self._commit({
+            "event": {
+                "type": "verified",
+                "timestamp": datetime.utcnow().isoformat(),
+                "result": "match" if is_match else "mismatch",
+                "hash_type": hash_type,
+                "tx_hash": tx_hash
+            },
+            "tx": {
+                "tx_hash": tx_hash,
+                "type": "VERIFY",
+                "evidence_id": evidence_id,
+                "result": "match" if is_match else "mismatch",
+                "timestamp": datetime.utcnow().isoformat()
+            }
         })
         
         return {
             "verified": is_match,
             "original_hash": original_hash,
             "current_hash": current_hash,
+            "hash_type": hash_type,
             "match": is_match,
             "tx_hash": tx_hash,
             "message": "Integrity verified - hash matches" if is_match else "INTEGRITY ALERT - hash mismatch detected"
@@ -215,9 +464,47 @@ class BlockchainService:
             return self._ledger[evidence_id]["events"]
         return []
     
+    def get_evidence_events_page(
+        self,
+        evidence_id: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], Optional[int]]:
+        """
+        Get one page of events for an evidence record.
+        
+        Cost depends only on the page size, not on the size of the
+        ledger or of the record's history.
+        
+        Args:
+            evidence_id: Evidence identifier
+            after: Sequence number of the last event already seen
+                (None starts from the first event)
+            limit: Maximum number of events (None returns the rest)
+            
+        Returns:
+            Tuple of ([(sequence, event), ...], cursor for the next page
+            or None if this page reaches the end)
+        """
+        if evidence_id not in self._ledger:
+            return [], None
+        events = self._ledger[evidence_id]["events"]
+        start = 0 if after is None else max(after + 1, 0)
+        end = len(events) if limit is None else min(start + limit, len(events))
+        page = [(sequence, events[sequence]) for sequence in range(start, end)]
+        next_cursor = end - 1 if end < len(events) else None
+        return page, next_cursor
+    
+    def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up a transaction by its hash"""
+        index = self._tx_index.get(tx_hash)
+        if index is None:
+            return None
+        return {**self._transactions[index], "sequence": self._tx_sequences[index]}
+    
     def get_evidence_record(self, evidence_id: str) -> Optional[Dict[str, Any]]:
         """Get evidence record from blockchain"""
         return self._ledger.get(evidence_id)
 
 # Global blockchain service instance (simulates network connection)
-blockchain = BlockchainService()
+blockchain = BlockchainService(LedgerLog() if LEDGER_ENABLED else None)
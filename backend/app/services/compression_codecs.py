@@ -0,0 +1,91 @@
+"""Compression Codecs - Streaming codecs for compressed evidence files"""
+import io
+import os
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, NamedTuple, Optional, Union
+
+# Codec archived evidence files are compressed with ("gzip", "lzma", "bz2",
+# or "zstd" on Python 3.14+)
+STORAGE_ARCHIVE_CODEC = os.environ.get("STORAGE_ARCHIVE_CODEC", "gzip")
+# Compression level (unset uses the codec's default)
+STORAGE_ARCHIVE_LEVEL = int(os.environ["STORAGE_ARCHIVE_LEVEL"]) if os.environ.get("STORAGE_ARCHIVE_LEVEL") else None
+# Leading bytes compressed first to estimate whether a file is worth compressing
+COMPRESSION_SAMPLE_BYTES = 1024 * 1024
+
+# A path, or an open binary file object
+Target = Union[Path, BinaryIO]
+
+
+class Codec(NamedTuple):
+    """
+    A stdlib streaming codec.
+
+    Compressed files are stored as <filename><suffix>. Suffixes have two
+    dots, like the other sidecars, so they never clash with an uploaded
+    file's own extension (stored names keep only the last extension).
+    """
+    name: str
+    suffix: str
+    # open_read(target) -> binary file object yielding the original bytes
+    open_read: Callable[[Target], BinaryIO]
+    # open_write(target, level or None) -> binary file object that compresses
+    open_write: Callable[[Target, Optional[int]], BinaryIO]
+
+
+CODECS: Dict[str, Codec] = {
+    "gzip": Codec(
+        "gzip", ".archive.gz",
+        lambda path: gzip.open(path, "rb"),
+        lambda path, level: gzip.open(path, "wb", compresslevel=6 if level is None else level)
+    ),
+    "lzma": Codec(
+        "lzma", ".archive.xz",
+        lambda path: lzma.open(path, "rb"),
+        lambda path, level: lzma.open(path, "wb", preset=level)
+    ),
+    "bz2": Codec(
+        "bz2", ".archive.bz2",
+        lambda path: bz2.open(path, "rb"),
+        lambda path, level: bz2.open(path, "wb", compresslevel=9 if level is None else level)
+    ),
+}
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+if zstd is not None:
+    CODECS["zstd"] = Codec(
+        "zstd", ".archive.zst",
+        lambda path: zstd.open(path, "rb"),
+        lambda path, level: zstd.open(path, "wb", level=level)
+    )
+
+# Suffixes of compressed files, checked when a stored file is not found as-is
+COMPRESSED_SUFFIXES = tuple(codec.suffix for codec in CODECS.values())
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Look up a codec by name.
+
+    Raises:
+        ValueError: If the codec is unknown or unavailable here
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown compression codec {name!r} (available: {', '.join(CODECS)})") from None
+
+
+def compression_ratio(codec: Codec, data: bytes, level: Optional[int] = None) -> float:
+    """Compressed size of data as a fraction of its size"""
+    if not data:
+        return 1.0
+    buffer = io.BytesIO()
+    with codec.open_write(buffer, level) as f:
+        f.write(data)
+    return len(buffer.getvalue()) / len(data)
@@ -0,0 +1,147 @@
+"""Content Store - Deduplicated, reference-counted blobs keyed by SHA-256"""
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Store uploads as shared blobs named by their SHA-256 hash
+STORAGE_CONTENT_ADDRESSED = os.environ.get("STORAGE_CONTENT_ADDRESSED", "false").lower() in ("1", "true", "yes")
+# Leading bytes whose hash is used to spot a likely duplicate while uploading
+CONTENT_HEAD_BYTES = 64 * 1024
+
+_REFS_SUFFIX = ".refs.json"
+
+
+def head_digest(data) -> str:
+    """Digest of a file's leading CONTENT_HEAD_BYTES, for duplicate candidates"""
+    return hashlib.sha256(data[:CONTENT_HEAD_BYTES]).hexdigest()
+
+
+def blob_name(file_hash: str) -> str:
+    """Stored filename of the blob holding content with this hash"""
+    return f"sha256-{file_hash}"
+
+
+def is_blob_name(filename: str) -> bool:
+    return filename.startswith("sha256-")
+
+
+class ContentStore:
+    """
+    Reference counts for content-addressed blobs.
+
+    Each blob has a small sidecar (<blob>.refs.json) holding its reference
+    count, size and head digest, replaced atomically on every change. The
+    head digests of all blobs are indexed in memory (loaded on first use)
+    so an upload can be matched against an existing blob from its first
+    chunk, before anything has been written. Every method blocks and is
+    meant to run on the storage worker pool.
+    """
+
+    def __init__(self, resolve: Callable[[str, str], Path], directory: Path):
+        # resolve(blob name, suffix) -> path of the blob (suffix "") or a sidecar
+        self._resolve = resolve
+        self.directory = directory
+        self._heads: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def _refs_path(self, name: str) -> Path:
+        return self._resolve(name, _REFS_SUFFIX)
+
+    def _read_refs(self, name: str) -> Optional[Dict[str, object]]:
+        try:
+            with open(self._refs_path(name)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_refs(self, name: str, refs: Dict[str, object]) -> None:
+        path = self._refs_path(name)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(refs, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _head_index(self) -> Dict[str, str]:
+        if self._heads is None:
+            heads: Dict[str, str] = {}
+            if self.directory.exists():
+                for refs_path in self.directory.rglob(f"sha256-*{_REFS_SUFFIX}"):
+                    with open(refs_path) as f:
+                        heads[json.load(f)["head"]] = refs_path.name[:-len(_REFS_SUFFIX)]
+            self._heads = heads
+        return self._heads
+
+    def candidate(self, head: str) -> Optional[str]:
+        """Name of an existing blob whose leading bytes hash to head, if any"""
+        with self._lock:
+            return self._head_index().get(head)
+
+    def add_ref(self, file_hash: str) -> Optional[str]:
+        """Take another reference on an existing blob; None if there is none"""
+        name = blob_name(file_hash)
+        with self._lock:
+            refs = self._read_refs(name)
+            if refs is None:
+                return None
+            refs["refs"] += 1
+            self._write_refs(name, refs)
+        return name
+
+    def adopt(self, part_path: Path, file_hash: str, size: int, head: str) -> str:
+        """
+        Turn a fully written temporary file into a blob reference.
+
+        If the content is already stored the temporary file is dropped
+        and the existing blob gains a reference instead.
+        """
+        name = blob_name(file_hash)
+        with self._lock:
+            refs = self._read_refs(name)
+            if refs is not None:
+                refs["refs"] += 1
+                self._write_refs(name, refs)
+                part_path.unlink(missing_ok=True)
+                return name
+            blob_path = self._resolve(name, "")
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part_path, blob_path)
+            self._write_refs(name, {"refs": 1, "size": size, "head": head})
+            self._head_index()[head] = name
+        return name
+
+    def release(self, name: str) -> bool:
+        """
+        Drop one reference to a blob.
+
+        Returns:
+            True if that was the last reference and the blob was deleted
+        """
+        with self._lock:
+            refs = self._read_refs(name)
+            if refs is None:
+                return False
+            refs["refs"] -= 1
+            if refs["refs"] > 0:
+                self._write_refs(name, refs)
+                return False
+            self._resolve(name, "").unlink(missing_ok=True)
+            self._refs_path(name).unlink(missing_ok=True)
+            heads = self._head_index()
+            if heads.get(refs["head"]) == name:
+                del heads[refs["head"]]
+        return True
+
+    def relocate_refs(self, path: Path, target: Path) -> bool:
+        """Move a reference sidecar (e.g. into its shard) unless the target exists"""
+        with self._lock:
+            if target.exists():
+                return False
+            os.replace(path, target)
+            return True
+
+    def ref_count(self, name: str) -> int:
+        refs = self._read_refs(name)
+        return refs["refs"] if refs is not None else 0
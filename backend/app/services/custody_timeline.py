@@ -0,0 +1,102 @@
+"""Custody Timeline - Materialized per-evidence custody history"""
+import os
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.evidence import CustodyHistory, CustodyHistoryItem
+
+# Evidence records whose timelines are kept materialized
+TIMELINE_CACHE_MAX_ENTRIES = int(os.environ.get("TIMELINE_CACHE_MAX_ENTRIES", 10000))
+
+
+def history_item(sequence: int, event: Dict[str, Any]) -> CustodyHistoryItem:
+    """Convert one ledger event to a history item"""
+    return CustodyHistoryItem(
+        sequence=sequence,
+        event=event.get("type", "unknown"),
+        actor_role=event.get("to_role") or event.get("actor", "unknown"),
+        actor_name=event.get("to_name") or event.get("actor_name", "System"),
+        details=event.get("reason") or event.get("result"),
+        timestamp=datetime.fromisoformat(event["timestamp"]),
+        blockchain_tx=event.get("tx_hash")
+    )
+
+
+class CustodyTimeline:
+    """
+    The custody history of one evidence record, converted once.
+
+    Ledger events are append-only and addressed by sequence number, so
+    the timeline only ever grows at the end: extend() converts just the
+    events past the last one held. The version is the number of events,
+    and the ETag also covers the last transaction hash, so it changes
+    whenever the timeline does.
+    """
+
+    def __init__(self, evidence_id: str):
+        self.evidence_id = evidence_id
+        self.items: List[CustodyHistoryItem] = []
+
+    @property
+    def version(self) -> int:
+        return len(self.items)
+
+    @property
+    def last_sequence(self) -> Optional[int]:
+        """Sequence of the last event held (None while empty)"""
+        return len(self.items) - 1 if self.items else None
+
+    def extend(self, events: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Append new (sequence, event) pairs, skipping any already held"""
+        for sequence, event in events:
+            if sequence == len(self.items):
+                self.items.append(history_item(sequence, event))
+
+    def etag(self, after: Optional[int] = None, limit: Optional[int] = None) -> str:
+        """Entity tag of one page of this timeline at its current version"""
+        last_tx = self.items[-1].blockchain_tx if self.items else ""
+        digest = hashlib.sha256(
+            f"{self.evidence_id}:{self.version}:{last_tx}:{after}:{limit}".encode()
+        ).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def page(self, after: Optional[int] = None, limit: Optional[int] = None) -> CustodyHistory:
+        """
+        Get one page of the timeline.
+
+        Args:
+            after: Sequence number of the last event already seen
+            limit: Maximum number of events (None returns the rest)
+        """
+        start = 0 if after is None else max(after + 1, 0)
+        end = len(self.items) if limit is None else min(start + limit, len(self.items))
+        return CustodyHistory(
+            evidence_id=self.evidence_id,
+            timeline=self.items[start:end],
+            next_cursor=end - 1 if end < len(self.items) else None,
+            version=self.version
+        )
+
+
+class TimelineCache:
+    """Bounded LRU of materialized timelines; evicted ones are rebuilt on demand"""
+
+    def __init__(self, max_entries: int = TIMELINE_CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._timelines: "OrderedDict[str, CustodyTimeline]" = OrderedDict()
+
+    def get(self, evidence_id: str) -> CustodyTimeline:
+        """Get an evidence record's timeline, starting an empty one if needed"""
+        timeline = self._timelines.get(evidence_id)
+        if timeline is not None:
+            self._timelines.move_to_end(evidence_id)
+            return timeline
+        timeline = self._timelines[evidence_id] = CustodyTimeline(evidence_id)
+        while len(self._timelines) > self.max_entries:
+            self._timelines.popitem(last=False)
+        return timeline
+
+    def __len__(self) -> int:
+        return len(self._timelines)
@@ -1,23 +1,77 @@
 """Evidence Service - Business logic for evidence management"""
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+import os
+import asyncio
+import weakref
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
+from pathlib import Path
 from fastapi import UploadFile
 from ..models.evidence import (
     Evidence, EvidenceCreate, CustodyTransfer, 
-    AccessLog, CustodyHistoryItem, CustodyHistory
+    AccessLog, CustodyHistory, UploadSessionCreate, UploadSessionStatus, StorageStats
 )
 from ..models.auth import User
-from .storage_service import StorageService
-from .blockchain_service import blockchain
+from ..repositories import EvidenceRepository, create_repository
+from ..repositories.evidence_index import SortOrder
+from .storage_service import UPLOAD_CHUNK_SIZE, StorageService
+from .worker_pool import WorkerPool, hash_pool
+from .verification_cache import FileIdentity, VerificationCache
+from .merkle import (
+    MERKLE_ENABLED, MERKLE_MIN_FILE_SIZE, MerkleBuilder, manifest_matches, verify_file_chunks, verify_stream_chunks
+)
+from .fabric_gateway import BlockchainGateway, gateway
+from .access_event_queue import AccessEvent, AccessEventQueue
+from .custody_timeline import CustodyTimeline, TimelineCache
+from .upload_sessions import UploadSessionManager
+from .compression_codecs import Codec
+from .archiver import EvidenceArchiver
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a query timestamp to the naive UTC datetimes stored on records"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 class EvidenceService:
     """Service for managing digital evidence"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        ledger: BlockchainGateway = gateway,
+        repository: Optional[EvidenceRepository] = None
+    ):
         self.storage = StorageService()
-        # In-memory evidence store (in production, use database)
-        self._evidence_store: Dict[str, Evidence] = {}
-        self._access_logs: List[AccessLog] = []
+        # Async gateway to the blockchain network
+        self.ledger = ledger
+        self.hash_pool = hash_pool
+        self.verify_cache = VerificationCache()
+        # Evidence and access-log persistence (in-memory unless configured)
+        self.repository = repository if repository is not None else create_repository(pool=self.storage.pool)
+        # Read-triggered access events, written behind the request in batches
+        self.access_events = AccessEventQueue(self._write_access_events)
+        # Custody histories converted from ledger events, extended as events arrive
+        self.timelines = TimelineCache()
+        # Resumable chunked uploads in progress
+        self.uploads = UploadSessionManager(self.storage)
+        # Background compression of archived evidence files
+        self.archiver = EvidenceArchiver(self.repository, self.storage)
+        # Per-evidence locks serializing check -> ledger submit -> save
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
+    def _lock(self, evidence_id: str) -> asyncio.Lock:
+        """
+        Lock for changes to one evidence record.
+        
+        A custody transfer awaits the ledger between checking the custodian
+        and saving the record, so without it two transfers could both pass
+        the check and fork the custody chain. Locks are dropped once no
+        request holds or waits on them.
+        """
+        lock = self._locks.get(evidence_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[evidence_id] = lock
+        return lock
     
     async def upload_evidence(
         self,
@@ -36,19 +90,36 @@ class EvidenceService:
         Returns:
             Created Evidence record
         """
-        # Read file content
-        file_bytes = await file.read()
+        # Stream file to storage and get hash (plus chunk Merkle leaves)
+        merkle = MerkleBuilder() if MERKLE_ENABLED else None
+        stored_filename, file_hash, file_size = await self.storage.store_upload(file, merkle)
         
-        # Store file and get hash
-        stored_filename, file_hash, file_size = self.storage.store_file(
-            file_bytes, file.filename
+        return await self._register_upload(
+            stored_filename, file_hash, file_size, merkle, metadata, file.filename, user
         )
+    
+    async def _register_upload(
+        self,
+        stored_filename: str,
+        file_hash: str,
+        file_size: int,
+        merkle: Optional[MerkleBuilder],
+        metadata: EvidenceCreate,
+        original_filename: str,
+        user: User
+    ) -> Evidence:
+        """
+        Create the evidence record for a stored file and register it on the ledger.
         
+        If the ledger rejects the record the stored file is deleted again
+        (a shared blob just loses this upload's reference), so failed
+        uploads do not leave unregistered files behind.
+        """
         # Create evidence record
         evidence = Evidence(
             case_id=metadata.case_id,
             filename=stored_filename,
-            original_filename=file.filename,
+            original_filename=original_filename,
             evidence_type=metadata.evidence_type,
             description=metadata.description,
             notes=metadata.notes,
@@ -58,113 +129,374 @@ class EvidenceService:
             custodian_name=user.full_name,
             status="registered"
         )
-        
-        # Register on blockchain
-        blockchain_tx = blockchain.create_evidence_record(
-            evidence_id=evidence.id,
-            file_hash=file_hash,
-            custodian=user.role,
-            metadata={
-                "case_id": metadata.case_id,
-                "description": metadata.description,
-                "evidence_type": metadata.evidence_type,
-                "uploader": user.full_name
-            }
-        )
-        evidence.blockchain_tx = blockchain_tx
+        try:
+            # Keep a Merkle manifest for files large enough to benefit
+            if merkle is not None and file_size >= MERKLE_MIN_FILE_SIZE:
+                manifest = merkle.manifest(file_size)
+                await self.storage.pool.run(self.storage.write_manifest, stored_filename, manifest)
+                evidence.merkle_root = manifest["root"]
+            
+            # Register on blockchain
+            evidence.blockchain_tx = await self.ledger.submit(
+                "create_evidence_record",
+                evidence_id=evidence.id,
+                file_hash=file_hash,
+                custodian=user.role,
+                metadata={
+                    "case_id": metadata.case_id,
+                    "description": metadata.description,
+                    "evidence_type": metadata.evidence_type,
+                    "uploader": user.full_name
+                },
+                merkle_root=evidence.merkle_root
+            )
+        except Exception:
+            await self.storage.pool.run(self.storage.delete_file, stored_filename)
+            raise
         
         # Store evidence
-        self._evidence_store[evidence.id] = evidence
+        await self.repository.save_evidence(evidence)
         
         # Log access
-        self._log_access(
+        await self._log_access(
             evidence.id, "created", user,
-            f"Evidence uploaded: {file.filename}"
+            f"Evidence uploaded: {original_filename}"
         )
         
         return evidence
     
-    def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
+    async def create_upload_session(
+        self,
+        request: UploadSessionCreate,
+        user: User
+    ) -> UploadSessionStatus:
+        """Open a resumable upload (raises ValueError if the file is too large)"""
+        session = await self.uploads.create(request, user)
+        return session.status(self.uploads.ttl_seconds)
+    
+    async def get_upload_session(self, session_id: str, user: User) -> Optional[UploadSessionStatus]:
+        """Get the progress of one of the user's uploads"""
+        session = await self.uploads.get(session_id, user)
+        if session is None:
+            return None
+        return session.status(self.uploads.ttl_seconds)
+    
+    async def write_upload_chunk(
+        self,
+        session_id: str,
+        offset: int,
+        data: AsyncIterator[bytes],
+        user: User
+    ) -> Optional[UploadSessionStatus]:
+        """
+        Write a chunk of an upload starting at offset.
+        
+        The request body is written in UPLOAD_CHUNK_SIZE pieces as it is
+        received, so memory use does not depend on the chunk size.
+        
+        Raises:
+            ValueError: If the chunk runs past the declared file size or
+                the upload is being finalized
+        """
+        session = await self.uploads.get(session_id, user)
+        if session is None:
+            return None
+        buffer = bytearray()
+        async for piece in data:
+            buffer += piece
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await self.uploads.write(session, offset, bytes(buffer))
+                offset += len(buffer)
+                buffer.clear()
+        if buffer:
+            await self.uploads.write(session, offset, bytes(buffer))
+        return session.status(self.uploads.ttl_seconds)
+    
+    async def complete_upload_session(self, session_id: str, user: User) -> Optional[Evidence]:
+        """
+        Finalize an upload and register its evidence.
+        
+        The digest and Merkle leaves were computed as chunks arrived, so
+        the file is not read again.
+        
+        Raises:
+            ValueError: If bytes are still missing
+        """
+        session = await self.uploads.get(session_id, user)
+        if session is None:
+            return None
+        await self.uploads.commit(session)
+        request = session.request
+        return await self._register_upload(
+            session.stored_filename,
+            session.sha256.hexdigest(),
+            session.size,
+            session.merkle,
+            EvidenceCreate(
+                case_id=request.case_id,
+                description=request.description,
+                evidence_type=request.evidence_type,
+                notes=request.notes
+            ),
+            request.filename,
+            user
+        )
+    
+    async def abort_upload_session(self, session_id: str, user: User) -> bool:
+        """Discard an unfinished upload"""
+        session = await self.uploads.get(session_id, user)
+        if session is None:
+            return False
+        await self.uploads.discard(session)
+        return True
+    
+    async def get_evidence(self, evidence_id: str) -> Optional[Evidence]:
         """Get evidence by ID"""
-        return self._evidence_store.get(evidence_id)
+        return await self.repository.get_evidence(evidence_id)
     
-    def get_all_evidence(self, user: User) -> List[Evidence]:
+    async def get_all_evidence(self, user: User) -> List[Evidence]:
         """Get all evidence (filtered by role permissions)"""
         # For simplicity, return all evidence for any authenticated user
-        return list(self._evidence_store.values())
+        evidence, _ = await self.repository.list_evidence()
+        return evidence
     
-    def log_access(self, evidence_id: str, user: User) -> Optional[AccessLog]:
+    async def list_evidence(
+        self,
+        user: User,
+        filters: Optional[Dict[str, str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        order: SortOrder = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Evidence], Optional[str]]:
+        """
+        Get one page of evidence matching the filters, via the secondary indexes.
+        
+        Args:
+            user: Current user
+            filters: Equality filters on case_id, custodian, status, evidence_type
+            created_after: Only evidence created at or after this time
+            created_before: Only evidence created before this time
+            order: Creation-time order
+            cursor: Cursor returned with the previous page
+            limit: Page size (None for all matches)
+            
+        Returns:
+            Tuple of (evidence page, cursor for the next page or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        return await self.repository.list_evidence(
+            filters, _to_naive_utc(created_after), _to_naive_utc(created_before), order, cursor, limit
+        )
+    
+    async def get_access_logs(
+        self,
+        evidence_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Optional[List[AccessLog]]:
+        """
+        Get the access log of an evidence record, oldest first.
+        
+        Args:
+            evidence_id: Evidence identifier
+            start: Only entries at or after this time
+            end: Only entries before this time
+            
+        Returns:
+            Access log entries, or None if the evidence does not exist
+        """
+        if not await self.repository.get_evidence(evidence_id):
+            return None
+        await self.access_events.flush()
+        return await self.repository.get_access_logs(
+            evidence_id, _to_naive_utc(start), _to_naive_utc(end)
+        )
+    
+    async def record_access(self, evidence_id: str, user: User) -> None:
+        """
+        Record a view of an existing evidence record without waiting for
+        the ledger: the event is queued and written in a later batch.
+        """
+        await self.access_events.put(AccessEvent(
+            evidence_id, user.role, user.full_name, datetime.utcnow()
+        ))
+    
+    async def _write_access_events(self, events: List[AccessEvent]) -> None:
+        """Write a batch of queued access events to the ledger and access log"""
+        # Submitted together so the batch shares one ledger group commit
+        tx_hashes = await asyncio.gather(*[
+            self.ledger.submit(
+                "log_access_event",
+                evidence_id=event.evidence_id,
+                actor=event.actor_role,
+                actor_name=event.actor_name,
+                action="accessed"
+            )
+            for event in events
+        ])
+        # ...and written to the access log in one bulk write
+        await self.repository.add_access_logs([
+            AccessLog(
+                evidence_id=event.evidence_id,
+                event_type="accessed",
+                actor_role=event.actor_role,
+                actor_name=event.actor_name,
+                details=f"Evidence viewed by {event.actor_name}",
+                timestamp=event.timestamp,
+                blockchain_tx=tx_hash
+            )
+            for event, tx_hash in zip(events, tx_hashes)
+        ])
+    
+    async def log_access(self, evidence_id: str, user: User) -> Optional[AccessLog]:
         """Log evidence access"""
-        evidence = self._evidence_store.get(evidence_id)
+        evidence = await self.repository.get_evidence(evidence_id)
         if not evidence:
             return None
         
         # Log on blockchain
-        blockchain.log_access_event(
+        await self.ledger.submit(
+            "log_access_event",
             evidence_id=evidence_id,
             actor=user.role,
             actor_name=user.full_name,
             action="accessed"
         )
         
-        return self._log_access(
+        return await self._log_access(
             evidence_id, "accessed", user,
             f"Evidence viewed by {user.full_name}"
         )
     
-    def transfer_custody(
+    async def transfer_custody(
         self,
         evidence_id: str,
         transfer: CustodyTransfer,
         user: User
     ) -> Optional[Evidence]:
         """Transfer evidence custody to another role"""
-        evidence = self._evidence_store.get(evidence_id)
-        if not evidence:
-            return None
-        
-        # Verify current user is the custodian
-        if evidence.custodian != user.role:
-            raise PermissionError(
-                f"Only current custodian ({evidence.custodian}) can transfer custody"
+        async with self._lock(evidence_id):
+            evidence = await self.repository.get_evidence(evidence_id)
+            if not evidence:
+                return None
+            
+            # Verify current user is the custodian
+            if evidence.custodian != user.role:
+                raise PermissionError(
+                    f"Only current custodian ({evidence.custodian}) can transfer custody"
+                )
+            
+            # Record on blockchain
+            blockchain_tx = await self.ledger.submit(
+                "transfer_custody",
+                evidence_id=evidence_id,
+                from_role=user.role,
+                from_name=user.full_name,
+                to_role=transfer.to_role,
+                to_name=transfer.to_name,
+                reason=transfer.reason
+            )
+            
+            # Update evidence
+            old_custodian = evidence.custodian
+            evidence = await self.repository.update_evidence(
+                evidence_id,
+                custodian=transfer.to_role,
+                custodian_name=transfer.to_name,
+                status="transferred",
+                updated_at=datetime.utcnow(),
+                blockchain_tx=blockchain_tx
             )
-        
-        # Record on blockchain
-        blockchain_tx = blockchain.transfer_custody(
-            evidence_id=evidence_id,
-            from_role=user.role,
-            from_name=user.full_name,
-            to_role=transfer.to_role,
-            to_name=transfer.to_name,
-            reason=transfer.reason
-        )
-        
-        # Update evidence
-        old_custodian = evidence.custodian
-        evidence.custodian = transfer.to_role
-        evidence.custodian_name = transfer.to_name
-        evidence.status = "transferred"
-        evidence.updated_at = datetime.utcnow()
-        evidence.blockchain_tx = blockchain_tx
         
         # Log access
-        self._log_access(
+        await self._log_access(
             evidence_id, "transferred", user,
             f"Custody transferred from {old_custodian} to {transfer.to_role}: {transfer.reason}"
         )
         
         return evidence
     
-    def verify_integrity(self, evidence_id: str, user: User) -> Dict[str, Any]:
-        """Verify evidence integrity"""
-        evidence = self._evidence_store.get(evidence_id)
+    async def archive_evidence(self, evidence_id: str, user: User) -> Optional[Evidence]:
+        """
+        Archive evidence (only its current custodian may).
+        
+        The stored file is compressed by the next archival pass; reads
+        and verification keep working on the original bytes.
+        
+        Raises:
+            PermissionError: If the user is not the current custodian
+            ValueError: If the evidence is already archived
+        """
+        async with self._lock(evidence_id):
+            evidence = await self.repository.get_evidence(evidence_id)
+            if not evidence:
+                return None
+            if evidence.custodian != user.role:
+                raise PermissionError(
+                    f"Only current custodian ({evidence.custodian}) can archive evidence"
+                )
+            if evidence.status == "archived":
+                raise ValueError(f"Evidence {evidence_id} is already archived")
+            
+            # Record on blockchain
+            blockchain_tx = await self.ledger.submit(
+                "log_access_event",
+                evidence_id=evidence_id,
+                actor=user.role,
+                actor_name=user.full_name,
+                action="archived"
+            )
+            
+            evidence = await self.repository.update_evidence(
+                evidence_id,
+                status="archived",
+                updated_at=datetime.utcnow(),
+                blockchain_tx=blockchain_tx
+            )
+        
+        await self._log_access(
+            evidence_id, "archived", user,
+            f"Evidence archived by {user.full_name}"
+        )
+        
+        return evidence
+    
+    def get_storage_stats(self) -> StorageStats:
+        """Space used by archived evidence files, as of the last archival pass"""
+        return self.archiver.stats
+    
+    async def verify_integrity(
+        self,
+        evidence_id: str,
+        user: User,
+        force: bool = False,
+        mode: str = "sha256",
+        full_scan: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Verify evidence integrity.
+        
+        In "sha256" mode the flat file hash is recomputed; a digest
+        verified recently for the unchanged file is reused from the
+        verification cache unless force is set. In "merkle" mode the
+        file's chunks are re-hashed in parallel against its manifest.
+        """
+        evidence = await self.repository.get_evidence(evidence_id)
         if not evidence:
             return {"error": "Evidence not found", "verified": False}
         
-        # Recalculate hash from stored file
+        if mode == "merkle":
+            return await self._verify_merkle(evidence, user, full_scan)
+        
+        # Recalculate hash by streaming the stored file
         try:
-            file_bytes = self.storage.retrieve_file(evidence.filename)
-            current_hash = self.storage.calculate_hash_from_bytes(file_bytes)
+            current_hash, identity, from_cache = await self._hash_evidence_file(
+                evidence, self.storage.pool, force
+            )
         except FileNotFoundError:
             return {
                 "error": "Evidence file not found",
@@ -172,55 +504,316 @@ class EvidenceService:
                 "evidence_id": evidence_id
             }
         
-        # Verify on blockchain
-        result = blockchain.verify_integrity(evidence_id, current_hash)
+        return await self._record_verification(evidence, current_hash, user, identity, from_cache)
+    
+    async def verify_batch(
+        self,
+        evidence_ids: List[str],
+        user: User,
+        force: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Verify many evidence items concurrently.
+        
+        Hashing is fanned out across the hash pool and results are
+        yielded in completion order, each recorded on the blockchain
+        as it finishes.
+        
+        Args:
+            evidence_ids: Evidence identifiers to verify
+            user: Current user performing verification
+            force: Bypass the verification cache and re-hash every file
+            
+        Yields:
+            Per-item verification results
+        """
+        async def hash_one(evidence_id: str):
+            evidence = await self.repository.get_evidence(evidence_id)
+            if not evidence:
+                return evidence_id, None, None
+            try:
+                return evidence_id, evidence, await self._hash_evidence_file(
+                    evidence, self.hash_pool, force
+                )
+            except FileNotFoundError:
+                return evidence_id, evidence, None
+        
+        tasks = [asyncio.ensure_future(hash_one(evidence_id)) for evidence_id in dict.fromkeys(evidence_ids)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                evidence_id, evidence, hashed = await next_done
+                if evidence is None:
+                    yield {"error": "Evidence not found", "verified": False, "evidence_id": evidence_id}
+                elif hashed is None:
+                    yield {"error": "Evidence file not found", "verified": False, "evidence_id": evidence_id}
+                else:
+                    current_hash, identity, from_cache = hashed
+                    yield await self._record_verification(evidence, current_hash, user, identity, from_cache)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def get_case_evidence_ids(self, case_id: str) -> List[str]:
+        """Get the IDs of all evidence belonging to a case"""
+        return await self.repository.list_evidence_ids({"case_id": case_id})
+    
+    async def _verify_merkle(
+        self,
+        evidence: Evidence,
+        user: User,
+        full_scan: bool
+    ) -> Dict[str, Any]:
+        """
+        Verify evidence against its chunk Merkle manifest.
+        
+        Chunks are hashed in parallel on the hash pool. Unless full_scan
+        is set, hashing stops at the first modified chunk. The manifest
+        is stored beside the file, so its leaves are only used once they
+        reproduce the Merkle root registered on the ledger.
+        """
+        manifest = await self.storage.pool.run(self.storage.load_manifest, evidence.filename)
+        if manifest is None:
+            return {
+                "error": "Evidence has no Merkle manifest",
+                "verified": False,
+                "evidence_id": evidence.id
+            }
+        record = await self.ledger.evaluate("get_evidence_record", evidence_id=evidence.id)
+        registered_root = record.get("merkle_root") if record is not None else None
+        if not await self.storage.pool.run(manifest_matches, manifest, registered_root):
+            return {
+                "verified": False,
+                "manifest_tampered": True,
+                "evidence_id": evidence.id,
+                "message": "INTEGRITY ALERT - Merkle manifest tampered (its leaves do not build the registered root)"
+            }
+        
+        try:
+            file_path, codec = await self.storage.pool.run(self.storage.locate, evidence.filename)
+            if codec is None:
+                file_size = (await self.storage.pool.run(os.stat, file_path)).st_size
+                chunks = await verify_file_chunks(
+                    file_path,
+                    file_size,
+                    manifest,
+                    self.hash_pool,
+                    stop_on_first=not full_scan
+                )
+            else:
+                # Compressed files can only be read front to back
+                chunks = await self.storage.pool.run(self._verify_compressed_chunks, evidence.filename, manifest)
+        except FileNotFoundError:
+            return {
+                "error": "Evidence file not found",
+                "verified": False,
+                "evidence_id": evidence.id
+            }
+        
+        result = await self._record_verification(
+            evidence, chunks.pop("current_root"), user, hash_type="merkle"
+        )
+        return {**result, **chunks}
+    
+    def _verify_compressed_chunks(self, filename: str, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a compressed file against its manifest while decompressing it (blocking)"""
+        with self.storage.open_file(filename) as f:
+            return verify_stream_chunks(f, manifest)
+    
+    async def _hash_evidence_file(
+        self,
+        evidence: Evidence,
+        pool: WorkerPool,
+        force: bool
+    ) -> Tuple[str, Optional[FileIdentity], bool]:
+        """
+        Hash a stored evidence file, consulting the verification cache.
+        
+        Compressed files are decompressed as they are hashed, so the
+        digest is always that of the original bytes.
+        
+        Returns:
+            Tuple of (current_hash, file identity or None if it changed
+            while hashing, whether the digest came from the cache)
+        """
+        file_path, codec, identity = await self.storage.pool.run(self._locate_identity, evidence.filename)
+        if not force:
+            cached_hash = self.verify_cache.get(identity)
+            if cached_hash is not None:
+                return cached_hash, identity, True
         
-        # Update evidence integrity status
-        evidence.integrity_verified = result["verified"]
-        if result["verified"]:
-            evidence.status = "verified"
-        evidence.updated_at = datetime.utcnow()
+        if codec is None:
+            current_hash = await pool.run(self.storage.calculate_hash, file_path)
+        else:
+            current_hash = await pool.run(self.storage.calculate_compressed_hash, file_path, codec.name)
+        
+        # Only cacheable if the file was not touched while it was being read
+        if await self.storage.pool.run(self.verify_cache.identity, evidence.filename, file_path) != identity:
+            identity = None
+        return current_hash, identity, False
+    
+    def _locate_identity(self, filename: str) -> Tuple[Path, Optional[Codec], FileIdentity]:
+        """Find a stored file and stat it for the verification cache (runs on the storage pool)"""
+        file_path, codec = self.storage.locate(filename)
+        return file_path, codec, self.verify_cache.identity(filename, file_path)
+    
+    async def _record_verification(
+        self,
+        evidence: Evidence,
+        current_hash: str,
+        user: User,
+        identity: Optional[FileIdentity] = None,
+        from_cache: bool = False,
+        hash_type: str = "sha256"
+    ) -> Dict[str, Any]:
+        """Record a verification result on the blockchain and the evidence record"""
+        evidence_id = evidence.id
+        
+        async with self._lock(evidence_id):
+            # Verify on blockchain
+            result = await self.ledger.submit(
+                "verify_integrity",
+                evidence_id=evidence_id,
+                current_hash=current_hash,
+                hash_type=hash_type
+            )
+            
+            # Remember digests that matched the registered hash
+            if result["verified"] and identity is not None and not from_cache:
+                self.verify_cache.put(identity, current_hash)
+            
+            # Only these fields change, so a transfer made while the file
+            # was being hashed is kept
+            fields: Dict[str, Any] = {
+                "integrity_verified": result["verified"],
+                "updated_at": datetime.utcnow()
+            }
+            # Archived evidence stays archived (and compressed) when it verifies
+            current = await self.repository.get_evidence(evidence_id)
+            if result["verified"] and current is not None and current.status != "archived":
+                fields["status"] = "verified"
+            await self.repository.update_evidence(evidence_id, **fields)
         
         # Log verification
-        self._log_access(
+        await self._log_access(
             evidence_id, "verified", user,
             f"Integrity verification: {'PASSED' if result['verified'] else 'FAILED'}"
+            f"{' (cached digest)' if from_cache else ''}"
         )
         
         return {
             **result,
             "evidence_id": evidence_id,
-            "filename": evidence.original_filename
+            "filename": evidence.original_filename,
+            "from_cache": from_cache
         }
     
-    def get_custody_history(self, evidence_id: str) -> Optional[CustodyHistory]:
-        """Get full custody history for evidence"""
-        evidence = self._evidence_store.get(evidence_id)
+    async def get_evidence_content(
+        self,
+        evidence_id: str
+    ) -> Optional[Tuple[Evidence, Path, os.stat_result, Optional[Codec]]]:
+        """
+        Locate an evidence record's stored file for download.
+        
+        Returns:
+            Tuple of (evidence, file path, stat of the file, codec it is
+            compressed with or None), or None if the evidence does not exist
+            
+        Raises:
+            FileNotFoundError: If the stored file is missing
+        """
+        evidence = await self.repository.get_evidence(evidence_id)
         if not evidence:
             return None
+        file_path, codec = await self.storage.pool.run(self.storage.locate, evidence.filename)
+        stat_result = await self.storage.pool.run(os.stat, file_path)
+        return evidence, file_path, stat_result, codec
+    
+    async def record_streamed_verification(
+        self,
+        evidence: Evidence,
+        current_hash: str,
+        user: User,
+        stat_result: os.stat_result
+    ) -> Dict[str, Any]:
+        """
+        Record the digest of a file hashed while it was downloaded.
         
-        # Get events from blockchain
-        blockchain_events = blockchain.get_evidence_events(evidence_id)
-        
-        # Convert to history items
-        timeline = []
-        for event in blockchain_events:
-            item = CustodyHistoryItem(
-                event=event.get("type", "unknown"),
-                actor_role=event.get("to_role") or event.get("actor", "unknown"),
-                actor_name=event.get("to_name") or event.get("actor_name", "System"),
-                details=event.get("reason") or event.get("result"),
-                timestamp=datetime.fromisoformat(event["timestamp"]),
-                blockchain_tx=event.get("tx_hash")
-            )
-            timeline.append(item)
+        stat_result is the file's stat from before streaming; the digest
+        is only cached if the file is unchanged since.
+        """
+        identity: Optional[FileIdentity] = (
+            evidence.filename, stat_result.st_ino, stat_result.st_size,
+            stat_result.st_mtime_ns, stat_result.st_ctime_ns
+        )
+        try:
+            _, _, current = await self.storage.pool.run(self._locate_identity, evidence.filename)
+            if current != identity:
+                identity = None
+        except FileNotFoundError:
+            identity = None
+        return await self._record_verification(evidence, current_hash, user, identity)
+    
+    async def get_custody_timeline(
+        self,
+        evidence_id: str,
+        include_queued: bool = True
+    ) -> Optional[CustodyTimeline]:
+        """
+        Get the materialized custody timeline of an evidence record.
         
-        return CustodyHistory(
-            evidence_id=evidence_id,
-            timeline=timeline
+        Only ledger events newer than the last one materialized are
+        fetched and converted.
+        
+        Args:
+            evidence_id: Evidence identifier
+            include_queued: Wait for views still in the access event queue
+                (pollers checking an ETag can skip this)
+        """
+        evidence = await self.repository.get_evidence(evidence_id)
+        if not evidence:
+            return None
+        
+        if include_queued:
+            await self.access_events.flush()
+        
+        timeline = self.timelines.get(evidence_id)
+        new_events, _ = await self.ledger.evaluate(
+            "get_evidence_events_page", evidence_id=evidence_id, after=timeline.last_sequence
         )
+        timeline.extend(new_events)
+        return timeline
+    
+    async def get_custody_history(
+        self,
+        evidence_id: str,
+        after: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Optional[CustodyHistory]:
+        """
+        Get custody history for evidence, optionally one page at a time.
+        
+        Args:
+            evidence_id: Evidence identifier
+            after: Sequence number of the last event already seen
+            limit: Maximum number of events to return (None for all)
+        """
+        timeline = await self.get_custody_timeline(evidence_id)
+        if timeline is None:
+            return None
+        return timeline.page(after, limit)
+    
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up a blockchain transaction by its hash, with its commit status"""
+        transaction = await self.ledger.evaluate("get_transaction", tx_hash=tx_hash)
+        if transaction is None:
+            return None
+        return {**transaction, "status": self.ledger.commit_status(tx_hash)}
+    
+    async def verify_chain(self, full: bool = False) -> Dict[str, Any]:
+        """Audit the ledger's block chain (from the last checkpoint unless full)"""
+        return await self.ledger.evaluate("verify_chain", full=full)
     
-    def _log_access(
+    async def _log_access(
         self,
         evidence_id: str,
         event_type: str,
@@ -235,7 +828,7 @@ class EvidenceService:
             actor_name=user.full_name,
             details=details
         )
-        self._access_logs.append(log)
+        await self.repository.add_access_log(log)
         return log
 
 # Global service instance
@@ -0,0 +1,257 @@
+"""Blockchain Gateway - Async, pipelined submission interface with a local Fabric stand-in"""
+import os
+import time
+import random
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .blockchain_service import BlockchainService, blockchain
+
+# Simulated time for peers to endorse a proposal (milliseconds)
+FABRIC_ENDORSEMENT_LATENCY_MS = float(os.environ.get("FABRIC_ENDORSEMENT_LATENCY_MS", 0))
+# Simulated time to order and commit a block of transactions (milliseconds)
+FABRIC_COMMIT_LATENCY_MS = float(os.environ.get("FABRIC_COMMIT_LATENCY_MS", 0))
+# Random +/- fraction applied to each simulated latency
+FABRIC_LATENCY_JITTER = float(os.environ.get("FABRIC_LATENCY_JITTER", 0))
+# Submissions allowed in flight (not yet committed) before submit() waits
+FABRIC_MAX_IN_FLIGHT = int(os.environ.get("FABRIC_MAX_IN_FLIGHT", 1024))
+# The orderer cuts a block at this many transactions...
+FABRIC_BATCH_SIZE = int(os.environ.get("FABRIC_BATCH_SIZE", 100))
+# ...or this long after the first transaction arrives (milliseconds)
+FABRIC_BATCH_TIMEOUT_MS = float(os.environ.get("FABRIC_BATCH_TIMEOUT_MS", 50))
+# Most recent failed transaction hashes remembered for commit_status
+FABRIC_FAILED_HISTORY = int(os.environ.get("FABRIC_FAILED_HISTORY", 10000))
+
+COMMITTED = "COMMITTED"
+PENDING = "PENDING"
+# The ledger log could not make the transaction durable
+FAILED = "FAILED"
+
+
+class BlockchainGateway(ABC):
+    """
+    Async interface to the evidence chaincode, shaped like the Fabric Gateway.
+
+    submit() runs a transaction function and returns its result (always
+    carrying the transaction hash) once the transaction is durable on
+    the local peer, without waiting for consensus unless asked to, so
+    many submissions can be in flight at once. evaluate() runs a
+    read-only query.
+    """
+
+    @abstractmethod
+    async def submit(self, function: str, wait_for_commit: bool = False, **kwargs: Any) -> Any:
+        """Submit a transaction function; optionally wait until it commits"""
+
+    @abstractmethod
+    async def evaluate(self, function: str, **kwargs: Any) -> Any:
+        """Run a read-only query function"""
+
+    @abstractmethod
+    def commit_status(self, tx_hash: str) -> Optional[str]:
+        """Current commit status of a transaction (None if unknown)"""
+
+    async def close(self) -> None:
+        """Wait for in-flight submissions and release resources"""
+
+
+class LocalFabricGateway(BlockchainGateway):
+    """
+    In-process stand-in for a Fabric network, backed by BlockchainService.
+
+    The local peer executes each transaction function immediately and the
+    caller gets its result and transaction hash as soon as the entry is
+    in the ledger log (submitters in one group commit share its fsync). The
+    transaction then goes through a simulated pipeline: endorsement
+    (endorsement_latency_ms, overlapping for all in-flight proposals),
+    ordering into batches of up to batch_size or batch_timeout_ms, and
+    commit (commit_latency_ms per batch, batches pipelined but committed
+    in order). A batch only reports COMMITTED once its entries are
+    durable in the ledger log. At most max_in_flight transactions may be uncommitted;
+    further submitters wait, which is the backpressure a real gateway
+    applies. A timer seals the ledger's open block once it is
+    BLOCK_MAX_AGE_MS old, as an orderer cuts blocks on a timeout.
+    """
+
+    def __init__(
+        self,
+        service: BlockchainService = blockchain,
+        endorsement_latency_ms: float = FABRIC_ENDORSEMENT_LATENCY_MS,
+        commit_latency_ms: float = FABRIC_COMMIT_LATENCY_MS,
+        jitter: float = FABRIC_LATENCY_JITTER,
+        max_in_flight: int = FABRIC_MAX_IN_FLIGHT,
+        batch_size: int = FABRIC_BATCH_SIZE,
+        batch_timeout_ms: float = FABRIC_BATCH_TIMEOUT_MS
+    ):
+        self.service = service
+        self.endorsement_latency = endorsement_latency_ms / 1000
+        self.commit_latency = commit_latency_ms / 1000
+        self.jitter = jitter
+        self.max_in_flight = max(1, max_in_flight)
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ordering: Optional[asyncio.Queue] = None
+        self._orderer: Optional[asyncio.Task] = None
+        self._last_commit: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Failed transaction hashes, oldest first, capped at FABRIC_FAILED_HISTORY
+        self._failed: "OrderedDict[str, None]" = OrderedDict()
+        # Timer sealing the open block when it falls due, and that deadline
+        self._seal_timer: Optional[asyncio.TimerHandle] = None
+        self._seal_at: Optional[float] = None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted transactions not yet committed"""
+        return len(self._pending)
+
+    def _ensure_started(self) -> None:
+        """Create the pipeline for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._ordering = asyncio.Queue()
+        self._last_commit = None
+        self._pending = {}
+        self._seal_timer = None
+        self._seal_at = None
+        self._orderer = loop.create_task(self._run_orderer())
+
+    def _delay(self, seconds: float) -> float:
+        if self.jitter and seconds:
+            seconds *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, seconds)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run a pipeline stage in the background, keeping a reference to it"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def submit(self, function: str, wait_for_commit: bool = False, **kwargs: Any) -> Any:
+        self._ensure_started()
+        await self._semaphore.acquire()
+        try:
+            result = getattr(self.service, function)(**kwargs)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        sequence = self.service.last_sequence
+        self._schedule_seal()
+        tx_hash = result if isinstance(result, str) else result["tx_hash"]
+        committed = self._loop.create_future()
+        self._pending[tx_hash] = committed
+        self._spawn(self._endorse(tx_hash, sequence))
+        # Never hand out a transaction hash a crash could still lose
+        await self.service.wait_durable(sequence)
+        if wait_for_commit:
+            await asyncio.shield(committed)
+        return result
+
+    async def evaluate(self, function: str, **kwargs: Any) -> Any:
+        return getattr(self.service, function)(**kwargs)
+
+    def _schedule_seal(self) -> None:
+        """Seal the open block at its deadline, even if no transaction follows"""
+        deadline = self.service.seal_deadline
+        if deadline is None or deadline == self._seal_at:
+            return
+        if self._seal_timer is not None:
+            self._seal_timer.cancel()
+        self._seal_at = deadline
+        self._seal_timer = self._loop.call_later(max(0.0, deadline - time.monotonic()), self._seal_due)
+
+    def _seal_due(self) -> None:
+        self._seal_timer = None
+        self._seal_at = None
+        self.service.seal_due_block()
+        # Still open if the timer fired a little early
+        self._schedule_seal()
+
+    async def _endorse(self, tx_hash: str, sequence: int) -> None:
+        """Endorsement stage: proposals endorse concurrently"""
+        await asyncio.sleep(self._delay(self.endorsement_latency))
+        self._ordering.put_nowait((tx_hash, sequence))
+
+    async def _run_orderer(self) -> None:
+        """Ordering stage: cut endorsed transactions into batches"""
+        while True:
+            batch: List[Tuple[str, int]] = [await self._ordering.get()]
+            deadline = self._loop.time() + self.batch_timeout
+            while len(batch) < self.batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._ordering.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._last_commit = self._spawn(self._commit_batch(batch, self._last_commit))
+
+    async def _commit_batch(self, batch: List[Tuple[str, int]], previous: Optional[asyncio.Task]) -> None:
+        """Commit stage: batches overlap but complete in order, once durable"""
+        error: Optional[BaseException] = None
+        try:
+            await asyncio.sleep(self._delay(self.commit_latency))
+            if previous is not None:
+                # Only the order matters; a failed batch does not fail the next
+                await asyncio.wait([previous])
+            await self.service.wait_durable(max(sequence for _, sequence in batch))
+        except BaseException as exc:
+            error = exc
+            if not isinstance(exc, RuntimeError):
+                raise
+        finally:
+            # Always settle the batch, or its in-flight slots would leak
+            for tx_hash, _ in batch:
+                committed = self._pending.pop(tx_hash, None)
+                if isinstance(error, RuntimeError):
+                    self._failed[tx_hash] = None
+                    if len(self._failed) > FABRIC_FAILED_HISTORY:
+                        self._failed.popitem(last=False)
+                if committed is not None and not committed.done():
+                    if error is None:
+                        committed.set_result(COMMITTED)
+                    elif isinstance(error, RuntimeError):
+                        committed.set_exception(error)
+                        committed.exception()  # Reported via commit_status; nobody need await it
+                    else:
+                        committed.cancel()
+                self._semaphore.release()
+
+    def commit_status(self, tx_hash: str) -> Optional[str]:
+        if tx_hash in self._pending:
+            return PENDING
+        if tx_hash in self._failed:
+            return FAILED
+        if self.service.get_transaction(tx_hash) is not None:
+            return COMMITTED
+        return None
+
+    async def close(self) -> None:
+        """Drain the pipeline, then stop the orderer"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if self._pending:
+            await asyncio.gather(
+                *[asyncio.shield(f) for f in list(self._pending.values())], return_exceptions=True
+            )
+        if self._orderer is not None:
+            self._orderer.cancel()
+            self._orderer = None
+        if self._seal_timer is not None:
+            self._seal_timer.cancel()
+            self._seal_timer = None
+        self._loop = None
+
+
+# Global gateway used by the evidence service
+gateway: BlockchainGateway = LocalFabricGateway()
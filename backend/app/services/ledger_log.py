@@ -0,0 +1,283 @@
+"""Ledger Log - Durable, segmented, append-only transaction log with group commit"""
+import os
+import json
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..repositories import EVIDENCE_STORE
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the ledger segments
+LEDGER_DIR = Path(os.environ.get("LEDGER_DIR", Path(__file__).parent.parent.parent / "ledger_storage"))
+# Persist the mock ledger to disk (false keeps it in memory only). Off by
+# default with the in-memory evidence store: a ledger replayed after a
+# restart would hold records for evidence the API no longer knows
+LEDGER_ENABLED = os.environ.get("LEDGER_ENABLED", str(EVIDENCE_STORE != "memory")).lower() in ("1", "true", "yes")
+# Start a new segment once the current one reaches this size (bytes)
+LEDGER_SEGMENT_SIZE = int(os.environ.get("LEDGER_SEGMENT_SIZE", 64 * 1024 * 1024))
+# Commit (write + fsync) as soon as this many entries are pending
+LEDGER_GROUP_COMMIT_MAX_BATCH = int(os.environ.get("LEDGER_GROUP_COMMIT_MAX_BATCH", 256))
+# ...or once the oldest pending entry has waited this long (milliseconds)
+LEDGER_GROUP_COMMIT_INTERVAL_MS = float(os.environ.get("LEDGER_GROUP_COMMIT_INTERVAL_MS", 10))
+
+_SEGMENT_PREFIX = "ledger-"
+_SEGMENT_SUFFIX = ".log"
+
+
+def _resolve_waiter(future: asyncio.Future, error: Optional[BaseException]) -> None:
+    """Complete a wait_durable() future on its own event loop"""
+    if future.done():
+        return
+    if error is not None:
+        failure = RuntimeError("Ledger group commit failed")
+        failure.__cause__ = error
+        future.set_exception(failure)
+    else:
+        future.set_result(None)
+
+
+class LedgerLog:
+    """
+    Segmented append-only log of ledger entries, one JSON object per line.
+
+    Entries are serialized when appended and handed to a background
+    committer thread, which writes every pending entry with a single
+    write and a single fsync (group commit). A commit happens when
+    max_batch entries are pending or interval_ms after the first one
+    arrived, whichever comes first, so a burst of access events costs
+    one fsync rather than one per event. Callers that need an entry on
+    disk before continuing use flush(), or wait_durable() from async
+    code; callers waiting on the same batch share its fsync.
+
+    Segments roll over at segment_size. A torn final line left by a
+    crash mid-write is dropped when the log is reopened.
+    """
+
+    def __init__(
+        self,
+        directory: Path = LEDGER_DIR,
+        segment_size: int = LEDGER_SEGMENT_SIZE,
+        max_batch: int = LEDGER_GROUP_COMMIT_MAX_BATCH,
+        interval_ms: float = LEDGER_GROUP_COMMIT_INTERVAL_MS
+    ):
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.max_batch = max(1, max_batch)
+        self.interval = max(0.0, interval_ms) / 1000
+        self._pending: List[bytes] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._committed = threading.Condition(self._lock)
+        # Sequence numbers of the last appended and last durable entry
+        self._appended = 0
+        self._durable = 0
+        self._commit_error: Optional[BaseException] = None
+        # (sequence, loop, future) of async callers waiting for an entry to be durable
+        self._waiters: List[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._file = None
+        self._segment_index = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.commits = 0
+
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"{_SEGMENT_PREFIX}{index:06d}{_SEGMENT_SUFFIX}"
+
+    def _segments(self) -> List[Path]:
+        """Existing segment files in log order"""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"))
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every committed entry in append order.
+
+        An unparseable final line of the last segment is a torn write
+        from a crash; it is truncated away so later appends start on a
+        clean line. Corruption anywhere else is an error.
+        """
+        segments = self._segments()
+        for position, segment in enumerate(segments):
+            is_last = position == len(segments) - 1
+            good_offset = 0
+            with open(segment, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete line")
+                        entry = json.loads(line)
+                    except ValueError:
+                        if is_last and not f.read(1):
+                            logger.warning(
+                                "Dropping torn ledger entry at %s:%d", segment.name, good_offset
+                            )
+                            break
+                        raise ValueError(f"Corrupt ledger entry in {segment.name} at offset {good_offset}")
+                    good_offset += len(line)
+                    yield entry
+            if is_last and good_offset != segment.stat().st_size:
+                with open(segment, "r+b") as f:
+                    f.truncate(good_offset)
+
+    def _open_segment(self) -> None:
+        """Open the newest segment for appending (or start the first one)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        if segments:
+            self._segment_index = int(segments[-1].name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+        else:
+            self._segment_index = 1
+        self._file = open(self._segment_path(self._segment_index), "ab", buffering=0)
+
+    def _roll_segment(self) -> None:
+        """Close the full segment and start the next one"""
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._segment_index += 1
+        self._file = open(self._segment_path(self._segment_index), "ab", buffering=0)
+        self._fsync_directory()
+
+    def _fsync_directory(self) -> None:
+        """Make a newly created segment's directory entry durable"""
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return  # Not supported on this platform (e.g. Windows)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _start(self) -> None:
+        """Open the log and start the committer thread on first append"""
+        self._open_segment()
+        self._fsync_directory()
+        self._thread = threading.Thread(target=self._run, name="ledger-commit", daemon=True)
+        self._thread.start()
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Queue an entry for the next group commit.
+
+        The entry is serialized immediately, so later changes to the
+        caller's objects do not leak into the log.
+
+        Returns:
+            Sequence number of the entry (pass to flush to wait for it)
+        """
+        line = json.dumps(entry, separators=(",", ":"), default=str).encode() + b"\n"
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Ledger log is closed")
+            if self._commit_error is not None:
+                raise RuntimeError("Ledger group commit failed") from self._commit_error
+            if self._thread is None:
+                self._start()
+            self._pending.append(line)
+            self._appended += 1
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._wakeup.notify()
+            return self._appended
+
+    def _run(self) -> None:
+        """Committer thread: write and fsync pending entries in batches"""
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if not self._pending and self._closed:
+                    return
+                # Hold the batch open for the commit window unless it is full
+                if len(self._pending) < self.max_batch and not self._closed and self.interval:
+                    self._wakeup.wait(self.interval)
+                batch, self._pending = self._pending, []
+                target = self._durable + len(batch)
+            try:
+                self._commit(batch)
+            except BaseException as e:  # Surface to flush() callers
+                logger.exception("Ledger group commit failed")
+                with self._lock:
+                    self._commit_error = e
+                    self._committed.notify_all()
+                    self._wake_waiters()
+                return
+            with self._lock:
+                self._durable = target
+                self.commits += 1
+                self._committed.notify_all()
+                self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """Resolve async waiters whose entry is now durable, or all of them after a failure (lock held)"""
+        ready, waiting = [], []
+        for waiter in self._waiters:
+            (ready if waiter[0] <= self._durable or self._commit_error is not None else waiting).append(waiter)
+        self._waiters = waiting
+        for _, loop, future in ready:
+            try:
+                loop.call_soon_threadsafe(_resolve_waiter, future, self._commit_error)
+            except RuntimeError:
+                pass  # The waiter's event loop has closed
+
+    def _commit(self, batch: List[bytes]) -> None:
+        """Write one batch with a single write and fsync"""
+        if self._file.tell() >= self.segment_size:
+            self._roll_segment()
+        data = b"".join(batch)
+        view = memoryview(data)
+        while view:
+            written = self._file.write(view)
+            view = view[written:]
+        os.fsync(self._file.fileno())
+
+    def flush(self, sequence: Optional[int] = None) -> None:
+        """
+        Block until the given entry (default: everything appended so far)
+        has been committed to disk.
+        """
+        with self._lock:
+            target = self._appended if sequence is None else sequence
+            if self._pending:
+                self._wakeup.notify()
+            while self._durable < target:
+                if self._commit_error is not None:
+                    raise RuntimeError("Ledger group commit failed") from self._commit_error
+                self._committed.wait()
+
+    async def wait_durable(self, sequence: int) -> None:
+        """
+        Wait until the given entry has been committed to disk, without
+        blocking the event loop (the committer thread wakes the caller).
+        """
+        with self._lock:
+            if self._durable >= sequence:
+                return
+            if self._commit_error is not None:
+                raise RuntimeError("Ledger group commit failed") from self._commit_error
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((sequence, future.get_loop(), future))
+        await future
+
+    def close(self) -> None:
+        """Commit everything pending and stop the committer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def pending(self) -> int:
+        """Number of appended entries not yet durable"""
+        return self._appended - self._durable
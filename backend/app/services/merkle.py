@@ -0,0 +1,235 @@
+"""Merkle Manifests - Chunked Merkle-tree hashing for large evidence files"""
+import os
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Set
+
+from .worker_pool import WorkerPool
+
+# Build manifests at upload time
+MERKLE_ENABLED = os.environ.get("MERKLE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Size of each leaf chunk (bytes)
+MERKLE_CHUNK_SIZE = int(os.environ.get("MERKLE_CHUNK_SIZE", 4 * 1024 * 1024))
+# Files smaller than this get no manifest (a single chunk gains nothing)
+MERKLE_MIN_FILE_SIZE = int(os.environ.get("MERKLE_MIN_FILE_SIZE", MERKLE_CHUNK_SIZE))
+
+MANIFEST_VERSION = 1
+
+# Domain separation between leaves and interior nodes (as in RFC 6962)
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+
+def hash_leaf(chunk) -> str:
+    """Hash one chunk of file data as a Merkle leaf"""
+    sha256_hash = hashlib.sha256(_LEAF_PREFIX)
+    sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def build_root(leaves: List[str]) -> str:
+    """Compute the Merkle root of a list of hex leaf hashes"""
+    level = [bytes.fromhex(leaf) for leaf in leaves] or [bytes.fromhex(hash_leaf(b""))]
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            next_level.append(hashlib.sha256(_NODE_PREFIX + level[i] + level[i + 1]).digest())
+        if len(level) % 2:
+            # Odd node is promoted unchanged
+            next_level.append(level[-1])
+        level = next_level
+    return level[0].hex()
+
+
+def manifest_matches(manifest: Dict[str, Any], root: Optional[str]) -> bool:
+    """
+    Check that a manifest's leaves build the given (registered) root.
+
+    The manifest lives on disk next to the file, so its leaves are only
+    trusted once they reproduce the root recorded on the ledger.
+    """
+    return root is not None and manifest.get("root") == root and build_root(manifest["leaves"]) == root
+
+
+def hash_chunk(file_path: Path, index: int, chunk_size: int) -> str:
+    """
+    Hash the chunk at the given index of a file as a Merkle leaf.
+
+    Module-level so it can run on a process pool.
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    n = 0
+    with open(file_path, "rb", buffering=0) as f:
+        f.seek(index * chunk_size)
+        while n < chunk_size:
+            read = f.readinto(view[n:])
+            if not read:
+                break
+            n += read
+    return hash_leaf(view[:n])
+
+
+class MerkleBuilder:
+    """Incrementally builds Merkle leaves from a stream of bytes"""
+
+    def __init__(self, chunk_size: int = MERKLE_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.leaves: List[str] = []
+        self._current = hashlib.sha256(_LEAF_PREFIX)
+        self._current_size = 0
+
+    def update(self, data: bytes) -> None:
+        """Feed the next bytes of the file"""
+        view = memoryview(data)
+        while view:
+            take = min(self.chunk_size - self._current_size, len(view))
+            self._current.update(view[:take])
+            self._current_size += take
+            view = view[take:]
+            if self._current_size == self.chunk_size:
+                self._finish_leaf()
+
+    def _finish_leaf(self) -> None:
+        self.leaves.append(self._current.hexdigest())
+        self._current = hashlib.sha256(_LEAF_PREFIX)
+        self._current_size = 0
+
+    def manifest(self, file_size: int) -> Dict[str, Any]:
+        """Finish the last leaf and return the manifest"""
+        if self._current_size or not self.leaves:
+            self._finish_leaf()
+        return {
+            "version": MANIFEST_VERSION,
+            "algorithm": "sha256",
+            "chunk_size": self.chunk_size,
+            "file_size": file_size,
+            "root": build_root(self.leaves),
+            "leaves": self.leaves,
+        }
+
+
+def _coalesce_ranges(indices: List[int], chunk_size: int, file_size: int) -> List[Dict[str, int]]:
+    """Turn sorted chunk indices into merged [start, end) byte ranges"""
+    ranges: List[Dict[str, int]] = []
+    for index in indices:
+        start = index * chunk_size
+        end = min(start + chunk_size, max(file_size, start + 1))
+        if ranges and ranges[-1]["end"] >= start:
+            ranges[-1]["end"] = max(ranges[-1]["end"], end)
+        else:
+            ranges.append({"start": start, "end": end})
+    return ranges
+
+
+async def verify_file_chunks(
+    file_path: Path,
+    file_size: int,
+    manifest: Dict[str, Any],
+    pool: WorkerPool,
+    stop_on_first: bool = True,
+    window: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Re-hash a file's chunks in parallel and compare them with its manifest.
+
+    At most window chunks (default twice the pool's workers) are
+    queued at once, so a huge file does not create a task per chunk up
+    front.
+
+    Args:
+        file_path: Path of the stored file
+        file_size: Its current size
+        manifest: Manifest written at upload time (checked with
+            manifest_matches first)
+        pool: Pool to hash chunks on
+        stop_on_first: Cancel outstanding chunks at the first mismatch
+        window: Chunks hashed or queued at once
+
+    Returns:
+        Dict with the recomputed root, the modified byte ranges found
+        and how many chunks were checked
+    """
+    chunk_size = manifest["chunk_size"]
+    expected = manifest["leaves"]
+    chunk_count = max(1, -(-file_size // chunk_size))
+    window = max(1, window if window is not None else pool.max_workers * 2)
+
+    async def check(index: int):
+        return index, await pool.run(hash_chunk, file_path, index, chunk_size)
+
+    observed: Dict[int, str] = {}
+    bad: List[int] = []
+    tasks: Set[asyncio.Future] = set()
+    next_index = 0
+    try:
+        while next_index < chunk_count or tasks:
+            while next_index < chunk_count and len(tasks) < window:
+                tasks.add(asyncio.ensure_future(check(next_index)))
+                next_index += 1
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, leaf = task.result()
+                observed[index] = leaf
+                if index >= len(expected) or leaf != expected[index]:
+                    bad.append(index)
+            if bad and stop_on_first:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # Chunks listed in the manifest that the file no longer has
+    bad.extend(range(chunk_count, len(expected)))
+
+    # Chunks skipped by an early stop keep their manifest leaf
+    placeholder = hash_leaf(b"")
+    leaves = [
+        observed.get(i, expected[i] if i < len(expected) else placeholder)
+        for i in range(chunk_count)
+    ]
+    bad.sort()
+    return {
+        "current_root": build_root(leaves),
+        "modified_ranges": _coalesce_ranges(bad, chunk_size, max(file_size, manifest["file_size"])),
+        "chunks_checked": len(observed),
+        "chunk_count": chunk_count,
+        "current_size": file_size,
+    }
+
+
+def verify_stream_chunks(stream: BinaryIO, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-hash a file read front to back (e.g. while it is decompressed)
+    and compare its chunks with its manifest.
+
+    The sequential counterpart of verify_file_chunks for files that
+    cannot be read at arbitrary offsets; it always scans the whole file
+    and blocks, so run it on a worker pool.
+
+    Returns:
+        Dict shaped like verify_file_chunks' result
+    """
+    chunk_size = manifest["chunk_size"]
+    expected = manifest["leaves"]
+    builder = MerkleBuilder(chunk_size)
+    file_size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        builder.update(chunk)
+        file_size += len(chunk)
+    current = builder.manifest(file_size)
+    leaves = current["leaves"]
+
+    bad = [i for i, leaf in enumerate(leaves) if i >= len(expected) or leaf != expected[i]]
+    bad.extend(range(len(leaves), len(expected)))
+    return {
+        "current_root": current["root"],
+        "modified_ranges": _coalesce_ranges(bad, chunk_size, max(file_size, manifest["file_size"])),
+        "chunks_checked": len(leaves),
+        "chunk_count": len(leaves),
+        "current_size": file_size,
+    }
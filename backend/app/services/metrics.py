@@ -0,0 +1,410 @@
+"""Metrics - Counters, gauges and histograms rendered in the Prometheus text format"""
+import time
+import bisect
+import functools
+import inspect
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Method label values; anything else is counted as OTHER so clients cannot add series
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+# Route label of requests that matched no API route (404s, static docs pages)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Latency bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Ledger appends are in-memory plus a buffered log write, so much faster
+LEDGER_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class _Striped:
+    """
+    Per-thread cells of floats, summed when read.
+
+    Each thread only ever writes its own cell, so updates need no lock
+    and never contend; a cell is created (under a lock) the first time
+    a thread touches the metric. Reads sum every cell without locking,
+    so a scrape may miss an update still in progress on another thread.
+    """
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def _cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._width
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def _totals(self) -> List[float]:
+        totals = [0.0] * self._width
+        with self._lock:
+            cells = list(self._cells)
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class CounterChild(_Striped):
+    """A monotonically increasing count, safe to update from any thread"""
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class GaugeChild:
+    """
+    A value that goes up and down.
+
+    Either set or moved with inc/dec from one thread (the event loop),
+    or read from a function at scrape time via set_function.
+    """
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function is not None else self._value
+
+
+class HistogramChild(_Striped):
+    """
+    Observations counted into fixed buckets, safe to update from any thread.
+
+    A cell holds one count per bucket (the last is +Inf) and the sum of
+    the observations; buckets are made cumulative when rendered.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self._bounds = list(buckets)
+        super().__init__(len(self._bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._cell()
+        cell[bisect.bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[Tuple[float, float]], float, float]:
+        """Cumulative (upper bound, count) buckets, the count and the sum"""
+        totals = self._totals()
+        buckets = []
+        count = 0.0
+        for bound, value in zip(self._bounds + [float("inf")], totals[:-1]):
+            count += value
+            buckets.append((bound, count))
+        return buckets, count, totals[-1]
+
+
+class _Metric(ABC):
+    """
+    A named metric family with one child per combination of label values.
+
+    Resolve children with labels() once, outside the hot path, and keep
+    them; an unlabelled metric can be updated directly.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """A child holding the value for one combination of label values"""
+
+    def labels(self, *values: str):
+        """Get (creating on first use) the child for these label values"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _child_items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in self._child_items():
+            labels = _label_text(self.labelnames, values)
+            lines.append(f"{self.name}{{{labels}}} {_format_value(child.value)}" if labels
+                         else f"{self.name} {_format_value(child.value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, child in self._child_items():
+            labels = _label_text(self.labelnames, values)
+            prefix = f"{labels}," if labels else ""
+            buckets, count, total = child.snapshot()
+            for bound, value in buckets:
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format_value(bound)}"}} {_format_value(value)}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_count{suffix} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics exposed on /metrics, in registration order"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def timed(histogram: HistogramChild):
+    """Decorator observing the wall time of every call of a function or coroutine function"""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# Global registry and the metrics the services update
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "evidence_http_request_duration_seconds",
+    "Time to handle an HTTP request, by route template and method",
+    ["route", "method"]
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "evidence_http_requests_in_flight",
+    "HTTP requests currently being handled"
+)
+
+HASH_BYTES = registry.counter(
+    "evidence_hash_bytes_total",
+    "Bytes hashed with SHA-256 by the storage service (divide the rate by that of evidence_hash_seconds_total for bytes/s)"
+)
+HASH_SECONDS = registry.counter(
+    "evidence_hash_seconds_total",
+    "Time spent hashing with SHA-256 in the storage service"
+)
+STORAGE_OPERATION_SECONDS = registry.histogram(
+    "evidence_storage_operation_duration_seconds",
+    "Time spent in StorageService operations",
+    ["operation"]
+)
+
+LEDGER_APPEND_SECONDS = registry.histogram(
+    "evidence_ledger_append_duration_seconds",
+    "Time to append a transaction to the ledger (log write, apply and block sealing)",
+    buckets=LEDGER_BUCKETS
+)
+LEDGER_SIZE = registry.gauge(
+    "evidence_ledger_size",
+    "Ledger size (evidence records, transactions, sealed blocks, log entries not yet durable)",
+    ["kind"]
+)
+
+STORE_RECORDS = registry.gauge(
+    "evidence_store_records",
+    "Stored evidence records and access log entries",
+    ["kind"]
+)
+
+POOL_JOBS = registry.gauge(
+    "evidence_pool_jobs",
+    "Worker pool jobs running and queued, and the queue limit",
+    ["pool", "state"]
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template and method.
+
+    FastAPI puts the matched route in the scope, so requests are labelled
+    with its path template (/api/evidence/{evidence_id}) rather than the
+    raw path. Histogram children are cached per route template and method,
+    so after the first request to a route nothing is allocated or locked.
+    The in-flight gauge is only touched on the event loop thread.
+    """
+
+    def __init__(
+        self,
+        app,
+        histogram: Histogram = HTTP_REQUEST_SECONDS,
+        in_flight: Gauge = HTTP_REQUESTS_IN_FLIGHT
+    ):
+        self.app = app
+        self.histogram = histogram
+        self.in_flight = in_flight
+        self._children: Dict[str, Dict[str, HistogramChild]] = {}
+
+    def _child(self, path: str, method: str) -> HistogramChild:
+        by_method = self._children.get(path)
+        if by_method is None:
+            by_method = self._children.setdefault(path, {})
+        child = by_method.get(method)
+        if child is None:
+            child = by_method[method] = self.histogram.labels(path, method)
+        return child
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight.dec()
+            method = scope["method"]
+            if method not in HTTP_METHODS:
+                method = "OTHER"
+            path = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self._child(path, method).observe(time.perf_counter() - start)
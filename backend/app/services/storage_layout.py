@@ -0,0 +1,102 @@
+"""Storage Layout - Hash-prefix sharded directories for stored evidence files"""
+import os
+import hashlib
+from pathlib import Path
+from typing import Set
+
+from .compression_codecs import COMPRESSED_SUFFIXES
+from .content_store import is_blob_name
+
+# Directory levels between the storage root and a file (0 keeps the flat layout;
+# one level of 256 directories suits up to tens of millions of files)
+STORAGE_SHARD_DEPTH = int(os.environ.get("STORAGE_SHARD_DEPTH", 1))
+# Hex characters of the key per level (2 gives 256 directories per level)
+STORAGE_SHARD_WIDTH = int(os.environ.get("STORAGE_SHARD_WIDTH", 2))
+# Also look for files in the flat root, for trees not fully migrated yet
+STORAGE_FLAT_FALLBACK = os.environ.get("STORAGE_FLAT_FALLBACK", "true").lower() in ("1", "true", "yes")
+
+# Sidecars (and compressed copies) stored next to their file, in the same shard
+SIDECAR_SUFFIXES = (".merkle.json", ".refs.json", ".part") + COMPRESSED_SUFFIXES
+
+
+def base_filename(name: str) -> str:
+    """The stored filename a sidecar (manifest, refs, partial write, compressed copy) belongs to"""
+    for suffix in SIDECAR_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class StorageLayout:
+    """
+    Maps stored filenames to paths under the storage root.
+
+    With depth D and width W a file lives under D nested directories
+    named by successive W-character slices of a hex key, e.g.
+    ab/<filename> for depth 1 or ab/cd/<filename> for depth 2.
+    Content-addressed blobs are keyed by their SHA-256; other files by
+    the SHA-1 of their name, which spreads timestamped names evenly. A
+    file's sidecars share its directory, so renames between them stay
+    within one directory.
+
+    While flat_fallback is on, files from the old flat layout stay
+    readable while they are being migrated: the names in the root are
+    listed once, when the layout is created (new files never go there),
+    and only those names cost a lookup in their shard before falling
+    back to the root. Every other path is resolved without touching
+    the disk.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        depth: int = STORAGE_SHARD_DEPTH,
+        width: int = STORAGE_SHARD_WIDTH,
+        flat_fallback: bool = STORAGE_FLAT_FALLBACK
+    ):
+        self.root = Path(root)
+        self.depth = max(0, depth)
+        self.width = max(1, width)
+        self.flat_fallback = flat_fallback
+        self._flat_names = self._list_flat_names() if self.sharded and flat_fallback else set()
+
+    def _list_flat_names(self) -> Set[str]:
+        try:
+            with os.scandir(self.root) as entries:
+                return {entry.name for entry in entries if entry.is_file(follow_symlinks=False)}
+        except FileNotFoundError:
+            return set()
+
+    @property
+    def sharded(self) -> bool:
+        return self.depth > 0
+
+    def shard_key(self, filename: str) -> str:
+        if is_blob_name(filename):
+            return filename[len("sha256-"):]
+        return hashlib.sha1(filename.encode()).hexdigest()
+
+    def directory(self, filename: str) -> Path:
+        """Directory a stored file (and its sidecars) belongs in"""
+        if not self.sharded:
+            return self.root
+        key = self.shard_key(filename)
+        return self.root.joinpath(*(key[i * self.width:(i + 1) * self.width] for i in range(self.depth)))
+
+    def path(self, filename: str, suffix: str = "") -> Path:
+        """
+        Path of a stored file, or of one of its sidecars.
+
+        Args:
+            filename: Stored filename
+            suffix: Sidecar suffix (e.g. ".merkle.json"), or "" for the file
+        """
+        name = f"{filename}{suffix}"
+        path = self.directory(filename) / name
+        if name in self._flat_names and not path.exists():
+            flat_path = self.root / name
+            if flat_path.exists():
+                return flat_path
+            # Deleted since the listing; new writes belong in the shard
+            self._flat_names.discard(name)
+        return path
@@ -0,0 +1,99 @@
+"""
+Storage Migration - Move flat evidence_storage files into hash-prefix shards.
+
+Runs online, in two passes, while the API keeps serving:
+
+1. link (default): hard-link every flat file into its shard. Lookups
+   prefer the shard, so new readers switch over at once, and readers
+   that resolved the flat path a moment earlier still find the file
+   there. Content-store reference sidecars are moved under the content
+   store's lock instead, since they are rewritten in place; with
+   STORAGE_CONTENT_ADDRESSED on, run this pass inside the API
+   (STORAGE_MIGRATE_ON_STARTUP=true) so it shares that lock.
+2. --prune: remove the flat names that now have a shard twin. Run it
+   once in-flight requests from before the link pass have finished.
+
+Usage (from backend/, or at API startup with STORAGE_MIGRATE_ON_STARTUP=true):
+    python -m app.services.storage_migration          # link
+    python -m app.services.storage_migration --prune  # then remove flat names
+
+Set STORAGE_FLAT_FALLBACK=false once the flat root is empty, to drop
+the extra lookup for missing files.
+"""
+import os
+import argparse
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .storage_layout import base_filename
+from .storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+# Run the link pass in the background when the API starts
+STORAGE_MIGRATE_ON_STARTUP = os.environ.get("STORAGE_MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+
+def migrate_flat_files(
+    storage: StorageService,
+    prune: bool = False,
+    stop: Optional[threading.Event] = None
+) -> Dict[str, int]:
+    """
+    Link (and with prune, unlink) every flat file into its shard.
+
+    Safe to re-run and to interrupt; files written by other processes
+    during the run are left for the next one. Setting stop ends the run
+    after the file in hand, e.g. when the API shuts down.
+
+    Returns:
+        Counts of files linked, moved (reference sidecars), pruned and skipped
+    """
+    layout = storage.layout
+    counts = {"linked": 0, "moved": 0, "pruned": 0, "skipped": 0}
+    if not layout.sharded:
+        return counts
+
+    with os.scandir(layout.root) as entries:
+        for entry in entries:
+            if stop is not None and stop.is_set():
+                break
+            name = entry.name
+            if not entry.is_file(follow_symlinks=False) or name.startswith(".") or name.endswith((".part", ".tmp")):
+                continue
+            directory = layout.directory(base_filename(name))
+            target = directory / name
+            directory.mkdir(parents=True, exist_ok=True)
+
+            if name.endswith(".refs.json"):
+                # Rewritten with os.replace, so a hard link would go stale
+                if storage.content.relocate_refs(Path(entry.path), target):
+                    counts["moved"] += 1
+                continue
+
+            if not target.exists():
+                os.link(entry.path, target)
+                counts["linked"] += 1
+            if prune:
+                if os.path.samefile(entry.path, target):
+                    os.unlink(entry.path)
+                    counts["pruned"] += 1
+                else:
+                    logger.warning("Not pruning %s: its shard copy is a different file", name)
+                    counts["skipped"] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prune", action="store_true", help="Also remove flat names that have a shard twin")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    counts = migrate_flat_files(StorageService(), prune=args.prune)
+    print(", ".join(f"{key}: {value}" for key, value in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
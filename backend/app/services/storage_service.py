@@ -1,36 +1,116 @@
 """Storage Service - Local file storage for evidence files"""
 import os
+import time
 import shutil
 import hashlib
+import json
 from pathlib import Path
-from typing import Tuple
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 from datetime import datetime
 import uuid
+from fastapi import UploadFile
+from .merkle import MerkleBuilder
+from .worker_pool import WorkerPool, storage_pool
+from .content_store import (
+    CONTENT_HEAD_BYTES, STORAGE_CONTENT_ADDRESSED, ContentStore, head_digest, is_blob_name
+)
+from .storage_layout import StorageLayout
+from .compression_codecs import CODECS, COMPRESSION_SAMPLE_BYTES, Codec, compression_ratio
+from .metrics import HASH_BYTES, HASH_SECONDS, STORAGE_OPERATION_SECONDS, timed
 
 # Storage directory
-STORAGE_DIR = Path(__file__).parent.parent.parent / "evidence_storage"
+STORAGE_DIR = Path(os.environ.get("STORAGE_DIR", Path(__file__).parent.parent.parent / "evidence_storage"))
+
+# Chunk size used when streaming uploads to disk (bytes)
+UPLOAD_CHUNK_SIZE = int(os.environ.get("STORAGE_UPLOAD_CHUNK_SIZE", 1024 * 1024))
+
+# Read buffer size used when hashing stored files (bytes)
+HASH_CHUNK_SIZE = int(os.environ.get("STORAGE_HASH_CHUNK_SIZE", 1024 * 1024))
+
+# Per-operation latency histograms, resolved once so updates skip the label lookup
+_STORE_SECONDS = STORAGE_OPERATION_SECONDS.labels("store")
+_UPLOAD_SECONDS = STORAGE_OPERATION_SECONDS.labels("store_upload")
+_RETRIEVE_SECONDS = STORAGE_OPERATION_SECONDS.labels("retrieve")
+_VERIFY_SECONDS = STORAGE_OPERATION_SECONDS.labels("verify")
+_HASH_FILE_SECONDS = STORAGE_OPERATION_SECONDS.labels("hash_file")
+_COMPRESS_SECONDS = STORAGE_OPERATION_SECONDS.labels("compress")
+_DELETE_SECONDS = STORAGE_OPERATION_SECONDS.labels("delete")
 
 class StorageService:
     """Service for managing evidence file storage"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        pool: WorkerPool = storage_pool,
+        content_addressed: bool = STORAGE_CONTENT_ADDRESSED,
+        layout: Optional[StorageLayout] = None
+    ):
         """Initialize storage directory"""
-        STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+        # Thread pool for blocking disk I/O and hashing
+        self.pool = pool
+        # Where each stored file lives under the root (hash-prefix shards)
+        self.layout = layout if layout is not None else StorageLayout(STORAGE_DIR)
+        self.layout.root.mkdir(parents=True, exist_ok=True)
+        # Store new files once per distinct content, shared by reference
+        self.content_addressed = content_addressed
+        self.content = ContentStore(self.layout.path, self.layout.root)
     
     @staticmethod
-    def calculate_hash(file_path: Path) -> str:
-        """Calculate SHA-256 hash of a file"""
+    def calculate_hash(file_path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+        """
+        Calculate SHA-256 hash of a file.
+        
+        Streams the file through a single reused buffer, so memory use is
+        constant and large reads keep the syscall count low.
+        """
+        with open(file_path, "rb", buffering=0) as f:
+            return StorageService._hash_stream(f, chunk_size)
+    
+    @staticmethod
+    def calculate_compressed_hash(file_path: Path, codec_name: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+        """Calculate the SHA-256 hash of a compressed file's original bytes, decompressing as it reads"""
+        with CODECS[codec_name].open_read(file_path) as f:
+            return StorageService._hash_stream(f, chunk_size)
+    
+    @staticmethod
+    def _hash_stream(f: BinaryIO, chunk_size: int) -> str:
+        """Hash a binary stream through a single reused buffer"""
+        start = time.perf_counter()
         sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        total = 0
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            sha256_hash.update(view[:n])
+            total += n
+        # Includes the reads: streamed hashing is bound by whichever is slower
+        seconds = time.perf_counter() - start
+        HASH_BYTES.inc(total)
+        HASH_SECONDS.inc(seconds)
+        _HASH_FILE_SECONDS.observe(seconds)
         return sha256_hash.hexdigest()
     
     @staticmethod
     def calculate_hash_from_bytes(file_bytes: bytes) -> str:
         """Calculate SHA-256 hash from file bytes"""
-        return hashlib.sha256(file_bytes).hexdigest()
+        start = time.perf_counter()
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        HASH_SECONDS.inc(time.perf_counter() - start)
+        HASH_BYTES.inc(len(file_bytes))
+        return digest
     
+    @staticmethod
+    def generate_filename(original_filename: str) -> str:
+        """Generate a unique stored filename, keeping the original extension"""
+        ext = Path(original_filename).suffix
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        unique_id = uuid.uuid4().hex[:8]
+        return f"{timestamp}_{unique_id}{ext}"
+    
+    @timed(_STORE_SECONDS)
     def store_file(self, file_bytes: bytes, original_filename: str) -> Tuple[str, str, int]:
         """
         Store a file and return the stored filename, hash, and size.
@@ -39,48 +119,384 @@ class StorageService:
             Tuple of (stored_filename, file_hash, file_size)
         """
         # Generate unique filename
-        ext = Path(original_filename).suffix
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        unique_id = uuid.uuid4().hex[:8]
-        stored_filename = f"{timestamp}_{unique_id}{ext}"
+        stored_filename = self.generate_filename(original_filename)
         
         # Calculate hash
         file_hash = self.calculate_hash_from_bytes(file_bytes)
         file_size = len(file_bytes)
         
+        # Known content only gains a reference
+        if self.content_addressed:
+            shared_filename = self.content.add_ref(file_hash)
+            if shared_filename is not None:
+                return shared_filename, file_hash, file_size
+        
         # Store file
-        file_path = STORAGE_DIR / stored_filename
+        part_path = self.get_part_path(stored_filename)
+        file_path = part_path if self.content_addressed else self.get_file_path(stored_filename)
         with open(file_path, "wb") as f:
             f.write(file_bytes)
+        if self.content_addressed:
+            stored_filename = self.content.adopt(file_path, file_hash, file_size, head_digest(file_bytes))
         
         return stored_filename, file_hash, file_size
     
+    @staticmethod
+    def _write_chunk(f, sha256_hash, chunk: bytes, merkle: Optional[MerkleBuilder] = None) -> None:
+        """Hash and write one upload chunk (runs on the worker pool)"""
+        start = time.perf_counter()
+        sha256_hash.update(chunk)
+        HASH_SECONDS.inc(time.perf_counter() - start)
+        HASH_BYTES.inc(len(chunk))
+        if merkle is not None:
+            merkle.update(chunk)
+        f.write(chunk)
+    
+    @timed(_UPLOAD_SECONDS)
+    async def store_upload(
+        self,
+        file: UploadFile,
+        merkle: Optional[MerkleBuilder] = None
+    ) -> Tuple[str, str, int]:
+        """
+        Stream an uploaded file to disk in chunks, hashing as it is written.
+        
+        Memory use is bounded by UPLOAD_CHUNK_SIZE regardless of file size.
+        Hashing and writes run on the worker pool so the event loop stays
+        responsive. The file is written under a temporary name and only
+        renamed into place once it has been fully received.
+        
+        Args:
+            file: Uploaded file
+            merkle: Optional builder fed with the same chunks, for a
+                Merkle manifest of the file
+        
+        Returns:
+            Tuple of (stored_filename, file_hash, file_size)
+        """
+        if self.content_addressed:
+            return await self._store_upload_deduplicated(file, merkle)
+        
+        stored_filename = self.generate_filename(file.filename)
+        file_path = self.get_file_path(stored_filename)
+        part_path = await self.pool.run(self.get_part_path, stored_filename)
+        
+        sha256_hash = hashlib.sha256()
+        file_size = 0
+        try:
+            f = await self.pool.run(open, part_path, "wb")
+            try:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await self.pool.run(self._write_chunk, f, sha256_hash, chunk, merkle)
+                    file_size += len(chunk)
+            finally:
+                await self.pool.run(f.close)
+            await self.pool.run(os.replace, part_path, file_path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        
+        return stored_filename, sha256_hash.hexdigest(), file_size
+    
+    @staticmethod
+    def _match_chunk(blob, offset: int, sha256_hash, chunk: bytes, merkle: Optional[MerkleBuilder] = None) -> bool:
+        """Compare one upload chunk with a stored blob, hashing it if it matches"""
+        if os.pread(blob.fileno(), len(chunk), offset) != chunk:
+            return False
+        start = time.perf_counter()
+        sha256_hash.update(chunk)
+        HASH_SECONDS.inc(time.perf_counter() - start)
+        HASH_BYTES.inc(len(chunk))
+        if merkle is not None:
+            merkle.update(chunk)
+        return True
+    
+    @staticmethod
+    def _copy_prefix(blob, f, length: int) -> None:
+        """Copy the first length bytes of a blob into a new file"""
+        offset = 0
+        while offset < length:
+            data = os.pread(blob.fileno(), min(UPLOAD_CHUNK_SIZE, length - offset), offset)
+            f.write(data)
+            offset += len(data)
+    
+    async def _store_upload_deduplicated(
+        self,
+        file: UploadFile,
+        merkle: Optional[MerkleBuilder] = None
+    ) -> Tuple[str, str, int]:
+        """
+        Stream an upload into the content store, skipping known content.
+        
+        The first chunk is read up to a full CONTENT_HEAD_BYTES, and its
+        head digest picks a candidate blob. While the incoming chunks
+        match it byte for byte nothing is written at all and the upload
+        just takes a reference on the blob. On the first difference the
+        matching prefix is copied from the blob and the rest of the upload
+        is written as usual.
+        """
+        part_path = await self.pool.run(self.get_part_path, self.generate_filename(file.filename))
+        sha256_hash = hashlib.sha256()
+        file_size = 0
+        chunk = b""
+        while len(chunk) < CONTENT_HEAD_BYTES:
+            piece = await file.read(max(UPLOAD_CHUNK_SIZE, CONTENT_HEAD_BYTES) - len(chunk))
+            if not piece:
+                break
+            chunk += piece
+        head = head_digest(chunk)
+        
+        blob = None
+        candidate = await self.pool.run(self.content.candidate, head)
+        if candidate is not None:
+            try:
+                blob = await self.pool.run(open, self.get_file_path(candidate), "rb", 0)
+            except FileNotFoundError:
+                pass
+        
+        f = None
+        try:
+            while chunk:
+                if blob is not None and not await self.pool.run(
+                    self._match_chunk, blob, file_size, sha256_hash, chunk, merkle
+                ):
+                    # Diverged from the candidate: materialize what matched so far
+                    f = await self.pool.run(open, part_path, "wb")
+                    await self.pool.run(self._copy_prefix, blob, f, file_size)
+                    await self.pool.run(blob.close)
+                    blob = None
+                if blob is None:
+                    if f is None:
+                        f = await self.pool.run(open, part_path, "wb")
+                    await self.pool.run(self._write_chunk, f, sha256_hash, chunk, merkle)
+                file_size += len(chunk)
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            
+            file_hash = sha256_hash.hexdigest()
+            if blob is not None:
+                stored_filename = None
+                if (await self.pool.run(os.fstat, blob.fileno())).st_size == file_size:
+                    stored_filename = await self.pool.run(self.content.add_ref, file_hash)
+                if stored_filename is not None:
+                    return stored_filename, file_hash, file_size
+                # Candidate was longer, or deleted meanwhile: keep our own copy
+                f = await self.pool.run(open, part_path, "wb")
+                await self.pool.run(self._copy_prefix, blob, f, file_size)
+            elif f is None:
+                f = await self.pool.run(open, part_path, "wb")
+            await self.pool.run(f.close)
+            stored_filename = await self.pool.run(self.content.adopt, part_path, file_hash, file_size, head)
+        except BaseException:
+            if f is not None:
+                await self.pool.run(f.close)
+            part_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if blob is not None:
+                await self.pool.run(blob.close)
+        
+        return stored_filename, file_hash, file_size
+    
+    @timed(_RETRIEVE_SECONDS)
     def retrieve_file(self, filename: str) -> bytes:
         """Retrieve a stored file by filename"""
-        file_path = STORAGE_DIR / filename
-        if not file_path.exists():
-            raise FileNotFoundError(f"File {filename} not found")
-        
-        with open(file_path, "rb") as f:
+        with self.open_file(filename) as f:
             return f.read()
     
+    @timed(_VERIFY_SECONDS)
     def verify_file_integrity(self, filename: str, expected_hash: str) -> bool:
         """Verify file integrity by comparing hashes"""
-        file_path = STORAGE_DIR / filename
-        if not file_path.exists():
+        try:
+            with self.open_file(filename) as f:
+                current_hash = self._hash_stream(f, HASH_CHUNK_SIZE)
+        except FileNotFoundError:
             return False
-        
-        current_hash = self.calculate_hash(file_path)
         return current_hash == expected_hash
     
+    def locate(self, filename: str) -> Tuple[Path, Optional[Codec]]:
+        """
+        Find where a stored file's bytes are, compressed or not.
+        
+        Returns:
+            Tuple of (path, codec the file is compressed with or None);
+            the uncompressed path if the file does not exist at all
+        """
+        file_path = self.get_file_path(filename)
+        if file_path.exists():
+            return file_path, None
+        for codec in CODECS.values():
+            compressed_path = self.layout.path(filename, codec.suffix)
+            if compressed_path.exists():
+                return compressed_path, codec
+        return file_path, None
+    
+    def open_file(self, filename: str) -> BinaryIO:
+        """
+        Open a stored file for reading its original bytes, decompressing
+        it transparently if it has been compressed.
+        """
+        # A second attempt covers a file compressed between locate and open
+        for _ in range(2):
+            file_path, codec = self.locate(filename)
+            try:
+                if codec is None:
+                    return open(file_path, "rb", buffering=0)
+                return codec.open_read(file_path)
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"File {filename} not found")
+    
+    @timed(_COMPRESS_SECONDS)
+    def compress_file(
+        self,
+        filename: str,
+        expected_hash: str,
+        codec: Codec,
+        level: Optional[int] = None,
+        min_savings: float = 0.0
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Replace a stored file with a compressed copy of it.
+        
+        The original is hashed while it is compressed, and the copy is
+        decompressed and hashed again before it replaces the original,
+        so a file is only ever swapped for a copy that provably yields
+        expected_hash. Files whose leading COMPRESSION_SAMPLE_BYTES (and
+        then whole contents) shrink by less than min_savings are left
+        alone. The copy is renamed into place before the original is
+        removed, so readers always find one of the two.
+        
+        Returns:
+            Tuple of (original size, compressed size), or None if the file
+            was left uncompressed
+        
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file does not match expected_hash
+        """
+        file_path, current = self.locate(filename)
+        if current is not None:
+            return None
+        target = file_path.with_name(file_path.name + codec.suffix)
+        part_path = target.with_name(target.name + ".part")
+        
+        with open(file_path, "rb", buffering=0) as src:
+            if compression_ratio(codec, src.read(COMPRESSION_SAMPLE_BYTES), level) > 1 - min_savings:
+                return None
+            src.seek(0)
+            sha256_hash = hashlib.sha256()
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            file_size = 0
+            try:
+                with codec.open_write(part_path, level) as dst:
+                    while True:
+                        n = src.readinto(buffer)
+                        if not n:
+                            break
+                        sha256_hash.update(view[:n])
+                        dst.write(view[:n])
+                        file_size += n
+                if sha256_hash.hexdigest() != expected_hash:
+                    raise ValueError(f"File {filename} does not match its registered hash")
+                compressed_size = os.stat(part_path).st_size
+                if compressed_size > file_size * (1 - min_savings):
+                    part_path.unlink()
+                    return None
+                if self.calculate_compressed_hash(part_path, codec.name) != expected_hash:
+                    raise ValueError(f"Compressed copy of {filename} does not decompress to the original")
+                with open(part_path, "rb") as f:
+                    os.fsync(f.fileno())
+                os.replace(part_path, target)
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                raise
+        
+        file_path.unlink()
+        if self.layout.sharded and file_path.parent != self.layout.root:
+            # A migration may have left the flat name linked as well
+            (self.layout.root / filename).unlink(missing_ok=True)
+        return file_size, compressed_size
+    
+    @timed(_DELETE_SECONDS)
     def delete_file(self, filename: str) -> bool:
-        """Delete a stored file"""
-        file_path = STORAGE_DIR / filename
+        """
+        Delete a stored file.
+        
+        A shared blob only loses one reference; it is deleted with the
+        last one.
+        """
+        if is_blob_name(filename) and self.content.ref_count(filename):
+            if self.content.release(filename):
+                self.get_manifest_path(filename).unlink(missing_ok=True)
+                self._delete_compressed(filename)
+            return True
+        file_path, codec = self.locate(filename)
         if file_path.exists():
             file_path.unlink()
+            self.get_manifest_path(filename).unlink(missing_ok=True)
+            self._delete_compressed(filename)
+            if self.layout.sharded:
+                # A migration may have left the flat names linked as well
+                (self.layout.root / filename).unlink(missing_ok=True)
+                (self.layout.root / f"{filename}.merkle.json").unlink(missing_ok=True)
             return True
         return False
     
+    def _delete_compressed(self, filename: str) -> None:
+        """Remove any compressed copies of a stored file"""
+        for codec in CODECS.values():
+            self.layout.path(filename, codec.suffix).unlink(missing_ok=True)
+            if self.layout.sharded:
+                (self.layout.root / f"{filename}{codec.suffix}").unlink(missing_ok=True)
+    
+    def get_manifest_path(self, filename: str) -> Path:
+        """Get the path of a stored file's Merkle manifest"""
+        return self.layout.path(filename, ".merkle.json")
+    
+    def write_manifest(self, filename: str, manifest: Dict[str, Any]) -> None:
+        """Store a Merkle manifest next to its file"""
+        with open(self.get_manifest_path(filename), "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+    
+    def load_manifest(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Load a stored file's Merkle manifest, if it has one"""
+        try:
+            with open(self.get_manifest_path(filename)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
     def get_file_path(self, filename: str) -> Path:
         """Get the full path of a stored file"""
-        return STORAGE_DIR / filename
+        return self.layout.path(filename)
+    
+    def get_part_path(self, filename: str) -> Path:
+        """
+        Get the path a stored file is written to before it is complete.
+        
+        The file's shard directory is created if needed, so the part file
+        can be written and then renamed into place.
+        """
+        directory = self.layout.directory(filename)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{filename}.part"
+    
+    async def store_file_async(self, file_bytes: bytes, original_filename: str) -> Tuple[str, str, int]:
+        """Store a file on the worker pool (see store_file)"""
+        return await self.pool.run(self.store_file, file_bytes, original_filename)
+    
+    async def retrieve_file_async(self, filename: str) -> bytes:
+        """Retrieve a stored file on the worker pool (see retrieve_file)"""
+        return await self.pool.run(self.retrieve_file, filename)
+    
+    async def calculate_hash_async(self, file_path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+        """Calculate the SHA-256 hash of a file on the worker pool"""
+        return await self.pool.run(self.calculate_hash, file_path, chunk_size)
+    
+    async def calculate_hash_from_bytes_async(self, file_bytes: bytes) -> str:
+        """Calculate the SHA-256 hash of bytes on the worker pool"""
+        return await self.pool.run(self.calculate_hash_from_bytes, file_bytes)
@@ -0,0 +1,103 @@
+"""Token Cache - Recently verified JWTs keyed by token digest"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from ..models.auth import User
+
+# Longest a verified token is reused before it is decoded again (seconds, 0 disables the cache)
+JWT_CACHE_TTL_SECONDS = float(os.environ.get("JWT_CACHE_TTL_SECONDS", 300))
+# Maximum number of cached tokens
+JWT_CACHE_MAX_ENTRIES = int(os.environ.get("JWT_CACHE_MAX_ENTRIES", 4096))
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens and the users they carry.
+
+    Entries are keyed on the SHA-256 digest of the token, so raw tokens
+    are never kept in memory. An entry expires ttl_seconds after it was
+    cached, or at the token's own exp claim if that is sooner; an expired
+    token therefore always goes back through jwt.decode and is rejected
+    there. Only successfully verified tokens are cached, and the cached
+    User is frozen so it can be handed to every request.
+
+    Token verification runs on FastAPI's threadpool, hence the lock.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = JWT_CACHE_TTL_SECONDS,
+        max_entries: int = JWT_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # digest -> (user, expiry as a Unix timestamp)
+        self._entries: "OrderedDict[bytes, Tuple[User, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[User]:
+        """Get the user of a cached, unexpired token"""
+        if not self.enabled:
+            return None
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() >= entry[1]:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, user: User, token_exp: float) -> None:
+        """
+        Remember a verified token.
+
+        Args:
+            token: Raw bearer token
+            user: User decoded from the token
+            token_exp: The token's exp claim (Unix timestamp)
+        """
+        if not self.enabled:
+            return
+        expires_at = min(time.time() + self.ttl_seconds, token_exp)
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (user, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, token: str) -> None:
+        """Drop a token, e.g. when it is revoked"""
+        with self._lock:
+            self._entries.pop(self.key(token), None)
+
+    def evict_user(self, user_id: str) -> None:
+        """Drop every cached token of a user, e.g. when their access changes"""
+        with self._lock:
+            for key in [k for k, (user, _) in self._entries.items() if user.id == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,268 @@
+"""Upload Sessions - Resumable, chunked uploads hashed as the bytes arrive"""
+import os
+import time
+import uuid
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..models.auth import User
+from ..models.evidence import UploadSessionCreate, UploadSessionStatus
+from .content_store import CONTENT_HEAD_BYTES
+from .merkle import MERKLE_ENABLED, MerkleBuilder
+from .storage_service import HASH_CHUNK_SIZE, StorageService
+
+# Idle time after which an unfinished upload is discarded (seconds)
+UPLOAD_SESSION_TTL_SECONDS = float(os.environ.get("UPLOAD_SESSION_TTL_SECONDS", 24 * 3600))
+# Largest file accepted through an upload session (bytes)
+UPLOAD_SESSION_MAX_SIZE = int(os.environ.get("UPLOAD_SESSION_MAX_SIZE", 1 << 40))
+
+
+class UploadSession:
+    """
+    One resumable upload, written straight into its .part file.
+
+    Chunks may arrive in any order and in parallel; each is written at
+    its offset with pwrite. SHA-256 (and the Merkle builder) can only
+    consume bytes in order, so the session hashes the contiguous prefix
+    received so far: a chunk that extends the prefix is hashed from
+    memory, and any later chunks it joins up with are read back from
+    the file. When the last byte arrives the digest is ready, so
+    finalizing never re-reads the file.
+
+    Bytes are only hashed once no chunk is still being written over
+    them, and a chunk overlapping one still being written is rejected,
+    so the hashed prefix always matches the file. Committing or
+    discarding stops new writes and waits for those in progress before
+    the file is closed.
+    """
+
+    def __init__(self, request: UploadSessionCreate, user: User, storage: StorageService):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.user = user
+        self.size = request.size
+        self.storage = storage
+        self.stored_filename = storage.generate_filename(request.filename)
+        self.part_path = storage.get_part_path(self.stored_filename)
+        self.sha256 = hashlib.sha256()
+        # Digest of the leading bytes, for the content store's duplicate index
+        self.head_sha256 = hashlib.sha256()
+        self.merkle = MerkleBuilder() if MERKLE_ENABLED else None
+        # Merged, sorted [start, end) ranges written so far
+        self.received: List[List[int]] = []
+        self.hashed = 0
+        self.finalizing = False
+        self.touched = time.monotonic()
+        self._lock = threading.Lock()
+        # [start, end) ranges of chunks being written right now
+        self._writing: List[Tuple[int, int]] = []
+        self._idle = threading.Condition(self._lock)
+        self.part_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.part_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    @property
+    def received_bytes(self) -> int:
+        return sum(end - start for start, end in self.received)
+
+    @property
+    def complete(self) -> bool:
+        return self.hashed == self.size
+
+    def status(self, ttl_seconds: float) -> UploadSessionStatus:
+        with self._lock:
+            received = [list(r) for r in self.received]
+        return UploadSessionStatus(
+            id=self.id,
+            filename=self.request.filename,
+            size=self.size,
+            received=received,
+            received_bytes=sum(end - start for start, end in received),
+            hashed_bytes=self.hashed,
+            complete=self.complete,
+            expires_at=datetime.utcnow() + timedelta(
+                seconds=ttl_seconds - (time.monotonic() - self.touched)
+            )
+        )
+
+    def _add_range(self, start: int, end: int) -> None:
+        """Merge [start, end) into the received ranges"""
+        merged: List[List[int]] = []
+        for r in self.received:
+            if r[1] < start or r[0] > end:
+                merged.append(r)
+            else:
+                start, end = min(start, r[0]), max(end, r[1])
+        merged.append([start, end])
+        merged.sort()
+        self.received = merged
+
+    def _hash(self, data) -> None:
+        if self.hashed < CONTENT_HEAD_BYTES:
+            self.head_sha256.update(data[:CONTENT_HEAD_BYTES - self.hashed])
+        self.sha256.update(data)
+        if self.merkle is not None:
+            self.merkle.update(data)
+
+    def write(self, offset: int, data: bytes) -> None:
+        """
+        Write one chunk at its offset and advance the hash (blocking; run
+        on a worker pool).
+
+        Bytes below the hashed prefix are already final and are skipped,
+        so retrying a chunk whose response was lost is harmless.
+
+        Raises:
+            ValueError: If the chunk runs past the file size, overlaps a
+                chunk still being written, or the session is closed
+        """
+        end = offset + len(data)
+        if end > self.size:
+            raise ValueError(f"Chunk ends at byte {end}, past the file size {self.size}")
+        view = memoryview(data)
+        with self._lock:
+            if self._fd < 0:
+                raise ValueError("Upload is no longer accepting chunks")
+            if end <= self.hashed:
+                return
+            if offset < self.hashed:
+                view = view[self.hashed - offset:]
+                offset = self.hashed
+            if any(start < end and offset < stop for start, stop in self._writing):
+                raise ValueError(f"Bytes {offset}-{end - 1} overlap a chunk still being written")
+            fd = self._fd
+            span = (offset, end)
+            self._writing.append(span)
+        try:
+            os.pwrite(fd, view, offset)
+            with self._lock:
+                self._add_range(offset, end)
+                if offset == self.hashed:
+                    self._hash(view)
+                    self.hashed = end
+                # Catch up over chunks that arrived early and now join the
+                # prefix, stopping short of any still being written
+                prefix_end = self.received[0][1] if self.received and self.received[0][0] == 0 else 0
+                for other in self._writing:
+                    if other is not span:
+                        prefix_end = min(prefix_end, other[0])
+                while self.hashed < prefix_end:
+                    chunk = os.pread(fd, min(HASH_CHUNK_SIZE, prefix_end - self.hashed), self.hashed)
+                    self._hash(chunk)
+                    self.hashed += len(chunk)
+        finally:
+            with self._lock:
+                self._writing.remove(span)
+                self._idle.notify_all()
+
+    def _close(self) -> int:
+        """Refuse further chunks and wait for those being written (lock held); returns the open fd or -1"""
+        fd, self._fd = self._fd, -1
+        while self._writing:
+            self._idle.wait()
+        return fd
+
+    def commit(self) -> None:
+        """
+        Move the finished file into place (blocking).
+
+        With content-addressed storage the file becomes (or is dropped in
+        favour of) the blob for its hash, and stored_filename changes to
+        the blob's name.
+        """
+        with self._lock:
+            fd = self._close()
+        if fd >= 0:
+            os.fsync(fd)
+            os.close(fd)
+        if self.storage.content_addressed:
+            self.stored_filename = self.storage.content.adopt(
+                self.part_path, self.sha256.hexdigest(), self.size, self.head_sha256.hexdigest()
+            )
+        else:
+            os.replace(self.part_path, self.storage.get_file_path(self.stored_filename))
+
+    def discard(self) -> None:
+        """Drop the partial file (blocking)"""
+        with self._lock:
+            fd = self._close()
+        if fd >= 0:
+            os.close(fd)
+        self.part_path.unlink(missing_ok=True)
+
+
+class UploadSessionManager:
+    """Open upload sessions, expiring those left idle past ttl_seconds"""
+
+    def __init__(
+        self,
+        storage: StorageService,
+        ttl_seconds: float = UPLOAD_SESSION_TTL_SECONDS,
+        max_size: int = UPLOAD_SESSION_MAX_SIZE
+    ):
+        self.storage = storage
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._sessions: Dict[str, UploadSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def _expire(self) -> None:
+        now = time.monotonic()
+        expired = [
+            session for session in self._sessions.values()
+            if not session.finalizing and now - session.touched > self.ttl_seconds
+        ]
+        for session in expired:
+            await self.discard(session)
+
+    async def create(self, request: UploadSessionCreate, user: User) -> UploadSession:
+        """Open a session and its empty .part file"""
+        if request.size > self.max_size:
+            raise ValueError(f"File size {request.size} exceeds the limit of {self.max_size} bytes")
+        await self._expire()
+        session = await self.storage.pool.run(UploadSession, request, user, self.storage)
+        self._sessions[session.id] = session
+        return session
+
+    async def get(self, session_id: str, user: User) -> Optional[UploadSession]:
+        """Get a live session; sessions are only visible to the user who opened them"""
+        await self._expire()
+        session = self._sessions.get(session_id)
+        if session is None or session.user.id != user.id:
+            return None
+        session.touched = time.monotonic()
+        return session
+
+    async def write(self, session: UploadSession, offset: int, data: bytes) -> None:
+        if session.finalizing:
+            raise ValueError("Upload is already being finalized")
+        session.touched = time.monotonic()
+        await self.storage.pool.run(session.write, offset, data)
+
+    async def commit(self, session: UploadSession) -> None:
+        """Move a complete upload into storage and close the session"""
+        if not session.complete:
+            raise ValueError(
+                f"Upload incomplete: {session.hashed} of {session.size} contiguous bytes received"
+            )
+        if session.finalizing:
+            raise ValueError("Upload is already being finalized")
+        session.finalizing = True
+        try:
+            await self.storage.pool.run(session.commit)
+        except BaseException:
+            session.finalizing = False
+            raise
+        self._sessions.pop(session.id, None)
+
+    async def discard(self, session: UploadSession) -> None:
+        self._sessions.pop(session.id, None)
+        await self.storage.pool.run(session.discard)
+
+    async def close(self) -> None:
+        """Discard every unfinished upload"""
+        for session in list(self._sessions.values()):
+            await self.discard(session)
@@ -0,0 +1,77 @@
+"""Verification Cache - Recently verified digests keyed on file identity"""
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+# How long a verified digest may be reused (seconds, 0 disables the cache)
+VERIFY_CACHE_TTL_SECONDS = float(os.environ.get("VERIFY_CACHE_TTL_SECONDS", 60))
+# Maximum number of cached digests
+VERIFY_CACHE_MAX_ENTRIES = int(os.environ.get("VERIFY_CACHE_MAX_ENTRIES", 10000))
+
+# (stored filename, inode, size, mtime_ns, ctime_ns)
+FileIdentity = Tuple[str, int, int, int, int]
+
+
+class VerificationCache:
+    """
+    Bounded LRU cache of verified SHA-256 digests.
+
+    Entries are keyed on the stored filename plus the file's inode, size,
+    mtime_ns and ctime_ns, so any write, truncation, replacement or
+    metadata change produces a different key and forces a fresh hash.
+    Entries are only reused within the freshness window.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = VERIFY_CACHE_TTL_SECONDS,
+        max_entries: int = VERIFY_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[FileIdentity, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @staticmethod
+    def identity(filename: str, file_path: Path) -> FileIdentity:
+        """Stat a stored file and build its cache key (raises FileNotFoundError)"""
+        st = os.stat(file_path)
+        return (filename, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+    def get(self, identity: FileIdentity) -> Optional[str]:
+        """Get a fresh cached digest for this file identity"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(identity)
+        if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+            if entry is not None:
+                del self._entries[identity]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(identity)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, identity: FileIdentity, digest: str) -> None:
+        """Remember a verified digest for this file identity"""
+        if not self.enabled:
+            return
+        self._entries[identity] = (digest, time.monotonic())
+        self._entries.move_to_end(identity)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, filename: str) -> None:
+        """Drop every cached digest for a stored file"""
+        for identity in [k for k in self._entries if k[0] == filename]:
+            del self._entries[identity]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,136 @@
+"""Worker Pool - Bounded thread/process pools for blocking storage and hashing work"""
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, Optional, TypeVar
+
+T = TypeVar("T")
+
+PoolKind = Literal["thread", "process"]
+
+# Number of worker threads (hashlib releases the GIL on large buffers,
+# so hashing scales with cores)
+POOL_MAX_WORKERS = int(os.environ.get("STORAGE_POOL_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+# Number of jobs allowed to wait for a free worker before callers are held back
+POOL_QUEUE_DEPTH = int(os.environ.get("STORAGE_POOL_QUEUE_DEPTH", 64))
+
+# Pool used for batch verification, sized to the cores by default
+HASH_POOL_KIND: PoolKind = os.environ.get("HASH_POOL_KIND", "thread")
+HASH_POOL_WORKERS = int(os.environ.get("HASH_POOL_WORKERS", os.cpu_count() or 1))
+HASH_POOL_QUEUE_DEPTH = int(os.environ.get("HASH_POOL_QUEUE_DEPTH", HASH_POOL_WORKERS * 2))
+
+
+class WorkerPool:
+    """
+    Bounded thread or process pool for running blocking work from async handlers.
+
+    At most max_workers jobs run at once and at most queue_depth more
+    wait for a worker. Further callers await a free slot instead of
+    growing the executor's queue without limit. Process pools need
+    picklable, module-level callables.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = POOL_MAX_WORKERS,
+        queue_depth: int = POOL_QUEUE_DEPTH,
+        thread_name_prefix: str = "storage",
+        kind: PoolKind = "thread"
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.thread_name_prefix = thread_name_prefix
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._submitted = 0
+        self._running = 0
+        self._running_lock = threading.Lock()
+
+    @property
+    def running(self) -> int:
+        """Number of jobs currently executing on a worker"""
+        if self.kind == "process":
+            return min(self._submitted, self.max_workers)
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs waiting for a free worker"""
+        return self._submitted - self.running
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use (and again after shutdown)"""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the admission semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers + self.queue_depth)
+            self._loop = loop
+        return self._semaphore
+
+    def _call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a job on a worker thread, tracking the running count"""
+        with self._running_lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._running_lock:
+                self._running -= 1
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Args:
+            func: Blocking callable
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            The callable's return value
+        """
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        async with self._get_semaphore():
+            self._submitted += 1
+            try:
+                loop = asyncio.get_running_loop()
+                if self.kind == "process":
+                    return await loop.run_in_executor(self._get_executor(), func, *args)
+                return await loop.run_in_executor(self._get_executor(), self._call, func, *args)
+            finally:
+                self._submitted -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Global pool for blocking storage I/O and hashing
+storage_pool = WorkerPool()
+
+# Global pool for fanning out batch integrity verification
+hash_pool = WorkerPool(
+    max_workers=HASH_POOL_WORKERS,
+    queue_depth=HASH_POOL_QUEUE_DEPTH,
+    thread_name_prefix="hash",
+    kind=HASH_POOL_KIND
+)
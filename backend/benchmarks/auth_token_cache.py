@@ -0,0 +1,76 @@
+"""
+Authentication cost benchmark.
+
+Measures the per-request cost of AuthService.verify_token with the same
+bearer token, as a dashboard issuing many calls per page view would:
+- uncached: jwt.decode (HMAC check) plus building a User every call
+- cached: one digest of the token and an LRU lookup
+
+Usage (from backend/):
+    python -m benchmarks.auth_token_cache --requests 100000 --tokens 1 50
+"""
+import argparse
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.services import auth_service
+from app.services.auth_service import MOCK_USERS, AuthService
+from app.services.token_cache import TokenCache
+
+
+def make_credentials(count: int):
+    """Issue tokens for count distinct users"""
+    users = list(MOCK_USERS.values())
+    credentials = []
+    for i in range(count):
+        user = users[i % len(users)].model_copy(update={"id": f"usr-bench-{i}"})
+        token, _ = AuthService.create_access_token(user)
+        credentials.append(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    return credentials
+
+
+def measure(name: str, cache: TokenCache, credentials, requests: int) -> dict:
+    """Verify tokens round-robin through the given cache"""
+    auth_service.token_cache = cache
+    start = time.perf_counter()
+    for i in range(requests):
+        AuthService.verify_token(credentials[i % len(credentials)])
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "us_per_request": elapsed / requests * 1e6,
+        "requests_per_s": requests / elapsed,
+        "hit_rate": cache.hits / max(1, cache.hits + cache.misses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100000, help="Verifications per run")
+    parser.add_argument("--tokens", type=int, nargs="+", default=[1, 50],
+                        help="Numbers of distinct tokens in rotation")
+    args = parser.parse_args()
+
+    original = auth_service.token_cache
+    try:
+        for tokens in args.tokens:
+            credentials = make_credentials(tokens)
+            results = [
+                measure("uncached", TokenCache(ttl_seconds=0), credentials, args.requests),
+                measure("cached", TokenCache(), credentials, args.requests),
+            ]
+            print(f"\n{tokens} distinct token(s), {args.requests} requests")
+            print(f"{'strategy':<10} {'us/request':>11} {'requests/s':>12} {'hit rate':>9}")
+            for result in results:
+                print(
+                    f"{result['name']:<10} {result['us_per_request']:>11.2f} "
+                    f"{result['requests_per_s']:>12.0f} {result['hit_rate']:>9.1%}"
+                )
+            print(f"speedup: {results[0]['us_per_request'] / results[1]['us_per_request']:.1f}x")
+    finally:
+        auth_service.token_cache = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Integrity verification throughput benchmark.
+
+Compares the ways of hashing a stored evidence file:
+- full read into memory + calculate_hash_from_bytes (previous verify path)
+- 4 KB chunked reads (previous calculate_hash)
+- StorageService.calculate_hash with a reused readinto buffer
+
+Usage (from backend/):
+    python -m benchmarks.hash_throughput --size-mb 2048 --chunk-kb 64 256 1024 4096
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.services.storage_service import StorageService
+
+
+def hash_full_read(file_path: Path) -> str:
+    """Previous verify path: read the whole file, then hash the bytes"""
+    with open(file_path, "rb") as f:
+        return StorageService.calculate_hash_from_bytes(f.read())
+
+
+def hash_small_chunks(file_path: Path) -> str:
+    """Previous calculate_hash: iterate over 4 KB reads"""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def make_file(directory: str, size_mb: int) -> Path:
+    """Write a file of random-ish data of the given size"""
+    file_path = Path(directory) / "bench.bin"
+    block = os.urandom(1024 * 1024)
+    with open(file_path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return file_path
+
+
+def measure(name: str, func, file_path: Path, size_bytes: int) -> dict:
+    """Time one hashing strategy and record its peak Python allocation"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    digest = func(file_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "seconds": elapsed,
+        "mb_per_s": size_bytes / (1024 * 1024) / elapsed,
+        "peak_mb": peak / (1024 * 1024),
+        "digest": digest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048, help="Size of the test file in MiB")
+    parser.add_argument("--chunk-kb", type=int, nargs="+", default=[64, 256, 1024, 4096],
+                        help="Buffer sizes to try for the streaming hash")
+    parser.add_argument("--skip-full-read", action="store_true",
+                        help="Skip the full-read strategy (needs size-mb of free RAM)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = make_file(directory, args.size_mb)
+        size_bytes = file_path.stat().st_size
+
+        # Warm the page cache so every strategy reads from the same state
+        hash_small_chunks(file_path)
+
+        results = []
+        if not args.skip_full_read:
+            results.append(measure("full read", hash_full_read, file_path, size_bytes))
+        results.append(measure("4 KB chunks", hash_small_chunks, file_path, size_bytes))
+        for chunk_kb in args.chunk_kb:
+            results.append(measure(
+                f"readinto {chunk_kb} KB",
+                lambda p, c=chunk_kb * 1024: StorageService.calculate_hash(p, c),
+                file_path, size_bytes
+            ))
+
+    assert len({r["digest"] for r in results}) == 1, "strategies disagree on the digest"
+
+    print(f"File size: {args.size_mb} MiB")
+    print(f"{'strategy':<20}{'seconds':>10}{'MiB/s':>10}{'peak MiB':>10}")
+    for r in results:
+        print(f"{r['name']:<20}{r['seconds']:>10.2f}{r['mb_per_s']:>10.0f}{r['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+API load test.
+
+Drives the FastAPI app from main.py in-process over httpx's ASGI
+transport (no server, no sockets), so results reflect the application
+rather than the network stack. Concurrent virtual users, one per
+--concurrency slot and spread over the demo roles, each log in and then
+issue a weighted mix of requests:
+- login, upload (small / medium / large files), list, get, transfer,
+  verify and custody history
+
+Uploads come from the police and forensic lab users only. Custody is
+passed between roles: a user only transfers evidence its role currently
+holds (falling back to a get when it holds none), so transfers succeed
+as they would in real use.
+
+Reports per endpoint the p50/p95/p99 latency, requests/s, errors and
+the peak RSS seen as its requests completed (the process is shared, so
+this is where memory peaked, not what each endpoint costs), and writes
+the results as JSON. Pass --compare with an earlier results file to
+see the change per endpoint.
+
+Storage, ledger, database and access logs go to a temporary directory.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --duration 30 --concurrency 32 --output after.json
+    python -m benchmarks.load_test --duration 30 --concurrency 32 --compare before.json
+    python -m benchmarks.load_test --mix get=50 history=50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Default request mix (relative weights)
+DEFAULT_MIX = {
+    "login": 5,
+    "upload_small": 10,
+    "upload_medium": 4,
+    "upload_large": 1,
+    "list": 20,
+    "get": 25,
+    "transfer": 5,
+    "verify": 10,
+    "history": 20,
+}
+
+USERS = [
+    ("police_officer", "police"),
+    ("forensic_analyst", "forensic_lab"),
+    ("prosecutor", "prosecutor"),
+    ("judge", "judge"),
+]
+# Roles allowed to upload; the others only read and transfer
+UPLOADER_ROLES = ("police", "forensic_lab")
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process now (peak RSS where /proc is missing)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class Recorder:
+    """Latencies, errors and RSS samples per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.rss: Dict[str, float] = defaultdict(float)
+
+    def record(self, endpoint: str, seconds: float, status_code: int) -> None:
+        self.latencies[endpoint].append(seconds)
+        if status_code >= 400:
+            self.errors[endpoint] += 1
+        rss = current_rss_mb()
+        if rss > self.rss[endpoint]:
+            self.rss[endpoint] = rss
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors[endpoint],
+                "requests_per_s": len(values) / elapsed,
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+                "peak_rss_mb": self.rss[endpoint],
+            }
+        return endpoints
+
+
+class Workload:
+    """Shared state of a run: payloads and the evidence each role holds"""
+
+    def __init__(self, client, recorder: Recorder, args):
+        self.client = client
+        self.recorder = recorder
+        self.payloads = {
+            "upload_small": os.urandom(args.small_kb * 1024),
+            "upload_medium": os.urandom(args.medium_kb * 1024),
+            "upload_large": os.urandom(args.large_mb * 1024 * 1024),
+        }
+        self.evidence_ids: List[str] = []
+        self.held: Dict[str, List[str]] = defaultdict(list)
+
+    async def timed(self, endpoint: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.recorder.record(endpoint, time.perf_counter() - start, response.status_code)
+        return response
+
+    async def login(self, username: str, role: str) -> Dict[str, str]:
+        response = await self.timed("login", "POST", "/api/auth/login", json={
+            "username": username, "password": "demo123", "role": role
+        })
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def upload(self, endpoint: str, headers: Dict[str, str], role: str) -> None:
+        data = self.payloads[endpoint]
+        response = await self.timed(
+            endpoint, "POST", "/api/evidence/upload", headers=headers,
+            files={"file": (f"{endpoint}.bin", data, "application/octet-stream")},
+            data={"case_id": f"CASE-{random.randrange(20):03d}", "description": "Load test", "evidence_type": "document"}
+        )
+        if response.status_code == 200:
+            evidence_id = response.json()["id"]
+            self.evidence_ids.append(evidence_id)
+            self.held[role].append(evidence_id)
+
+    async def transfer(self, headers: Dict[str, str], role: str) -> bool:
+        held = self.held[role]
+        if not held:
+            return False
+        evidence_id = held.pop(random.randrange(len(held)))
+        to_username, to_role = random.choice([user for user in USERS if user[1] != role])
+        response = await self.timed(
+            "transfer", "POST", f"/api/evidence/{evidence_id}/transfer", headers=headers,
+            json={"to_role": to_role, "to_name": to_username, "reason": "Load test"}
+        )
+        self.held[to_role if response.status_code == 200 else role].append(evidence_id)
+        return True
+
+    async def run_op(self, op: str, headers: Dict[str, str], username: str, role: str) -> Dict[str, str]:
+        """Issue one request; returns the (possibly refreshed) auth headers"""
+        if op == "login":
+            return await self.login(username, role)
+        if op == "transfer" and await self.transfer(headers, role):
+            return headers
+        if op.startswith("upload_"):
+            await self.upload(op, headers, role)
+        elif op == "list":
+            await self.timed("list", "GET", "/api/evidence/", headers=headers, params={"limit": 50})
+        else:
+            evidence_id = random.choice(self.evidence_ids)
+            if op in ("get", "transfer"):
+                await self.timed("get", "GET", f"/api/evidence/{evidence_id}", headers=headers)
+            elif op == "verify":
+                await self.timed("verify", "POST", f"/api/evidence/{evidence_id}/verify", headers=headers)
+            elif op == "history":
+                await self.timed("history", "GET", f"/api/evidence/{evidence_id}/history", headers=headers)
+        return headers
+
+
+async def virtual_user(workload: Workload, index: int, mix: Dict[str, int], deadline: float, budget: List[int]):
+    username, role = USERS[index % len(USERS)]
+    headers = await workload.login(username, role)
+    if role not in UPLOADER_ROLES:
+        mix = {op: weight for op, weight in mix.items() if not op.startswith("upload_")}
+    ops, weights = list(mix), list(mix.values())
+    if not any(weights):
+        return
+    while time.perf_counter() < deadline and budget[0] > 0:
+        budget[0] -= 1
+        op = random.choices(ops, weights)[0]
+        headers = await workload.run_op(op, headers, username, role)
+
+
+async def run(args) -> Dict:
+    import httpx
+    from main import app
+
+    # main configures INFO logging; one line per request would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    recorder = Recorder()
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            workload = Workload(client, recorder, args)
+            # Seed evidence so reads have something to hit from the start
+            for i in range(args.seed):
+                username, role = USERS[i % len(UPLOADER_ROLES)]
+                headers = await workload.login(username, role)
+                await workload.upload("upload_small", headers, role)
+            recorder = workload.recorder = Recorder()
+
+            budget = [args.requests if args.requests else sys.maxsize]
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                virtual_user(workload, i, args.mix, start + args.duration, budget)
+                for i in range(args.concurrency)
+            ])
+            elapsed = time.perf_counter() - start
+    finally:
+        await app.router.shutdown()
+
+    endpoints = recorder.summary(elapsed)
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "duration": args.duration,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "mix": args.mix,
+            "small_kb": args.small_kb,
+            "medium_kb": args.medium_kb,
+            "large_mb": args.large_mb,
+        },
+        "elapsed_s": elapsed,
+        "total_requests": total,
+        "requests_per_s": total / elapsed,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "peak_rss_mb": peak_rss_mb(),
+        "endpoints": endpoints,
+    }
+
+
+def print_results(results: Dict, baseline: Optional[Dict] = None) -> None:
+    print(
+        f"\n{results['total_requests']} requests in {results['elapsed_s']:.1f}s "
+        f"({results['requests_per_s']:.0f} req/s), concurrency {results['config']['concurrency']}, "
+        f"{results['errors']} errors, peak RSS {results['peak_rss_mb']:.0f} MB"
+    )
+    header = f"{'endpoint':<15}{'reqs':>8}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'RSS MB':>8}"
+    if baseline:
+        header += f"{'p95 vs base':>13}{'req/s vs base':>15}"
+    print(header)
+    for name, e in results["endpoints"].items():
+        line = (
+            f"{name:<15}{e['requests']:>8}{e['requests_per_s']:>9.1f}{e['errors']:>8}"
+            f"{e['p50_ms']:>9.2f}{e['p95_ms']:>9.2f}{e['p99_ms']:>9.2f}{e['max_ms']:>9.1f}{e['peak_rss_mb']:>8.0f}"
+        )
+        base = (baseline or {}).get("endpoints", {}).get(name)
+        if base:
+            line += f"{change(e['p95_ms'], base['p95_ms']):>13}{change(e['requests_per_s'], base['requests_per_s']):>15}"
+        print(line)
+
+
+def change(value: float, base: float) -> str:
+    return f"{(value - base) / base * 100:+.1f}%" if base else "n/a"
+
+
+def parse_mix(items: List[str]) -> Dict[str, int]:
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Bad mix entry {item!r}; expected one of {', '.join(DEFAULT_MIX)} as name=weight")
+        mix[name] = int(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run for")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0: run for --duration)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--seed", type=int, default=50, help="Evidence uploaded before measuring")
+    parser.add_argument("--mix", nargs="+", default=None, help="Request weights as name=weight (default: %s)" % " ".join(
+        f"{name}={weight}" for name, weight in DEFAULT_MIX.items()))
+    parser.add_argument("--small-kb", type=int, default=16, help="Size of small uploads")
+    parser.add_argument("--medium-kb", type=int, default=1024, help="Size of medium uploads")
+    parser.add_argument("--large-mb", type=int, default=16, help="Size of large uploads")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+    args.mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    if args.seed < 1:
+        parser.error("--seed must be at least 1")
+
+    with tempfile.TemporaryDirectory(prefix="evidence-loadtest-") as directory:
+        # Keep the run's files out of the working tree (read when main is imported)
+        for name in ("STORAGE_DIR", "LEDGER_DIR", "ACCESS_LOG_DIR"):
+            os.environ[name] = os.path.join(directory, name.lower())
+        os.environ["SQLITE_PATH"] = os.path.join(directory, "evidence.db")
+        results = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Hot-path microbenchmarks with a regression gate.
+
+Times the individual hot paths behind the API:
+- hash: StorageService.calculate_hash (streamed, per read chunk size)
+  vs reading the file and calculate_hash_from_bytes, per file size
+- ledger: BlockchainService append cost in windows as the ledger grows
+  (to 1M events by default), to show whether appends slow down with size;
+  in memory only (ledger.append) and with the durable group-commit log
+  (ledger.append_logged, each window including the flush of its entries)
+- history: EvidenceService.get_custody_history for timelines of growing
+  length, cold (first conversion) and warm (materialized timeline)
+- serialization: a List[EvidenceResponse] response rendered the way
+  FastAPI does (serialize_response + JSONResponse) vs
+  TypeAdapter.dump_json, for growing list sizes
+
+Every metric is a time (lower is better); each is the best of --repeat
+runs to damp noise. Results are compared with a stored baseline (from a
+previous --save-baseline run on the same machine), and the run exits
+with status 1 if any metric is more than --threshold slower.
+
+Usage (from backend/):
+    python -m benchmarks.microbench --save-baseline        # record a baseline
+    python -m benchmarks.microbench                        # compare; exit 1 on regression
+    python -m benchmarks.microbench --quick --only hash serialization --threshold 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_BASELINE = Path(__file__).parent / "microbench_baseline.json"
+
+# (name, value, unit) of one measured metric
+Metric = Tuple[str, float, str]
+
+
+def best_of(repeat: int, fn: Callable[[], None]) -> float:
+    """Fastest of repeat timed calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_hash(args, directory: Path) -> List[Metric]:
+    from app.services.storage_service import StorageService
+
+    metrics = []
+    for size_mb in args.hash_sizes_mb:
+        file_path = directory / f"hash_{size_mb}mb.bin"
+        with open(file_path, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(size_mb):
+                f.write(block)
+        # Warm the page cache so reads measure memory bandwidth, not the disk
+        StorageService.calculate_hash(file_path)
+
+        for chunk_kb in args.hash_chunks_kb:
+            seconds = best_of(args.repeat, lambda: StorageService.calculate_hash(file_path, chunk_kb * 1024))
+            metrics.append((f"hash.file.{size_mb}MB.chunk{chunk_kb}KB", seconds * 1000, "ms"))
+
+        def read_then_hash():
+            with open(file_path, "rb") as f:
+                StorageService.calculate_hash_from_bytes(f.read())
+        metrics.append((f"hash.read_bytes.{size_mb}MB", best_of(args.repeat, read_then_hash) * 1000, "ms"))
+
+        data = file_path.read_bytes()
+        seconds = best_of(args.repeat, lambda: StorageService.calculate_hash_from_bytes(data))
+        metrics.append((f"hash.bytes_only.{size_mb}MB", seconds * 1000, "ms"))
+        del data
+        file_path.unlink()
+    return metrics
+
+
+def bench_ledger(args, directory: Path) -> List[Metric]:
+    from app.services.ledger_log import LedgerLog
+
+    metrics = ledger_appends(args, "ledger.append")
+    log = LedgerLog(directory / "ledger_bench")
+    try:
+        metrics += ledger_appends(args, "ledger.append_logged", log)
+    finally:
+        log.close()
+    return metrics
+
+
+def ledger_appends(args, prefix: str, log=None) -> List[Metric]:
+    """Per-event append time in windows as the ledger grows, flushing log at each window's end"""
+    from app.services.blockchain_service import BlockchainService
+
+    service = BlockchainService(log)
+    evidence_ids = [f"EVD-{i:08X}" for i in range(args.ledger_records)]
+    for evidence_id in evidence_ids:
+        service.create_evidence_record(
+            evidence_id=evidence_id, file_hash="0" * 64, custodian="police",
+            metadata={"case_id": "CASE-0001", "description": "Benchmark"}
+        )
+    service.flush()
+
+    metrics = []
+    total = len(evidence_ids)
+    window = max(1, args.ledger_events // args.ledger_windows)
+    while total < args.ledger_events:
+        count = min(window, args.ledger_events - total)
+        start = time.perf_counter()
+        for i in range(total, total + count):
+            service.log_access_event(
+                evidence_id=evidence_ids[i % len(evidence_ids)], actor="police", actor_name="Benchmark"
+            )
+        service.flush()
+        seconds = time.perf_counter() - start
+        total += count
+        metrics.append((f"{prefix}.at_{total // 1000}k", seconds / count * 1e6, "us/event"))
+    return metrics
+
+
+def bench_history(args, directory: Path) -> List[Metric]:
+    from app.models.evidence import Evidence
+    from app.repositories import InMemoryEvidenceRepository
+    from app.services.blockchain_service import BlockchainService
+    from app.services.custody_timeline import TimelineCache
+    from app.services.evidence_service import EvidenceService
+    from app.services.fabric_gateway import LocalFabricGateway
+
+    async def run() -> List[Metric]:
+        ledger = BlockchainService()
+        service = EvidenceService(LocalFabricGateway(ledger), InMemoryEvidenceRepository())
+        metrics = []
+        for length in args.history_lengths:
+            evidence = Evidence(
+                case_id="CASE-0001", filename="bench.bin", original_filename="bench.bin",
+                evidence_type="document", description="Benchmark", file_hash="0" * 64,
+                file_size=0, custodian="police", custodian_name="Benchmark"
+            )
+            await service.repository.save_evidence(evidence)
+            ledger.create_evidence_record(
+                evidence_id=evidence.id, file_hash="0" * 64, custodian="police", metadata={}
+            )
+            for _ in range(length - 1):
+                ledger.log_access_event(evidence_id=evidence.id, actor="police", actor_name="Benchmark")
+
+            cold = warm = float("inf")
+            for _ in range(args.repeat):
+                service.timelines = TimelineCache()
+                start = time.perf_counter()
+                await service.get_custody_history(evidence.id)
+                cold = min(cold, time.perf_counter() - start)
+                start = time.perf_counter()
+                await service.get_custody_history(evidence.id)
+                warm = min(warm, time.perf_counter() - start)
+            metrics.append((f"history.cold.{length}", cold * 1000, "ms"))
+            metrics.append((f"history.warm.{length}", warm * 1000, "ms"))
+        await service.access_events.close()
+        return metrics
+
+    return asyncio.run(run())
+
+
+def bench_serialization(args, directory: Path) -> List[Metric]:
+    from typing import List as ListType
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from pydantic import TypeAdapter
+
+    from app.models.evidence import Evidence, EvidenceResponse
+
+    field = create_response_field(name="Response_list_evidence", type_=ListType[EvidenceResponse])
+    adapter = TypeAdapter(ListType[EvidenceResponse])
+    metrics = []
+    for count in args.serialize_counts:
+        records = [
+            Evidence(
+                case_id=f"CASE-{i % 100:04d}", filename=f"{i}.bin", original_filename=f"evidence-{i}.pdf",
+                evidence_type="document", description="Seized laptop disk image", file_hash="0" * 64,
+                file_size=i, custodian="police", custodian_name="Officer John Smith",
+                blockchain_tx="0x" + "ab" * 32
+            )
+            for i in range(count)
+        ]
+
+        async def fastapi_path() -> float:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                content = await serialize_response(field=field, response_content=records)
+                JSONResponse(content).body
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        metrics.append((f"serialize.fastapi.{count}", asyncio.run(fastapi_path()) * 1000, "ms"))
+        seconds = best_of(args.repeat, lambda: adapter.dump_json(records))
+        metrics.append((f"serialize.dump_json.{count}", seconds * 1000, "ms"))
+    return metrics
+
+
+BENCHMARKS = {
+    "hash": bench_hash,
+    "ledger": bench_ledger,
+    "history": bench_history,
+    "serialization": bench_serialization,
+}
+
+
+def compare(metrics: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Names of metrics more than threshold slower than the baseline"""
+    return [
+        name for name, metric in metrics.items()
+        if name in baseline and metric["value"] > baseline[name]["value"] * (1 + threshold)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, for CI")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per metric; the fastest counts")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs the baseline (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to this JSON file")
+    parser.add_argument("--hash-sizes-mb", type=int, nargs="+", help="File sizes to hash")
+    parser.add_argument("--hash-chunks-kb", type=int, nargs="+", help="Read chunk sizes for calculate_hash")
+    parser.add_argument("--ledger-events", type=int, help="Events to grow the ledger to")
+    parser.add_argument("--ledger-windows", type=int, default=10, help="Measurement windows along the way")
+    parser.add_argument("--ledger-records", type=int, default=10000, help="Evidence records the events are spread over")
+    parser.add_argument("--history-lengths", type=int, nargs="+", help="Custody timeline lengths")
+    parser.add_argument("--serialize-counts", type=int, nargs="+", help="EvidenceResponse list sizes")
+    args = parser.parse_args()
+
+    defaults = {
+        "hash_sizes_mb": ([1, 16], [1, 16, 256]),
+        "hash_chunks_kb": ([64, 1024], [64, 256, 1024, 4096]),
+        "ledger_events": (100_000, 1_000_000),
+        "history_lengths": ([10, 100, 1000], [10, 100, 1000, 10000]),
+        "serialize_counts": ([100, 1000], [100, 1000, 10000]),
+    }
+    for name, (quick, full) in defaults.items():
+        if getattr(args, name) is None:
+            setattr(args, name, quick if args.quick else full)
+
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory(prefix="evidence-microbench-") as directory:
+        # Keep the services' files out of the working tree (read when app modules are imported)
+        for name in ("STORAGE_DIR", "LEDGER_DIR", "ACCESS_LOG_DIR"):
+            os.environ[name] = os.path.join(directory, name.lower())
+        # The module-level ledger is not measured; bench_ledger makes its own
+        os.environ["LEDGER_ENABLED"] = "false"
+        for name in args.only or BENCHMARKS:
+            print(f"Running {name}...", flush=True)
+            for metric, value, unit in BENCHMARKS[name](args, Path(directory)):
+                results[metric] = {"value": value, "unit": unit}
+
+    baseline: Dict[str, Dict] = {}
+    if not args.save_baseline and args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)["metrics"]
+
+    regressions = compare(results, baseline, args.threshold)
+    print(f"\n{'metric':<34}{'value':>12}  {'unit':<9}{'baseline':>12}{'change':>9}")
+    for name, metric in results.items():
+        line = f"{name:<34}{metric['value']:>12.3f}  {metric['unit']:<9}"
+        if name in baseline:
+            base = baseline[name]["value"]
+            line += f"{base:>12.3f}{(metric['value'] - base) / base * 100:>+8.1f}%"
+            if name in regressions:
+                line += "  REGRESSION"
+        print(line)
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": results,
+    }
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {path}")
+
+    if args.save_baseline:
+        return
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+    elif regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    else:
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
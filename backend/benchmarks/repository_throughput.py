@@ -0,0 +1,116 @@
+"""
+Evidence repository benchmark.
+
+Compares the in-memory and SQLite (WAL) evidence repositories on:
+- inserting evidence records
+- fetching records by ID
+- filtered, cursor-paginated listing (walking every page of one case)
+- appending access logs (batched inserts for SQLite)
+
+Usage (from backend/):
+    python -m benchmarks.repository_throughput --records 50000 --page-size 100
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.models.evidence import AccessLog, Evidence
+from app.repositories import InMemoryEvidenceRepository
+from app.repositories.sqlite import SQLiteEvidenceRepository
+
+
+def make_records(count: int, cases: int):
+    """Build evidence records spread over cases, custodians and types"""
+    custodians = ["police", "forensic_lab", "prosecutor", "judge"]
+    types = ["document", "image", "video", "audio"]
+    return [
+        Evidence(
+            case_id=f"CASE-{i % cases:04d}",
+            filename=f"{i}.bin",
+            original_filename=f"{i}.bin",
+            evidence_type=random.choice(types),
+            description="benchmark record",
+            file_hash="0" * 64,
+            file_size=1024,
+            custodian=random.choice(custodians),
+            custodian_name="Benchmark"
+        )
+        for i in range(count)
+    ]
+
+
+async def timed(label: str, count: int, coro) -> dict:
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    return {"name": label, "seconds": elapsed, "ops_per_s": count / elapsed if elapsed else float("inf")}
+
+
+async def run(repository, records, args) -> list:
+    async def insert():
+        await asyncio.gather(*[repository.save_evidence(e) for e in records])
+
+    lookups = random.sample(records, min(args.lookups, len(records)))
+
+    async def lookup():
+        await asyncio.gather(*[repository.get_evidence(e.id) for e in lookups])
+
+    async def walk_case():
+        cursor = None
+        while True:
+            _, cursor = await repository.list_evidence(
+                {"case_id": "CASE-0000"}, cursor=cursor, limit=args.page_size
+            )
+            if cursor is None:
+                break
+
+    async def access_logs():
+        for i in range(args.access_logs):
+            await repository.add_access_log(AccessLog(
+                evidence_id=lookups[i % len(lookups)].id,
+                event_type="accessed",
+                actor_role="police",
+                actor_name="Benchmark"
+            ))
+        await repository.get_access_logs(lookups[0].id)
+
+    case_size = sum(1 for e in records if e.case_id == "CASE-0000")
+    results = [
+        await timed("insert", len(records), insert()),
+        await timed("get by id", len(lookups), lookup()),
+        await timed(f"walk case ({case_size})", case_size, walk_case()),
+        await timed("access logs", args.access_logs, access_logs()),
+    ]
+    await repository.close()
+    return results
+
+
+async def main_async(args):
+    records = make_records(args.records, args.cases)
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": InMemoryEvidenceRepository(),
+            "sqlite": SQLiteEvidenceRepository(Path(directory) / "bench.db"),
+        }
+        print(f"Records: {args.records}, cases: {args.cases}, page size: {args.page_size}")
+        print(f"{'backend':<10}{'operation':<24}{'seconds':>10}{'ops/s':>12}")
+        for backend, repository in backends.items():
+            for r in await run(repository, records, args):
+                print(f"{backend:<10}{r['name']:<24}{r['seconds']:>10.3f}{r['ops_per_s']:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50000, help="Evidence records to insert")
+    parser.add_argument("--cases", type=int, default=100, help="Number of distinct cases")
+    parser.add_argument("--page-size", type=int, default=100, help="Listing page size")
+    parser.add_argument("--lookups", type=int, default=5000, help="Lookups by ID")
+    parser.add_argument("--access-logs", type=int, default=20000, help="Access log entries to append")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
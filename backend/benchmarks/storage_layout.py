@@ -0,0 +1,87 @@
+"""
+Storage layout benchmark.
+
+Compares the flat evidence_storage directory with hash-prefix shards
+(StorageLayout) at a given file count:
+- creating empty files under their stored names
+- looking up random stored files (StorageLayout.path + stat)
+- listing the storage root (what ls and backup tools walk first)
+
+Usage (from backend/):
+    python -m benchmarks.storage_layout --files 1000000 --lookups 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from app.services.storage_layout import StorageLayout
+
+
+def make_names(count: int):
+    """Stored filenames in the StorageService.generate_filename format"""
+    return [f"20260101_120000_{uuid.uuid4().hex[:8]}.bin" for _ in range(count)]
+
+
+def measure(name: str, layout: StorageLayout, names, lookups: int) -> dict:
+    start = time.perf_counter()
+    made = set()
+    for filename in names:
+        directory = layout.directory(filename)
+        if directory not in made:
+            directory.mkdir(parents=True, exist_ok=True)
+            made.add(directory)
+        os.close(os.open(directory / filename, os.O_CREAT | os.O_WRONLY, 0o644))
+    create_seconds = time.perf_counter() - start
+
+    sample = random.sample(names, min(lookups, len(names)))
+    start = time.perf_counter()
+    for filename in sample:
+        os.stat(layout.path(filename))
+    lookup_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with os.scandir(layout.root) as entries:
+        root_entries = sum(1 for _ in entries)
+    list_seconds = time.perf_counter() - start
+
+    return {
+        "name": name,
+        "create_us": create_seconds / len(names) * 1e6,
+        "lookup_us": lookup_seconds / len(sample) * 1e6,
+        "list_root_ms": list_seconds * 1000,
+        "root_entries": root_entries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1_000_000, help="Files to create per layout")
+    parser.add_argument("--lookups", type=int, default=100_000, help="Random lookups per layout")
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1, 2], help="Shard depths to compare (0 is flat)")
+    parser.add_argument("--width", type=int, default=2, help="Hex characters per shard level")
+    parser.add_argument("--dir", default=None, help="Parent directory for the test trees (default: system temp)")
+    args = parser.parse_args()
+
+    names = make_names(args.files)
+    results = []
+    for depth in args.depths:
+        with tempfile.TemporaryDirectory(dir=args.dir) as root:
+            layout = StorageLayout(Path(root), depth=depth, width=args.width, flat_fallback=False)
+            label = "flat" if depth == 0 else f"depth {depth}"
+            results.append(measure(label, layout, names, args.lookups))
+
+    print(f"\n{args.files} files, {args.lookups} lookups, width {args.width}")
+    print(f"{'layout':<9} {'create us':>10} {'lookup us':>10} {'list root ms':>13} {'root entries':>13}")
+    for result in results:
+        print(
+            f"{result['name']:<9} {result['create_us']:>10.2f} {result['lookup_us']:>10.2f} "
+            f"{result['list_root_ms']:>13.2f} {result['root_entries']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,17 @@ Features:
 - Chain-of-custody tracking
 - Mock blockchain integration
 - Integrity verification
+- Prometheus metrics
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
+import hmac
+import time
+import asyncio
 import logging
+import threading
 from pathlib import Path
 
 # Load environment variables
@@ -23,6 +28,23 @@ load_dotenv(ROOT_DIR / '.env')
 
 # Import routers
 from app.routers import auth_router, evidence_router
+from app.services.worker_pool import storage_pool, hash_pool
+from app.services.blockchain_service import blockchain
+from app.services.ledger_log import LEDGER_ENABLED
+from app.repositories import EVIDENCE_STORE
+from app.services.fabric_gateway import gateway
+from app.services.evidence_service import evidence_service
+from app.services.storage_service import STORAGE_DIR
+from app.services.storage_migration import STORAGE_MIGRATE_ON_STARTUP, migrate_flat_files
+from app.services.worker_pool import WorkerPool
+from app.services.metrics import (
+    CONTENT_TYPE, LEDGER_SIZE, POOL_JOBS, STORE_RECORDS, MetricsMiddleware, registry
+)
+
+# Bearer token Prometheus must send to scrape /metrics (unset leaves it open)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Seconds the store record counts are reused across scrapes (counting may scan the store)
+METRICS_STORE_COUNT_TTL = float(os.environ.get("METRICS_STORE_COUNT_TTL", 60))
 
 # Create FastAPI app
 app = FastAPI(
@@ -40,8 +62,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Range", "Accept-Ranges"],
 )
 
+# Per-route request latency and in-flight requests (outermost, so it times CORS too)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(evidence_router, prefix="/api")
@@ -53,6 +79,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Gauges read from the services when /metrics is scraped
+for kind in ("records", "transactions", "blocks", "pending"):
+    LEDGER_SIZE.labels(kind).set_function(lambda kind=kind: blockchain.size()[kind])
+worker_pools = {"storage": storage_pool, "hash": hash_pool}
+repository_pool = getattr(evidence_service.repository, "pool", None)
+if isinstance(repository_pool, WorkerPool) and all(repository_pool is not p for p in worker_pools.values()):
+    worker_pools["repository"] = repository_pool
+for name, pool in worker_pools.items():
+    POOL_JOBS.labels(name, "running").set_function(lambda pool=pool: pool.running)
+    POOL_JOBS.labels(name, "queued").set_function(lambda pool=pool: pool.queued)
+    POOL_JOBS.labels(name, "queue_limit").set_function(lambda pool=pool: pool.queue_depth)
+
 @app.get("/")
 async def root():
     """API root endpoint"""
@@ -72,9 +110,17 @@ async def api_root():
             "auth": "/api/auth/login",
             "evidence": "/api/evidence",
             "upload": "/api/evidence/upload",
+            "upload_sessions": "/api/evidence/uploads",
             "verify": "/api/evidence/{id}/verify",
+            "verify_batch": "/api/evidence/verify-batch",
             "transfer": "/api/evidence/{id}/transfer",
-            "history": "/api/evidence/{id}/history"
+            "archive": "/api/evidence/{id}/archive",
+            "content": "/api/evidence/{id}/content",
+            "history": "/api/evidence/{id}/history",
+            "access_logs": "/api/evidence/{id}/access-logs",
+            "storage_stats": "/api/evidence/storage/stats",
+            "transaction": "/api/evidence/transactions/{tx_hash}",
+            "verify_chain": "/api/evidence/ledger/verify-chain"
         }
     }
 
@@ -83,16 +129,82 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "evidence-api"}
 
+# When the store record counts are next taken (monotonic clock)
+store_counts_due = 0.0
+
+async def refresh_store_counts() -> None:
+    """Count the stored records, at most once per METRICS_STORE_COUNT_TTL"""
+    global store_counts_due
+    now = time.monotonic()
+    if now < store_counts_due:
+        return
+    # Claimed before counting, so concurrent scrapes do not count again
+    store_counts_due = now + METRICS_STORE_COUNT_TTL
+    STORE_RECORDS.labels("evidence").set(await evidence_service.repository.count_evidence())
+    STORE_RECORDS.labels("access_logs").set(await evidence_service.repository.count_access_logs())
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str = Header("")):
+    """Prometheus metrics endpoint (text exposition format)"""
+    if METRICS_TOKEN and not hmac.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    await refresh_store_counts()
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+def log_storage_migration(migration: "asyncio.Future") -> None:
+    """Report how the background storage migration ended"""
+    if migration.cancelled():
+        logger.warning("Storage migration cancelled")
+    elif migration.exception() is not None:
+        logger.error("Storage migration failed", exc_info=migration.exception())
+    else:
+        logger.info("Storage migration finished: %s", migration.result())
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     logger.info("Evidence Chain-of-Custody API starting up...")
     # Create storage directory
-    storage_dir = ROOT_DIR / "evidence_storage"
-    storage_dir.mkdir(exist_ok=True)
-    logger.info(f"Storage directory: {storage_dir}")
+    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Storage directory: {STORAGE_DIR}")
+    if not METRICS_TOKEN:
+        logger.warning("METRICS_TOKEN is not set: /metrics can be scraped without authentication")
+    if LEDGER_ENABLED and EVIDENCE_STORE == "memory":
+        logger.warning(
+            "LEDGER_ENABLED with EVIDENCE_STORE=memory: the ledger survives restarts but "
+            "evidence records do not, so replayed ledger records will have no evidence"
+        )
+    # Prepare the evidence store (e.g. create database indexes)
+    await evidence_service.repository.connect()
+    # Link files from the old flat layout into their shards while serving
+    if STORAGE_MIGRATE_ON_STARTUP:
+        app.state.storage_migration_stop = threading.Event()
+        app.state.storage_migration = asyncio.ensure_future(storage_pool.run(
+            migrate_flat_files, evidence_service.storage, False, app.state.storage_migration_stop
+        ))
+        app.state.storage_migration.add_done_callback(log_storage_migration)
+    # Compress the files of archived evidence in the background
+    evidence_service.archiver.start()
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Evidence Chain-of-Custody API shutting down...")
+    # Write queued access events before anything they depend on stops
+    await evidence_service.access_events.close()
+    # Unfinished resumable uploads cannot outlive the process
+    await evidence_service.uploads.close()
+    await evidence_service.archiver.close()
+    # Stop the startup migration between files (a later start resumes it)
+    # and wait for it, before the pool it runs on shuts down
+    migration = getattr(app.state, "storage_migration", None)
+    if migration is not None:
+        app.state.storage_migration_stop.set()
+        await asyncio.wait([migration])
+    storage_pool.shutdown()
+    hash_pool.shutdown()
+    # Write buffered access logs and close the evidence store
+    await evidence_service.repository.close()
+    # Let in-flight submissions commit, then flush the ledger log
+    await gateway.close()
+    blockchain.close()
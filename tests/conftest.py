@@ -0,0 +1,61 @@
+"""Shared fixtures: the backend app with its files kept in a temporary directory"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Read when the app modules are imported, so set before any test imports them
+_DATA_DIR = tempfile.mkdtemp(prefix="evidence-tests-")
+for _name in ("STORAGE_DIR", "LEDGER_DIR", "ACCESS_LOG_DIR"):
+    os.environ[_name] = os.path.join(_DATA_DIR, _name.lower())
+os.environ["SQLITE_PATH"] = os.path.join(_DATA_DIR, "evidence.db")
+
+DEMO_USERS = {
+    "police": "police_officer",
+    "forensic_lab": "forensic_analyst",
+    "prosecutor": "prosecutor",
+    "judge": "judge",
+}
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    """Authorization headers per role"""
+    headers = {}
+    for role, username in DEMO_USERS.items():
+        response = client.post(
+            "/api/auth/login", json={"username": username, "password": "demo123", "role": role}
+        )
+        assert response.status_code == 200, response.text
+        headers[role] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return headers
+
+
+@pytest.fixture
+def upload(client, auth_headers):
+    """Upload evidence as the police and return its JSON"""
+    def upload_file(content: bytes, filename: str = "evidence.bin", case_id: str = "CASE-TEST"):
+        response = client.post(
+            "/api/evidence/upload",
+            headers=auth_headers["police"],
+            files={"file": (filename, content)},
+            data={"case_id": case_id, "evidence_type": "document", "description": "Test evidence"},
+        )
+        assert response.status_code in (200, 201), response.text
+        return response.json()
+    return upload_file
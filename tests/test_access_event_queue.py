@@ -0,0 +1,129 @@
+"""AccessEventQueue flushing and the history poll path"""
+import asyncio
+import time
+from datetime import datetime
+
+from app.services.access_event_queue import AccessEvent, AccessEventQueue
+
+
+def make_event(n: int) -> AccessEvent:
+    return AccessEvent(f"EVD-{n}", "police", "Officer", datetime.utcnow())
+
+
+def test_flush_skips_the_batching_window():
+    written = []
+
+    async def write(events):
+        written.extend(events)
+
+    async def run():
+        queue = AccessEventQueue(write, flush_interval_ms=5000)
+        await queue.put(make_event(1))
+        start = time.monotonic()
+        await queue.flush()
+        elapsed = time.monotonic() - start
+        await queue.close()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert elapsed < 1
+    assert [event.evidence_id for event in written] == ["EVD-1"]
+
+
+def test_flush_returns_under_steady_enqueueing():
+    written = []
+
+    async def write(events):
+        written.extend(events)
+
+    async def run():
+        queue = AccessEventQueue(write, flush_interval_ms=20)
+        stop = asyncio.Event()
+
+        async def produce():
+            n = 0
+            while not stop.is_set():
+                await queue.put(make_event(n))
+                n += 1
+                await asyncio.sleep(0.001)
+
+        producer = asyncio.ensure_future(produce())
+        await asyncio.sleep(0.05)
+        queued_before = queue._queued
+        await asyncio.wait_for(queue.flush(), timeout=1)
+        written_at_flush = len(written)
+        stop.set()
+        await producer
+        await queue.close()
+        return queued_before, written_at_flush
+
+    queued_before, written_at_flush = asyncio.run(run())
+    assert written_at_flush >= queued_before
+
+
+def test_flush_with_nothing_queued_returns_immediately():
+    async def write(events):
+        raise AssertionError("nothing to write")
+
+    async def run():
+        queue = AccessEventQueue(write)
+        await asyncio.wait_for(queue.flush(), timeout=0.1)
+
+    asyncio.run(run())
+
+
+def test_history_304_does_not_flush(client, auth_headers, upload, monkeypatch):
+    from app.services.evidence_service import evidence_service
+
+    evidence = upload(b"history poll")
+    headers = auth_headers["police"]
+    url = f"/api/evidence/{evidence['id']}/history"
+    etag = client.get(url, headers=headers).headers["etag"]
+
+    async def no_flush():
+        raise AssertionError("304 polls must not flush the access event queue")
+
+    monkeypatch.setattr(evidence_service.access_events, "flush", no_flush)
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_history_includes_queued_views_when_changed(client, auth_headers, upload):
+    evidence = upload(b"history change")
+    headers = auth_headers["police"]
+    url = f"/api/evidence/{evidence['id']}/history"
+    etag = client.get(url, headers=headers).headers["etag"]
+    client.get(f"/api/evidence/{evidence['id']}", headers=headers)
+
+    # Whether or not the view is written yet, a full response includes it
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [item["event"] for item in response.json()["timeline"]][-1] != "created"
+
+
+def test_drained_batch_is_one_bulk_access_log_write(tmp_path, monkeypatch):
+    from app.repositories import InMemoryEvidenceRepository
+    from app.repositories.access_log_store import AccessLogStore
+    from app.services.blockchain_service import BlockchainService
+    from app.services.evidence_service import EvidenceService
+    from app.services.fabric_gateway import LocalFabricGateway
+
+    repository = InMemoryEvidenceRepository(AccessLogStore(tmp_path))
+    service = EvidenceService(ledger=LocalFabricGateway(BlockchainService()), repository=repository)
+    bulk_writes = []
+    add_access_logs = repository.add_access_logs
+
+    async def counting_add_access_logs(logs):
+        bulk_writes.append(len(logs))
+        await add_access_logs(logs)
+
+    async def single_add_access_log(log):
+        raise AssertionError("queued events must be written in bulk")
+
+    monkeypatch.setattr(repository, "add_access_logs", counting_add_access_logs)
+    monkeypatch.setattr(repository, "add_access_log", single_add_access_log)
+
+    asyncio.run(service._write_access_events([make_event(n) for n in range(4)]))
+    assert bulk_writes == [4]
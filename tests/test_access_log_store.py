@@ -0,0 +1,85 @@
+"""Access-log storage: bounded hot tier, indexed segments and time-range queries"""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.models.evidence import AccessLog
+from app.repositories.access_log_store import AccessLogStore
+from app.services.worker_pool import WorkerPool
+
+START = datetime(2026, 1, 1)
+
+
+def make_log(minute: int, evidence_id: str = "EVD-1") -> AccessLog:
+    return AccessLog(
+        evidence_id=evidence_id, event_type="accessed", actor_role="police",
+        actor_name="Officer", timestamp=START + timedelta(minutes=minute)
+    )
+
+
+def fill(store: AccessLogStore, minutes: range) -> None:
+    for minute in minutes:
+        store.append(make_log(minute, f"EVD-{minute % 2}"))
+        if store.needs_spill:
+            store.spill()
+
+
+def minutes(logs):
+    return [int((log.timestamp - START).total_seconds() // 60) for log in logs]
+
+
+def test_hot_tier_stays_bounded_and_queries_span_both_tiers(tmp_path):
+    store = AccessLogStore(tmp_path, hot_capacity=10, segment_entries=4)
+    fill(store, range(50))
+
+    assert len(store._hot) <= 10
+    assert len(store) == 50
+    assert minutes(store.query("EVD-0")) == list(range(0, 50, 2))
+    assert minutes(store.query("EVD-1", START + timedelta(minutes=9), START + timedelta(minutes=45))) == list(
+        range(9, 45, 2)
+    )
+
+
+def test_segments_outside_the_range_are_not_read(tmp_path):
+    store = AccessLogStore(tmp_path, hot_capacity=10, segment_entries=4, index_cache=0)
+    fill(store, range(50))
+    # The first segments cover minutes 0-7; without their files a query must skip them
+    for path in sorted(tmp_path.glob("access-*"))[:4]:
+        path.unlink()
+
+    assert minutes(store.query("EVD-0", START + timedelta(minutes=20))) == list(range(20, 50, 2))
+
+
+def test_segments_are_found_again_after_a_restart(tmp_path):
+    fill(AccessLogStore(tmp_path, hot_capacity=10, segment_entries=4), range(30))
+
+    reopened = AccessLogStore(tmp_path, hot_capacity=10, segment_entries=4)
+    spilled = minutes(reopened.query("EVD-1"))
+    assert spilled and spilled == list(range(1, spilled[-1] + 1, 2))
+
+
+def test_async_spill_and_query_do_not_duplicate_entries(tmp_path):
+    store = AccessLogStore(tmp_path, hot_capacity=10, segment_entries=4)
+    pool = WorkerPool(max_workers=2)
+
+    async def run():
+        for minute in range(20):
+            store.append(make_log(minute))
+        results = await asyncio.gather(
+            store.spill_async(pool), store.query_async(pool, "EVD-1"), store.spill_async(pool)
+        )
+        return results[1], await store.query_async(pool, "EVD-1")
+
+    during, after = asyncio.run(run())
+    assert minutes(during) == minutes(after) == list(range(20))
+
+
+def test_access_log_api_filters_by_time(client, auth_headers, upload):
+    evidence = upload(b"access log range", case_id="CASE-ACCESS-LOGS")
+    url = f"/api/evidence/{evidence['id']}/access-logs"
+    logs = client.get(url, headers=auth_headers["police"]).json()
+    assert logs and logs[0]["event_type"] == "created"
+
+    created = logs[0]["timestamp"]
+    assert client.get(url, params={"to": created}, headers=auth_headers["police"]).json() == []
+    assert client.get(url, params={"from": created}, headers=auth_headers["police"]).json()[0] == logs[0]
+    assert client.get("/api/evidence/EVD-MISSING/access-logs", headers=auth_headers["police"]).status_code == 404
@@ -0,0 +1,48 @@
+"""Background compression of archived evidence, including shared content-addressed blobs"""
+import asyncio
+from datetime import datetime
+
+from app.models.evidence import Evidence
+from app.repositories import InMemoryEvidenceRepository
+from app.repositories.access_log_store import AccessLogStore
+from app.services.archiver import EvidenceArchiver
+from app.services.storage_layout import StorageLayout
+from app.services.storage_service import StorageService
+
+CONTENT = b"chain of custody record\n" * 1000
+
+
+def make_evidence(n: int, filename: str, file_hash: str, status: str) -> Evidence:
+    now = datetime(2026, 1, 1)
+    return Evidence(
+        id=f"EVD-{n}", case_id="CASE-1", filename=filename, original_filename="record.txt",
+        evidence_type="document", description="Test", file_hash=file_hash, file_size=len(CONTENT),
+        custodian="police", custodian_name="Officer", status=status, created_at=now, updated_at=now
+    )
+
+
+def test_shared_blob_is_compressed_only_once_every_reference_is_archived(tmp_path):
+    storage = StorageService(content_addressed=True, layout=StorageLayout(tmp_path / "storage"))
+    repository = InMemoryEvidenceRepository(AccessLogStore(tmp_path / "access_logs"))
+    archiver = EvidenceArchiver(repository, storage, codec="gzip", interval_seconds=0)
+    filename, file_hash, _ = storage.store_file(CONTENT, "record.txt")
+    assert storage.store_file(CONTENT, "copy.txt")[0] == filename
+
+    async def run():
+        await repository.connect()
+        await repository.save_evidence(make_evidence(1, filename, file_hash, "archived"))
+        await repository.save_evidence(make_evidence(2, filename, file_hash, "in_analysis"))
+        partly_archived = await archiver.run_once()
+        codec_while_live = storage.locate(filename)[1]
+        await repository.save_evidence(make_evidence(2, filename, file_hash, "archived"))
+        fully_archived = await archiver.run_once()
+        await repository.close()
+        return partly_archived, codec_while_live, fully_archived
+
+    partly_archived, codec_while_live, fully_archived = asyncio.run(run())
+    assert codec_while_live is None
+    assert (partly_archived.archived_files, partly_archived.compressed_files) == (1, 0)
+    assert (fully_archived.archived_files, fully_archived.compressed_files) == (1, 1)
+    assert storage.locate(filename)[1] is not None
+    with storage.open_file(filename) as f:
+        assert f.read() == CONTENT
@@ -0,0 +1,41 @@
+"""Bearer token verification and caching"""
+from datetime import datetime, timedelta
+
+import jwt
+
+from app.services.auth_service import ALGORITHM, SECRET_KEY
+
+
+def make_token(**claims):
+    payload = {
+        "sub": "usr-pol", "username": "police_officer", "role": "police",
+        "full_name": "Officer", "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    payload.update(claims)
+    return jwt.encode({k: v for k, v in payload.items() if v is not None}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def list_evidence(client, token):
+    return client.get("/api/evidence/", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_valid_token_is_accepted_twice(client):
+    token = make_token()
+    assert list_evidence(client, token).status_code == 200
+    assert list_evidence(client, token).status_code == 200  # From the token cache
+
+
+def test_token_without_exp_is_rejected(client):
+    response = list_evidence(client, make_token(exp=None))
+    assert response.status_code == 401
+
+
+def test_token_without_identity_claims_is_rejected(client):
+    assert list_evidence(client, make_token(username=None)).status_code == 401
+
+
+def test_expired_and_forged_tokens_are_rejected(client):
+    expired = make_token(exp=datetime.utcnow() - timedelta(minutes=1))
+    assert list_evidence(client, expired).json()["detail"] == "Token has expired"
+    forged = jwt.encode({"sub": "x", "exp": datetime.utcnow() + timedelta(hours=1)}, "wrong-key", algorithm=ALGORITHM)
+    assert list_evidence(client, forged).status_code == 401
@@ -0,0 +1,82 @@
+"""BatchWriter flushes see in-flight writes and keep failed batches"""
+import asyncio
+
+import pytest
+
+from app.repositories.batching import BatchWriter
+
+
+def test_flush_waits_for_a_timer_write_in_progress():
+    written = []
+    release = asyncio.Event()
+
+    async def slow_write(items):
+        await release.wait()
+        written.extend(items)
+
+    async def run():
+        writer = BatchWriter(slow_write, batch_size=100, flush_interval_ms=1)
+        await writer.add("a")
+        await asyncio.sleep(0.02)  # The timer has swapped the buffer out and is mid-write
+        flushed = asyncio.ensure_future(writer.flush())
+        await asyncio.sleep(0.01)
+        assert not flushed.done()
+        release.set()
+        await flushed
+        assert written == ["a"]
+        await writer.close()
+
+    asyncio.run(run())
+
+
+def test_failed_write_is_kept_and_retried(caplog):
+    attempts = []
+
+    async def flaky_write(items):
+        attempts.append(list(items))
+        if len(attempts) == 1:
+            raise OSError("database is locked")
+
+    async def run():
+        writer = BatchWriter(flaky_write, batch_size=100, flush_interval_ms=1)
+        await writer.add("a")
+        await asyncio.sleep(0.02)  # Timer write fails; the task must not die unobserved
+        assert len(writer) == 1
+        await writer.add("b")
+        await writer.flush()
+        assert len(writer) == 0
+        await writer.close()
+
+    asyncio.run(run())
+    assert attempts == [["a"], ["a", "b"]]
+    assert "Writing a batch of 1 items failed" in caplog.text
+
+
+def test_flush_raises_when_the_write_fails():
+    async def failing_write(items):
+        raise OSError("disk full")
+
+    async def run():
+        writer = BatchWriter(failing_write, batch_size=100, flush_interval_ms=10_000)
+        await writer.add("a")
+        with pytest.raises(OSError):
+            await writer.flush()
+        assert len(writer) == 1
+
+    asyncio.run(run())
+
+
+def test_buffer_is_bounded_while_writes_fail():
+    async def failing_write(items):
+        raise OSError("database is down")
+
+    async def run():
+        writer = BatchWriter(failing_write, batch_size=2, flush_interval_ms=10_000, max_buffered=4)
+        for item in "abcd":
+            await writer.add(item)
+        assert len(writer) == 4
+        with pytest.raises(OSError):
+            await writer.add("e")
+        assert len(writer) == 4
+
+    asyncio.run(run())
@@ -0,0 +1,99 @@
+"""Content-addressed storage: shared blobs, reference counts and deletes"""
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.models.auth import User
+from app.models.evidence import EvidenceCreate
+from app.services import storage_service
+from app.services.content_store import CONTENT_HEAD_BYTES, blob_name
+from app.services.evidence_service import EvidenceService
+from app.services.storage_layout import StorageLayout
+from app.services.storage_service import StorageService
+
+CONTENT = b"seized drive image\n" * 500
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return StorageService(content_addressed=True, layout=StorageLayout(tmp_path))
+
+
+def store_upload(storage, data: bytes, filename: str = "upload.bin"):
+    return asyncio.run(storage.store_upload(UploadFile(io.BytesIO(data), filename=filename)))
+
+
+def test_duplicates_share_one_blob(storage):
+    first = storage.store_file(CONTENT, "a.img")
+    second = store_upload(storage, CONTENT, "b.img")
+
+    assert first == second == (blob_name(hashlib.sha256(CONTENT).hexdigest()), first[1], len(CONTENT))
+    assert storage.content.ref_count(first[0]) == 2
+
+
+def test_blob_is_deleted_with_its_last_reference(storage):
+    filename = storage.store_file(CONTENT, "a.img")[0]
+    storage.store_file(CONTENT, "b.img")
+
+    assert storage.delete_file(filename)
+    assert storage.content.ref_count(filename) == 1
+    assert storage.retrieve_file(filename) == CONTENT
+
+    assert storage.delete_file(filename)
+    assert storage.content.ref_count(filename) == 0
+    assert not storage.get_file_path(filename).exists()
+    assert not storage.delete_file(filename)
+
+    # The content is stored afresh rather than matched to the deleted blob
+    assert store_upload(storage, CONTENT)[0] == filename
+    assert storage.content.ref_count(filename) == 1
+    assert storage.retrieve_file(filename) == CONTENT
+
+
+def test_upload_diverging_after_a_shared_head_gets_its_own_blob(storage):
+    head = b"\0" * CONTENT_HEAD_BYTES
+    original = storage.store_file(head + b"original", "a.img")[0]
+    edited, file_hash, _ = store_upload(storage, head + b"edited")
+
+    assert edited != original
+    assert file_hash == hashlib.sha256(head + b"edited").hexdigest()
+    assert storage.retrieve_file(edited) == head + b"edited"
+    assert storage.content.ref_count(original) == storage.content.ref_count(edited) == 1
+
+
+def test_small_upload_chunks_still_find_the_duplicate(storage, monkeypatch):
+    content = os.urandom(3 * CONTENT_HEAD_BYTES)
+    first = storage.store_file(content, "a.img")[0]
+    monkeypatch.setattr(storage_service, "UPLOAD_CHUNK_SIZE", 4096)
+
+    def write_chunk(*args):
+        raise AssertionError("duplicate upload was written")
+
+    monkeypatch.setattr(storage_service.StorageService, "_write_chunk", staticmethod(write_chunk))
+    assert store_upload(storage, content)[0] == first
+    assert storage.content.ref_count(first) == 2
+
+
+class RejectingLedger:
+    async def submit(self, function: str, **kwargs):
+        raise RuntimeError("ledger unavailable")
+
+
+def test_upload_rejected_by_the_ledger_releases_its_reference(storage):
+    service = EvidenceService(ledger=RejectingLedger())
+    service.storage = storage
+    filename = storage.store_file(CONTENT, "a.img")[0]
+    user = User(id="1", username="police_officer", role="police", full_name="Officer")
+    metadata = EvidenceCreate(case_id="CASE-1", evidence_type="video", description="Test")
+
+    for data in (CONTENT, b"unique"):
+        with pytest.raises(RuntimeError):
+            asyncio.run(service.upload_evidence(UploadFile(io.BytesIO(data), filename="b.img"), metadata, user))
+    assert storage.content.ref_count(filename) == 1
+    assert sorted(path.name for path in storage.layout.root.rglob("*") if path.is_file()) == [
+        f"{filename}", f"{filename}.refs.json"
+    ]
@@ -0,0 +1,95 @@
+"""Custody transfers and other record changes that go through the ledger"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.models.auth import User
+from app.models.evidence import CustodyTransfer, Evidence
+from app.repositories import InMemoryEvidenceRepository
+from app.repositories.access_log_store import AccessLogStore
+from app.services.blockchain_service import BlockchainService
+from app.services.evidence_service import EvidenceService
+from app.services.fabric_gateway import LocalFabricGateway
+from app.services.ledger_log import LedgerLog
+
+POLICE = User(id="1", username="police_officer", role="police", full_name="Officer")
+
+
+def make_service(tmp_path, repository=None) -> EvidenceService:
+    # A group commit window keeps both transfers waiting on the ledger at once
+    ledger = LocalFabricGateway(BlockchainService(LedgerLog(tmp_path / "ledger", interval_ms=20)))
+    if repository is None:
+        repository = InMemoryEvidenceRepository(AccessLogStore(tmp_path / "access_logs"))
+    return EvidenceService(ledger=ledger, repository=repository)
+
+
+async def register(service: EvidenceService) -> Evidence:
+    evidence = Evidence(
+        case_id="CASE-1", filename="seized.bin", original_filename="seized.bin",
+        evidence_type="document", description="Test", file_hash="0" * 64, file_size=1,
+        custodian="police", custodian_name="Officer", created_at=datetime(2026, 1, 1)
+    )
+    await service.ledger.submit(
+        "create_evidence_record", evidence_id=evidence.id, file_hash=evidence.file_hash,
+        custodian="police", metadata={}
+    )
+    await service.repository.save_evidence(evidence)
+    return evidence
+
+
+def transfer_to(role: str) -> CustodyTransfer:
+    return CustodyTransfer(to_role=role, to_name=role.title(), reason="Analysis")
+
+
+def test_concurrent_transfers_do_not_fork_the_custody_chain(tmp_path):
+    service = make_service(tmp_path)
+
+    async def run():
+        evidence = await register(service)
+        results = await asyncio.gather(
+            service.transfer_custody(evidence.id, transfer_to("forensic_lab"), POLICE),
+            service.transfer_custody(evidence.id, transfer_to("prosecutor"), POLICE),
+            return_exceptions=True
+        )
+        events = await service.ledger.evaluate("get_evidence_events", evidence_id=evidence.id)
+        await service.ledger.close()
+        return results, events, await service.repository.get_evidence(evidence.id)
+
+    results, events, stored = asyncio.run(run())
+    assert isinstance(results[0], Evidence)
+    assert isinstance(results[1], PermissionError)
+    assert [event["to_role"] for event in events if event["type"] == "transferred"] == ["forensic_lab"]
+    assert stored.custodian == "forensic_lab"
+
+
+def test_ledger_rejects_transfers_from_a_former_custodian():
+    service = BlockchainService()
+    service.create_evidence_record("EVD-1", "0" * 64, "police", {})
+    service.transfer_custody("EVD-1", "police", "Officer", "forensic_lab", "Analyst", "Analysis")
+
+    with pytest.raises(PermissionError):
+        service.transfer_custody("EVD-1", "police", "Officer", "prosecutor", "Prosecutor", "Trial")
+    assert [event["type"] for event in service.get_evidence_events("EVD-1")] == ["created", "transferred"]
+
+
+def test_verification_result_does_not_revert_a_transfer(tmp_path):
+    from app.repositories.sqlite import SQLiteEvidenceRepository
+
+    service = make_service(tmp_path, SQLiteEvidenceRepository(tmp_path / "evidence.db"))
+
+    async def run():
+        evidence = await register(service)
+        # A copy read before hashing, saved after a transfer committed meanwhile
+        stale = await service.repository.get_evidence(evidence.id)
+        await service.transfer_custody(evidence.id, transfer_to("forensic_lab"), POLICE)
+        await service._record_verification(stale, evidence.file_hash, POLICE)
+        stored = await service.repository.get_evidence(evidence.id)
+        await service.ledger.close()
+        await service.repository.close()
+        return stored
+
+    stored = asyncio.run(run())
+    assert stored.custodian == "forensic_lab"
+    assert stored.integrity_verified
+    assert stored.status == "verified"
@@ -0,0 +1,77 @@
+"""Materialized custody timelines: incremental extension, pages, ETags and the LRU"""
+from app.services import custody_timeline
+from app.services.custody_timeline import CustodyTimeline, TimelineCache
+
+
+def make_event(n: int):
+    return n, {
+        "type": "accessed", "actor": "police", "actor_name": "Officer",
+        "timestamp": f"2026-01-01T00:{n:02d}:00", "tx_hash": f"0x{n:016x}"
+    }
+
+
+def test_only_new_events_are_converted(monkeypatch):
+    converted = []
+    real_history_item = custody_timeline.history_item
+
+    def history_item(sequence, event):
+        converted.append(sequence)
+        return real_history_item(sequence, event)
+
+    monkeypatch.setattr(custody_timeline, "history_item", history_item)
+    timeline = CustodyTimeline("EVD-1")
+    timeline.extend([make_event(n) for n in range(3)])
+    first_etag = timeline.etag()
+    # Overlapping and out-of-order deliveries are skipped
+    timeline.extend([make_event(n) for n in (1, 2, 3, 5)])
+
+    assert converted == [0, 1, 2, 3]
+    assert timeline.version == 4 and timeline.last_sequence == 3
+    assert timeline.etag() != first_etag
+    assert timeline.etag(after=0, limit=2) != timeline.etag()
+
+
+def test_pages_follow_the_after_cursor():
+    timeline = CustodyTimeline("EVD-1")
+    timeline.extend([make_event(n) for n in range(5)])
+
+    first = timeline.page(limit=2)
+    rest = timeline.page(after=first.next_cursor, limit=10)
+    assert [item.sequence for item in first.timeline] == [0, 1]
+    assert [item.sequence for item in rest.timeline] == [2, 3, 4]
+    assert rest.next_cursor is None and rest.version == 5
+
+
+def test_cache_evicts_the_least_recently_used_timeline():
+    cache = TimelineCache(max_entries=2)
+    first = cache.get("EVD-1")
+    second = cache.get("EVD-2")
+    assert cache.get("EVD-1") is first
+    cache.get("EVD-3")
+
+    assert len(cache) == 2
+    assert cache.get("EVD-1") is first
+    # Evicted, so it starts again from an empty timeline
+    assert cache.get("EVD-2") is not second
+    assert len(cache) == 2
+
+
+def test_history_is_304_until_custody_changes(client, auth_headers, upload):
+    evidence = upload(b"custody timeline poll", case_id="CASE-TIMELINE")
+    url = f"/api/evidence/{evidence['id']}/history"
+    headers = auth_headers["police"]
+
+    first = client.get(url, headers=headers)
+    etag = first.headers["etag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    transfer = client.post(
+        f"/api/evidence/{evidence['id']}/transfer", headers=headers,
+        json={"to_role": "forensic_lab", "to_name": "Analyst", "reason": "Analysis"}
+    )
+    assert transfer.status_code == 200, transfer.text
+    changed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["version"] > first.json()["version"]
+    assert changed.json()["timeline"][-1]["event"] == "transferred"
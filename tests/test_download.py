@@ -0,0 +1,94 @@
+"""Evidence downloads: byte ranges, If-Range and unsatisfiable ranges"""
+import hashlib
+import os
+
+import pytest
+
+from app.routers.ranged_file import parse_range
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def evidence(upload):
+    return upload(CONTENT, "clip.bin")
+
+
+@pytest.fixture
+def content_url(evidence):
+    return f"/api/evidence/{evidence['id']}/content"
+
+
+def test_full_download_is_the_registered_bytes(client, auth_headers, content_url):
+    response = client.get(content_url, headers=auth_headers["police"])
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"].startswith(f'"{hashlib.sha256(CONTENT).hexdigest()}-')
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+@pytest.mark.parametrize("header, first, last", [
+    ("bytes=100-199", 100, 199),
+    ("bytes=10000-", 10000, len(CONTENT) - 1),
+    ("bytes=-50", len(CONTENT) - 50, len(CONTENT) - 1),
+    ("bytes=10200-99999", 10200, len(CONTENT) - 1),
+])
+def test_range_is_answered_with_206(client, auth_headers, content_url, header, first, last):
+    response = client.get(content_url, headers={**auth_headers["police"], "Range": header})
+    assert response.status_code == 206
+    assert response.content == CONTENT[first:last + 1]
+    assert response.headers["content-range"] == f"bytes {first}-{last}/{len(CONTENT)}"
+
+
+def test_range_past_the_end_is_416(client, auth_headers, content_url):
+    response = client.get(content_url, headers={**auth_headers["police"], "Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+    assert response.content == b""
+
+
+def test_if_range_sends_the_range_only_while_the_etag_matches(client, auth_headers, content_url):
+    headers = {**auth_headers["police"], "Range": "bytes=0-9"}
+    etag = client.get(content_url, headers=auth_headers["police"]).headers["etag"]
+
+    matching = client.get(content_url, headers={**headers, "If-Range": etag})
+    assert matching.status_code == 206
+    assert matching.content == CONTENT[:10]
+
+    stale = client.get(content_url, headers={**headers, "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == CONTENT
+
+
+def test_if_range_is_stale_once_the_stored_file_changes(client, auth_headers, evidence, content_url):
+    from app.services.evidence_service import evidence_service
+
+    headers = {**auth_headers["police"], "Range": "bytes=0-9"}
+    etag = client.get(content_url, headers=auth_headers["police"]).headers["etag"]
+    path = evidence_service.storage.get_file_path(evidence["filename"])
+    tampered = b"X" + CONTENT[1:]
+    with open(path, "r+b") as f:
+        f.write(tampered[:1])
+
+    response = client.get(content_url, headers={**headers, "If-Range": etag})
+    assert response.status_code == 200
+    assert response.content == tampered
+    assert response.headers["etag"] != etag
+
+
+def test_if_range_date_needs_a_settled_modification_time(client, auth_headers, evidence, content_url):
+    from app.services.evidence_service import evidence_service
+
+    headers = {**auth_headers["police"], "Range": "bytes=0-9"}
+    last_modified = client.get(content_url, headers=auth_headers["police"]).headers["last-modified"]
+    assert client.get(content_url, headers={**headers, "If-Range": last_modified}).status_code == 200
+
+    path = evidence_service.storage.get_file_path(evidence["filename"])
+    os.utime(path, (0, 60))
+    last_modified = client.get(content_url, headers=auth_headers["police"]).headers["last-modified"]
+    assert client.get(content_url, headers={**headers, "If-Range": last_modified}).status_code == 206
+
+
+@pytest.mark.parametrize("header", [None, "items=0-1", "bytes=5-2", "bytes=0-1,4-5", "bytes=a-b"])
+def test_unsupported_ranges_mean_the_whole_file(header):
+    assert parse_range(header, 100) is None
@@ -0,0 +1,90 @@
+"""Secondary evidence indexes: filters, re-indexing, page cost and the listing API"""
+from datetime import datetime, timedelta
+
+from app.models.evidence import Evidence
+from app.repositories.evidence_index import EvidenceIndex
+
+START = datetime(2026, 1, 1)
+
+
+def make_evidence(n: int, case_id: str = "CASE-BULK", custodian: str = "police") -> Evidence:
+    created = START + timedelta(minutes=n)
+    return Evidence(
+        id=f"EVD-{n:04d}", case_id=case_id, filename=f"{n}.bin", original_filename=f"{n}.bin",
+        evidence_type="document", description="Test", file_hash="0" * 64, file_size=n,
+        custodian=custodian, custodian_name="Officer", created_at=created
+    )
+
+
+class CountingDict(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = 0
+
+    def __getitem__(self, key):
+        self.reads += 1
+        return super().__getitem__(key)
+
+
+def test_filters_combine_and_follow_updates():
+    index = EvidenceIndex()
+    records = [make_evidence(n, case_id=f"CASE-{n % 3}") for n in range(9)]
+    for evidence in records:
+        index.add(evidence)
+
+    assert index.query({"case_id": "CASE-1"})[0] == ["EVD-0001", "EVD-0004", "EVD-0007"]
+    index.update(records[4].model_copy(update={"custodian": "forensic_lab"}))
+    assert index.query({"case_id": "CASE-1", "custodian": "forensic_lab"})[0] == ["EVD-0004"]
+    assert index.query({"case_id": "CASE-1", "custodian": "police"})[0] == ["EVD-0001", "EVD-0007"]
+
+    index.remove("EVD-0004")
+    assert index.query({"custodian": "forensic_lab"})[0] == []
+    assert len(index) == 8
+
+
+def test_created_range_and_descending_cursor():
+    index = EvidenceIndex()
+    for n in range(10):
+        index.add(make_evidence(n))
+
+    first, cursor = index.query(
+        created_after=START + timedelta(minutes=2), created_before=START + timedelta(minutes=7),
+        order="desc", limit=3
+    )
+    rest, end = index.query(
+        created_after=START + timedelta(minutes=2), created_before=START + timedelta(minutes=7),
+        order="desc", cursor=cursor, limit=3
+    )
+    assert first == ["EVD-0006", "EVD-0005", "EVD-0004"]
+    assert rest == ["EVD-0003", "EVD-0002"]
+    assert end is None
+
+
+def test_selective_filter_reads_only_its_own_records():
+    index = EvidenceIndex()
+    for n in range(1000):
+        index.add(make_evidence(n))
+    index.add(make_evidence(1000, case_id="CASE-RARE"))
+    index._values = CountingDict(index._values)
+
+    ids, _ = index.query({"case_id": "CASE-RARE", "custodian": "police"}, limit=10)
+    assert ids == ["EVD-1000"]
+    assert index._values.reads == 1
+
+
+def test_listing_api_pages_with_the_next_cursor_header(client, auth_headers, upload):
+    for n in range(3):
+        upload(f"index page {n}".encode(), case_id="CASE-INDEX-PAGES")
+    params = {"case_id": "CASE-INDEX-PAGES", "limit": 2}
+
+    first = client.get("/api/evidence/", params=params, headers=auth_headers["police"])
+    second = client.get(
+        "/api/evidence/", params={**params, "cursor": first.headers["x-next-cursor"]},
+        headers=auth_headers["police"]
+    )
+    assert len(first.json()) == 2 and len(second.json()) == 1
+    assert "x-next-cursor" not in second.headers
+    assert {e["id"] for e in first.json()}.isdisjoint(e["id"] for e in second.json())
+
+    bad = client.get("/api/evidence/", params={**params, "cursor": "!!"}, headers=auth_headers["police"])
+    assert bad.status_code == 400
@@ -0,0 +1,80 @@
+"""verify_chain catches edits to sealed transactions and block links; blocks seal on time"""
+import asyncio
+
+from app.services import blockchain_service
+from app.services.blockchain_service import BlockchainService
+from app.services.fabric_gateway import LocalFabricGateway
+
+
+def sealed_ledger(blocks: int = 2) -> BlockchainService:
+    service = BlockchainService()
+    for n in range(blocks):
+        service.create_evidence_record(f"EVD-{n}", "0" * 64, "police", {"case_id": "CASE-1"})
+        service.seal_block()
+    return service
+
+
+def test_untouched_chain_verifies():
+    result = sealed_ledger().verify_chain()
+    assert result["valid"]
+    assert (result["height"], result["blocks_checked"]) == (2, 2)
+
+
+def test_edited_record_breaks_its_block_merkle_root():
+    service = sealed_ledger()
+    service.get_evidence_record("EVD-1")["file_hash"] = "f" * 64
+
+    result = service.verify_chain()
+    assert not result["valid"]
+    assert result["invalid_block"] == 1
+    assert result["reason"] == "transaction Merkle root mismatch"
+
+
+def test_edited_event_is_found_by_a_full_check():
+    service = sealed_ledger()
+    assert service.verify_chain()["valid"]
+    service.get_evidence_record("EVD-0")["events"][0]["actor"] = "judge"
+
+    # Blocks verified before are skipped by the incremental check
+    assert service.verify_chain()["valid"]
+    result = service.verify_chain(full=True)
+    assert not result["valid"]
+    assert result["invalid_block"] == 0
+
+
+def test_relinked_block_is_rejected():
+    service = sealed_ledger()
+    service._blocks[1]["prev_hash"] = "0" * 64
+
+    result = service.verify_chain()
+    assert not result["valid"]
+    assert result["reason"] == "previous block hash mismatch"
+
+
+def test_verify_chain_does_not_seal_the_open_block(monkeypatch):
+    service = sealed_ledger(1)
+    service.create_evidence_record("EVD-open", "0" * 64, "police", {"case_id": "CASE-1"})
+    # The open block is now overdue, but only the committer may seal it
+    monkeypatch.setattr(blockchain_service, "BLOCK_MAX_AGE_MS", 0)
+
+    result = service.verify_chain()
+    assert result["height"] == 1 and result["unsealed_transactions"] == 1
+    assert service.size()["blocks"] == 1
+
+
+def test_gateway_seals_an_idle_block_once_it_falls_due(monkeypatch):
+    monkeypatch.setattr(blockchain_service, "BLOCK_MAX_AGE_MS", 20)
+    service = BlockchainService()
+    gateway = LocalFabricGateway(service, endorsement_latency_ms=0, commit_latency_ms=0, batch_timeout_ms=0)
+
+    async def run():
+        await gateway.submit(
+            "create_evidence_record", evidence_id="EVD-1", file_hash="0" * 64, custodian="police", metadata={}
+        )
+        assert service.size()["blocks"] == 0
+        await asyncio.sleep(0.1)
+        await gateway.close()
+
+    asyncio.run(run())
+    assert service.size()["blocks"] == 1
+    assert service.verify_chain()["unsealed_transactions"] == 0
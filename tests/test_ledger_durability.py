@@ -0,0 +1,183 @@
+"""Ledger entries are durable before their transaction hash is handed out"""
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import BACKEND_DIR
+
+from app.services.blockchain_service import BlockchainService
+from app.services.fabric_gateway import COMMITTED, FAILED, PENDING, LocalFabricGateway
+from app.services.ledger_log import LedgerLog
+
+
+def replayed_tx_hashes(directory):
+    return [entry["tx"]["tx_hash"] for entry in LedgerLog(directory).replay() if "tx" in entry]
+
+
+def test_wait_durable_waits_for_the_group_commit(tmp_path):
+    log = LedgerLog(tmp_path, interval_ms=50)
+
+    async def run():
+        sequences = [log.append({"n": n}) for n in range(10)]
+        assert log.pending == 10
+        await asyncio.gather(*[log.wait_durable(sequence) for sequence in sequences])
+
+    asyncio.run(run())
+    assert log.pending == 0
+    # Every waiter in the window shared one write + fsync
+    assert log.commits == 1
+    log.close()
+    assert [entry["n"] for entry in LedgerLog(tmp_path).replay()] == list(range(10))
+
+
+def fail_commit(batch):
+    raise OSError("disk full")
+
+
+def test_wait_durable_raises_when_the_commit_fails(tmp_path, monkeypatch):
+    log = LedgerLog(tmp_path, interval_ms=1)
+    monkeypatch.setattr(log, "_commit", fail_commit)
+
+    async def run():
+        await log.wait_durable(log.append({"n": 1}))
+
+    with pytest.raises(RuntimeError, match="group commit failed"):
+        asyncio.run(run())
+
+
+def test_submit_returns_only_durable_transactions(tmp_path):
+    service = BlockchainService(LedgerLog(tmp_path, interval_ms=20))
+    gateway = LocalFabricGateway(service)
+
+    async def run():
+        tx_hashes = await asyncio.gather(*[
+            gateway.submit(
+                "create_evidence_record",
+                evidence_id=f"EVD-{n}", file_hash="0" * 64, custodian="police", metadata={}
+            )
+            for n in range(5)
+        ])
+        # Readable by a fresh replay the moment submit returns, i.e. after a crash
+        assert set(tx_hashes) <= set(replayed_tx_hashes(tmp_path))
+        await gateway.close()
+
+    asyncio.run(run())
+    service.close()
+
+
+def test_commit_status_is_pending_until_durable(tmp_path):
+    log = LedgerLog(tmp_path, interval_ms=100)
+    service = BlockchainService(log)
+    gateway = LocalFabricGateway(service, batch_timeout_ms=1)
+
+    async def run():
+        submitted = asyncio.ensure_future(gateway.submit(
+            "create_evidence_record",
+            evidence_id="EVD-1", file_hash="0" * 64, custodian="police", metadata={}
+        ))
+        await asyncio.sleep(0.02)
+        tx_hash = service._transactions[-1]["tx_hash"]
+        assert log.pending == 1
+        assert gateway.commit_status(tx_hash) == PENDING
+        assert await submitted == tx_hash
+        await gateway.close()
+        assert gateway.commit_status(tx_hash) == COMMITTED
+
+    asyncio.run(run())
+    service.close()
+
+
+def test_commit_status_reports_failed_commits(tmp_path, monkeypatch):
+    log = LedgerLog(tmp_path, interval_ms=1)
+    monkeypatch.setattr(log, "_commit", fail_commit)
+    service = BlockchainService(log)
+    gateway = LocalFabricGateway(service, batch_timeout_ms=1)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await gateway.submit(
+                "create_evidence_record",
+                evidence_id="EVD-1", file_hash="0" * 64, custodian="police", metadata={}
+            )
+        tx_hash = service._transactions[-1]["tx_hash"]
+        await gateway.close()
+        return tx_hash
+
+    assert gateway.commit_status(asyncio.run(run())) == FAILED
+
+
+def test_cancelled_commit_releases_its_in_flight_slots(tmp_path):
+    service = BlockchainService(LedgerLog(tmp_path, interval_ms=1))
+    gateway = LocalFabricGateway(service, max_in_flight=1, batch_timeout_ms=1, commit_latency_ms=60000)
+
+    async def submit(n):
+        return await gateway.submit(
+            "create_evidence_record",
+            evidence_id=f"EVD-{n}", file_hash="0" * 64, custodian="police", metadata={}
+        )
+
+    async def run():
+        first = await submit(1)
+        while gateway._last_commit is None:
+            await asyncio.sleep(0.001)
+        gateway._last_commit.cancel()
+        await asyncio.wait([gateway._last_commit])
+        # The only slot is free again, so this does not wait forever
+        await asyncio.wait_for(submit(2), timeout=1)
+        return first
+
+    first = asyncio.run(run())
+    assert gateway.commit_status(first) == COMMITTED
+    service.close()
+
+
+def test_failed_transactions_are_remembered_up_to_a_limit(tmp_path, monkeypatch):
+    from app.services import fabric_gateway
+
+    monkeypatch.setattr(fabric_gateway, "FABRIC_FAILED_HISTORY", 2)
+    log = LedgerLog(tmp_path, interval_ms=50)
+    monkeypatch.setattr(log, "_commit", fail_commit)
+    service = BlockchainService(log)
+    gateway = LocalFabricGateway(service, batch_timeout_ms=1)
+
+    async def run():
+        # All three share the failing group commit
+        results = await asyncio.gather(*[
+            gateway.submit(
+                "create_evidence_record",
+                evidence_id=f"EVD-{n}", file_hash="0" * 64, custodian="police", metadata={}
+            )
+            for n in range(3)
+        ], return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        await gateway.close()
+        return [tx["tx_hash"] for tx in service._transactions]
+
+    tx_hashes = asyncio.run(run())
+    assert [gateway.commit_status(tx_hash) for tx_hash in tx_hashes][1:] == [FAILED, FAILED]
+    assert len(gateway._failed) == 2
+
+
+@pytest.mark.parametrize("store, enabled", [("memory", "False"), ("sqlite", "True")])
+def test_ledger_log_defaults_to_off_with_the_volatile_store(store, enabled):
+    env = {key: value for key, value in os.environ.items() if key != "LEDGER_ENABLED"}
+    result = subprocess.run(
+        [sys.executable, "-c", "from app.services.ledger_log import LEDGER_ENABLED; print(LEDGER_ENABLED)"],
+        cwd=BACKEND_DIR, env={**env, "EVIDENCE_STORE": store}, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == enabled
+
+
+def test_transactions_are_looked_up_by_position(tmp_path):
+    service = BlockchainService(LedgerLog(tmp_path))
+    service.create_evidence_record("EVD-1", "0" * 64, "police", {})
+    tx_hash = service.log_access_event("EVD-1", "police", "Officer")
+    service.close()
+
+    for ledger in (service, BlockchainService(LedgerLog(tmp_path))):
+        transaction = ledger.get_transaction(tx_hash)
+        assert transaction == {**ledger._transactions[1], "sequence": 1}
+        assert ledger._tx_index[tx_hash] == 1
@@ -0,0 +1,83 @@
+"""Chunk Merkle manifests: building, verifying and rejecting tampered manifests"""
+import asyncio
+import json
+
+import pytest
+
+from app.services.merkle import (
+    MERKLE_MIN_FILE_SIZE, MerkleBuilder, build_root, manifest_matches, verify_file_chunks
+)
+from app.services.worker_pool import WorkerPool
+
+CHUNK_SIZE = 1024
+CONTENT = bytes(range(256)) * 40  # 10 chunks
+
+
+def build_manifest(data: bytes):
+    builder = MerkleBuilder(CHUNK_SIZE)
+    builder.update(data)
+    return builder.manifest(len(data))
+
+
+def verify(path, manifest, **kwargs):
+    async def run():
+        return await verify_file_chunks(path, path.stat().st_size, manifest, WorkerPool(max_workers=2), **kwargs)
+    return asyncio.run(run())
+
+
+def test_unmodified_file_reproduces_the_root(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(CONTENT)
+    manifest = build_manifest(CONTENT)
+
+    result = verify(path, manifest, stop_on_first=False)
+    assert result["current_root"] == manifest["root"]
+    assert result["modified_ranges"] == []
+    assert result["chunks_checked"] == result["chunk_count"] == 10
+
+
+def test_full_scan_reports_every_modified_range(tmp_path):
+    path = tmp_path / "file.bin"
+    tampered = bytearray(CONTENT)
+    tampered[1500] ^= 0xFF
+    tampered[8200] ^= 0xFF
+    path.write_bytes(tampered)
+    manifest = build_manifest(CONTENT)
+
+    result = verify(path, manifest, stop_on_first=False, window=3)
+    assert result["current_root"] != manifest["root"]
+    assert result["modified_ranges"] == [{"start": 1024, "end": 2048}, {"start": 8192, "end": 9216}]
+
+
+def test_manifest_must_build_the_registered_root():
+    manifest = build_manifest(CONTENT)
+    registered = manifest["root"]
+    assert manifest_matches(manifest, registered)
+
+    # Leaves edited and the manifest's own root recomputed to match
+    forged = build_manifest(CONTENT[:-1] + b"x")
+    assert not manifest_matches(forged, registered)
+    assert not manifest_matches({**manifest, "leaves": forged["leaves"]}, registered)
+    assert not manifest_matches(manifest, None)
+
+
+@pytest.mark.parametrize("tamper", [False, True])
+def test_merkle_verification_rejects_a_tampered_manifest(client, auth_headers, upload, tamper):
+    from app.services.evidence_service import evidence_service
+
+    evidence = upload(bytes(MERKLE_MIN_FILE_SIZE + 1), "image.dd")
+    storage = evidence_service.storage
+    manifest = storage.load_manifest(evidence["filename"])
+    if tamper:
+        # A self-consistent manifest whose first leaf no longer matches the file
+        forged = {**manifest, "leaves": ["00" * 32, *manifest["leaves"][1:]]}
+        forged["root"] = build_root(forged["leaves"])
+        with open(storage.get_manifest_path(evidence["filename"]), "w") as f:
+            json.dump(forged, f)
+
+    response = client.post(
+        f"/api/evidence/{evidence['id']}/verify?mode=merkle", headers=auth_headers["forensic_lab"]
+    )
+    assert response.status_code == 200
+    assert response.json()["verified"] is not tamper
+    assert response.json().get("manifest_tampered", False) is tamper
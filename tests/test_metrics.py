@@ -0,0 +1,54 @@
+"""Prometheus metrics: metric families, the /metrics endpoint and its store counts"""
+import pytest
+
+from app.services.metrics import Counter, Histogram, MetricsRegistry, _Metric
+
+
+def test_metric_families_render_their_children():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.labels("/a").inc()
+    requests.labels("/a").inc(2)
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert isinstance(requests, Counter) and isinstance(latency, Histogram)
+
+
+def test_a_metric_without_children_cannot_be_created():
+    class Incomplete(_Metric):
+        type_name = "untyped"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "No child type")
+
+
+def test_store_counts_are_reused_between_scrapes(client, monkeypatch):
+    import main
+
+    calls = []
+
+    async def count_evidence():
+        calls.append("evidence")
+        return 7
+
+    monkeypatch.setattr(main.evidence_service.repository, "count_evidence", count_evidence)
+    monkeypatch.setattr(main, "store_counts_due", 0.0)
+    for _ in range(3):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert 'evidence_store_records{kind="evidence"} 7' in response.text
+    assert calls == ["evidence"]
+
+
+def test_metrics_token_is_required_once_set(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
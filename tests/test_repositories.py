@@ -0,0 +1,171 @@
+"""Evidence repositories: keyset pagination, filters, counts and access logs, per backend"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.evidence import AccessLog, Evidence
+from app.repositories import InMemoryEvidenceRepository
+from app.repositories.access_log_store import AccessLogStore
+
+
+def memory_repository(tmp_path):
+    return InMemoryEvidenceRepository(AccessLogStore(tmp_path / "access_logs"))
+
+
+def sqlite_repository(tmp_path):
+    from app.repositories.sqlite import SQLiteEvidenceRepository
+    return SQLiteEvidenceRepository(tmp_path / "evidence.db")
+
+
+def mongo_repository(tmp_path):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app.repositories.mongo import MongoEvidenceRepository
+    return MongoEvidenceRepository(client=mongomock_motor.AsyncMongoMockClient())
+
+
+BACKENDS = {"memory": memory_repository, "sqlite": sqlite_repository, "mongo": mongo_repository}
+
+START = datetime(2026, 1, 1)
+
+
+def make_evidence(n: int) -> Evidence:
+    created = START + timedelta(minutes=n)
+    return Evidence(
+        id=f"EVD-{n:04d}", case_id=f"CASE-{n % 2}", filename=f"{n}.bin", original_filename=f"{n}.bin",
+        evidence_type="document", description="Test", file_hash="0" * 64, file_size=n,
+        custodian="police", custodian_name="Officer", created_at=created, updated_at=created
+    )
+
+
+@pytest.fixture(params=list(BACKENDS))
+def repository(request, tmp_path):
+    return BACKENDS[request.param](tmp_path)
+
+
+def run(repository, scenario):
+    async def main():
+        await repository.connect()
+        try:
+            return await scenario(repository)
+        finally:
+            await repository.close()
+    return asyncio.run(main())
+
+
+def test_cursor_pages_cover_every_record_once(repository):
+    async def scenario(repo):
+        for n in range(7):
+            await repo.save_evidence(make_evidence(n))
+        pages, cursor = [], None
+        while True:
+            page, cursor = await repo.list_evidence(cursor=cursor, limit=3)
+            pages.append([e.id for e in page])
+            if cursor is None:
+                return pages
+
+    pages = run(repository, scenario)
+    assert pages == [["EVD-0000", "EVD-0001", "EVD-0002"], ["EVD-0003", "EVD-0004", "EVD-0005"], ["EVD-0006"]]
+
+
+def test_descending_filtered_pages(repository):
+    async def scenario(repo):
+        for n in range(7):
+            await repo.save_evidence(make_evidence(n))
+        first, cursor = await repo.list_evidence({"case_id": "CASE-0"}, order="desc", limit=2)
+        second, end = await repo.list_evidence({"case_id": "CASE-0"}, order="desc", cursor=cursor, limit=2)
+        return [e.id for e in first], [e.id for e in second], end
+
+    first, second, end = run(repository, scenario)
+    assert first == ["EVD-0006", "EVD-0004"]
+    assert second == ["EVD-0002", "EVD-0000"]
+    assert end is None
+
+
+def test_malformed_cursor_is_rejected(repository):
+    async def scenario(repo):
+        with pytest.raises(ValueError):
+            await repo.list_evidence(cursor="not-a-cursor", limit=2)
+
+    run(repository, scenario)
+
+
+def test_counts_and_access_logs(repository):
+    async def scenario(repo):
+        for n in range(3):
+            await repo.save_evidence(make_evidence(n))
+        for minute in range(4):
+            await repo.add_access_log(AccessLog(
+                evidence_id="EVD-0001", event_type="accessed", actor_role="police",
+                actor_name="Officer", timestamp=START + timedelta(minutes=minute)
+            ))
+        counts = await repo.count_evidence(), await repo.count_access_logs()
+        logs = await repo.get_access_logs(
+            "EVD-0001", START + timedelta(minutes=1), START + timedelta(minutes=3)
+        )
+        return counts, [log.timestamp for log in logs]
+
+    counts, timestamps = run(repository, scenario)
+    assert counts == (3, 4)
+    assert timestamps == [START + timedelta(minutes=1), START + timedelta(minutes=2)]
+
+
+def test_listed_records_are_complete(repository):
+    async def scenario(repo):
+        evidence = make_evidence(1).model_copy(update={"notes": "Sealed bag 12", "merkle_root": "ab" * 32})
+        await repo.save_evidence(evidence)
+        listed, _ = await repo.list_evidence()
+        return evidence, listed
+
+    evidence, listed = run(repository, scenario)
+    assert [e.model_dump() for e in listed] == [evidence.model_dump()]
+
+
+def test_update_sets_only_the_given_fields(repository):
+    async def scenario(repo):
+        await repo.save_evidence(make_evidence(1))
+        updated = await repo.update_evidence(
+            "EVD-0001", custodian="forensic_lab", integrity_verified=True, updated_at=START + timedelta(days=1)
+        )
+        by_custodian = await repo.list_evidence_ids({"custodian": "forensic_lab"})
+        missing = await repo.update_evidence("EVD-9999", status="verified")
+        return updated, await repo.get_evidence("EVD-0001"), by_custodian, missing
+
+    updated, stored, by_custodian, missing = run(repository, scenario)
+    expected = make_evidence(1).model_copy(update={
+        "custodian": "forensic_lab", "integrity_verified": True, "updated_at": START + timedelta(days=1)
+    })
+    assert updated.model_dump() == stored.model_dump() == expected.model_dump()
+    assert by_custodian == ["EVD-0001"]
+    assert missing is None
+
+
+def test_mongo_access_log_batches_can_be_retried(tmp_path):
+    repository = mongo_repository(tmp_path)
+    logs = [
+        AccessLog(evidence_id="EVD-0001", event_type="accessed", actor_role="police",
+                  actor_name="Officer", timestamp=START + timedelta(minutes=minute))
+        for minute in range(3)
+    ]
+
+    async def scenario(repo):
+        # The first write stored only part of the batch before failing
+        await repo._write_access_logs([repo._to_document(logs[0])])
+        await repo._write_access_logs([repo._to_document(log) for log in logs])
+        return await repo.get_access_logs("EVD-0001")
+
+    assert [log.id for log in run(repository, scenario)] == [log.id for log in logs]
+
+
+def test_bulk_access_logs_are_written_at_once(repository):
+    async def scenario(repo):
+        await repo.add_access_logs([
+            AccessLog(evidence_id=f"EVD-000{n % 2}", event_type="accessed", actor_role="police",
+                      actor_name="Officer", timestamp=START + timedelta(minutes=n))
+            for n in range(5)
+        ])
+        return await repo.count_access_logs(), await repo.get_access_logs("EVD-0001")
+
+    count, logs = run(repository, scenario)
+    assert count == 5
+    assert [log.timestamp for log in logs] == [START + timedelta(minutes=n) for n in (1, 3)]
@@ -0,0 +1,71 @@
+"""Hash-prefix sharded storage: path resolution, flat fallback and migration"""
+import asyncio
+import io
+import threading
+from pathlib import Path
+
+from starlette.datastructures import UploadFile
+
+from app.services.storage_layout import StorageLayout
+from app.services.storage_migration import migrate_flat_files
+from app.services.storage_service import StorageService
+from app.services.worker_pool import WorkerPool
+
+
+def test_new_files_resolve_without_touching_the_disk(tmp_path, monkeypatch):
+    (tmp_path / "old.bin").write_bytes(b"flat")
+    layout = StorageLayout(tmp_path, depth=1)
+
+    def exists(path):
+        raise AssertionError(f"stat of {path}")
+
+    monkeypatch.setattr(Path, "exists", exists)
+    path = layout.path("new.bin", ".merkle.json")
+    assert path == layout.directory("new.bin") / "new.bin.merkle.json"
+
+
+def test_flat_files_are_found_until_they_are_migrated_or_deleted(tmp_path):
+    (tmp_path / "old.bin").write_bytes(b"flat")
+    layout = StorageLayout(tmp_path, depth=1)
+    shard_path = layout.directory("old.bin") / "old.bin"
+    assert layout.path("old.bin") == tmp_path / "old.bin"
+
+    storage = StorageService(layout=layout)
+    assert migrate_flat_files(storage)["linked"] == 1
+    assert layout.path("old.bin") == shard_path
+
+    shard_path.unlink()
+    (tmp_path / "old.bin").unlink()
+    assert layout.path("old.bin") == shard_path
+    # Written again, it goes to the shard even if the lookup is repeated
+    assert layout.path("old.bin") == shard_path
+
+
+def test_migration_stops_when_asked(tmp_path):
+    for i in range(3):
+        (tmp_path / f"old-{i}.bin").write_bytes(b"flat")
+    stop = threading.Event()
+    stop.set()
+
+    counts = migrate_flat_files(StorageService(layout=StorageLayout(tmp_path, depth=1)), stop=stop)
+    assert counts["linked"] == 0
+
+
+def test_upload_shard_directory_is_created_on_the_pool(tmp_path, monkeypatch):
+    storage = StorageService(
+        pool=WorkerPool(max_workers=1, thread_name_prefix="layout-test"),
+        content_addressed=False,
+        layout=StorageLayout(tmp_path, depth=1)
+    )
+    threads = []
+    real_mkdir = Path.mkdir
+
+    def mkdir(path, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return real_mkdir(path, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "mkdir", mkdir)
+    filename, _, _ = asyncio.run(storage.store_upload(UploadFile(io.BytesIO(b"data"), filename="a.bin")))
+
+    assert storage.retrieve_file(filename) == b"data"
+    assert threads and all(name.startswith("layout-test") for name in threads)
@@ -0,0 +1,96 @@
+"""Resumable upload sessions: out-of-order chunks, retries and concurrent closes"""
+import hashlib
+import os
+import threading
+
+import pytest
+
+from app.models.auth import User
+from app.models.evidence import UploadSessionCreate
+from app.services import upload_sessions
+from app.services.storage_layout import StorageLayout
+from app.services.storage_service import StorageService
+from app.services.upload_sessions import UploadSession
+
+POLICE = User(id="1", username="police_officer", role="police", full_name="Officer")
+CONTENT = os.urandom(300_000)
+
+
+@pytest.fixture
+def session(tmp_path):
+    storage = StorageService(layout=StorageLayout(tmp_path))
+    request = UploadSessionCreate(
+        case_id="CASE-1", evidence_type="video", description="Test",
+        filename="clip.mp4", size=len(CONTENT)
+    )
+    return UploadSession(request, POLICE, storage)
+
+
+@pytest.fixture
+def blocked_pwrite(monkeypatch):
+    """Make the next pwrite wait until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+    real_pwrite = os.pwrite
+
+    def pwrite(fd, data, offset):
+        started.set()
+        release.wait(5)
+        return real_pwrite(fd, data, offset)
+
+    monkeypatch.setattr(upload_sessions.os, "pwrite", pwrite)
+    return started, release
+
+
+def test_chunks_in_any_order_give_the_whole_file_digest(session):
+    for offset in (200_000, 0, 100_000):
+        session.write(offset, CONTENT[offset:offset + 100_000])
+    # A retried chunk whose response was lost changes nothing
+    session.write(0, CONTENT[:100_000])
+
+    assert session.complete
+    assert session.sha256.hexdigest() == hashlib.sha256(CONTENT).hexdigest()
+    session.commit()
+    assert session.storage.retrieve_file(session.stored_filename) == CONTENT
+
+
+def test_discard_waits_for_a_chunk_being_written(session, blocked_pwrite):
+    started, release = blocked_pwrite
+    errors = []
+
+    def write():
+        try:
+            session.write(0, CONTENT[:100_000])
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    started.wait(5)
+    discarder = threading.Thread(target=session.discard)
+    discarder.start()
+    discarder.join(0.05)
+    assert discarder.is_alive()
+
+    release.set()
+    writer.join(5)
+    discarder.join(5)
+    assert errors == []
+    assert not session.part_path.exists()
+    with pytest.raises(ValueError, match="no longer accepting"):
+        session.write(100_000, CONTENT[100_000:200_000])
+
+
+def test_overlapping_chunk_is_rejected_while_the_first_is_written(session, blocked_pwrite):
+    started, release = blocked_pwrite
+    writer = threading.Thread(target=session.write, args=(0, CONTENT[:100_000]))
+    writer.start()
+    started.wait(5)
+
+    with pytest.raises(ValueError, match="still being written"):
+        session.write(50_000, bytes(100_000))
+    release.set()
+    writer.join(5)
+
+    session.write(100_000, CONTENT[100_000:])
+    with open(session.part_path, "rb") as f:
+        assert hashlib.sha256(f.read()).hexdigest() == session.sha256.hexdigest()
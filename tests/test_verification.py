@@ -0,0 +1,41 @@
+"""Integrity verification: digest caching and keeping file stats off the event loop"""
+import threading
+
+
+def test_verify_uses_the_cache_and_stats_files_on_the_storage_pool(client, auth_headers, upload, monkeypatch):
+    from app.services.evidence_service import evidence_service
+
+    threads = []
+    storage, cache = evidence_service.storage, evidence_service.verify_cache
+    locate, identity = storage.locate, cache.identity
+
+    def recording_locate(filename):
+        threads.append(threading.current_thread().name)
+        return locate(filename)
+
+    def recording_identity(filename, file_path):
+        threads.append(threading.current_thread().name)
+        return identity(filename, file_path)
+
+    monkeypatch.setattr(storage, "locate", recording_locate)
+    monkeypatch.setattr(cache, "identity", recording_identity)
+
+    evidence = upload(b"verify me" * 100)
+    url = f"/api/evidence/{evidence['id']}/verify"
+    first = client.post(url, headers=auth_headers["police"]).json()
+    second = client.post(url, headers=auth_headers["police"]).json()
+
+    assert first["verified"] and not first["from_cache"]
+    assert second["verified"] and second["from_cache"]
+    assert threads and all(name.startswith(storage.pool.thread_name_prefix) for name in threads), threads
+
+
+def test_verify_detects_tampering(client, auth_headers, upload):
+    from app.services.evidence_service import evidence_service
+
+    evidence = upload(b"original content")
+    file_path, _ = evidence_service.storage.locate(evidence["filename"])
+    file_path.write_bytes(b"tampered content")
+
+    result = client.post(f"/api/evidence/{evidence['id']}/verify", headers=auth_headers["police"]).json()
+    assert result["verified"] is False